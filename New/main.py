@@ -1,107 +1,258 @@
-from mesa import Model, Agent
+from mesa import Model
+from mesa.datacollection import DataCollector
 from mesa.time import RandomActivation
 from mesa.space import MultiGrid
-import random
+from rng import seed_model
+from scheduling import ActiveSetActivation, geometric
+from tally import MoodTally, Tallied
+from profiling import PhaseProfiler
+from compact import Coded, SlottedAgent
+from codes import EMOTIONS, EMO_NEUTRAL, EMO_HAPPY, EMO_ANGRY, EMO_FEARFUL
+from network import NetworkSpace
+
+class HumanAgent(SlottedAgent):
+    # The emotion is stored as a small integer code (see codes.EMOTIONS);
+    # .emotion is the readable name
+    __slots__ = ('_emotion_code', 'emotion_decay_rate')
+    emotion_code = Tallied('emotions', EMOTIONS)
+    emotion = Coded('emotion_code', EMOTIONS)
 
-class HumanAgent(Agent):
     def __init__(self, unique_id, model, emotion='neutral'):
         super().__init__(unique_id, model)
         self.emotion = emotion
         self.emotion_decay_rate = 0.1
 
+    PHASES = {'decay': 'decay', 'neighbors': 'neighbor query', 'influence': 'interaction'}
+
     def step(self):
-        # Decay emotions towards neutrality
-        if self.emotion in ['happy', 'angry', 'fearful'] and random.random() < self.emotion_decay_rate:
-            self.emotion = 'neutral'
+        self.decay()
         
         # Interact with neighbors
-        neighbors = self.model.grid.get_neighbors(self.pos, moore=True, include_center=False)
+        neighbors = self.neighbors()
         if neighbors:
-            other = random.choice(neighbors)
+            other = self.random.choice(neighbors)
             if isinstance(other, HumanAgent):
                 self.influence(other)
 
+    def decay(self):
+        # Decay emotions towards neutrality (reads the slot behind
+        # emotion_code directly)
+        if self._emotion_code != EMO_NEUTRAL and self.random.random() < self.emotion_decay_rate:
+            self.emotion_code = EMO_NEUTRAL
+
+    def neighbors(self):
+        return self.model.grid.get_neighbors(self.pos, moore=True, include_center=False)
+
     def influence(self, other):
         # Determine interaction outcome
-        interaction_outcome = random.choices(
+        interaction_outcome = self.random.choices(
             ['positive', 'neutral', 'negative'],
             weights=[0.3, 0.4, 0.3]
         )[0]
 
         if interaction_outcome == 'positive':
-            if self.emotion == 'neutral':
-                self.emotion = 'happy'
+            if self.emotion_code == EMO_NEUTRAL:
+                self.emotion_code = EMO_HAPPY
         elif interaction_outcome == 'negative':
-            if self.emotion == 'neutral':
-                self.emotion = 'angry'
+            if self.emotion_code == EMO_NEUTRAL:
+                self.emotion_code = EMO_ANGRY
+
+class SparseHumanAgent(HumanAgent):
+    # Event-driven HumanAgent for ActiveSetActivation. Humans never move, so
+    # an agent's chance of picking a human partner is fixed, and each tick's
+    # outcome only depends on its own emotion. Instead of flipping coins every
+    # tick it draws the waiting time to its next change and sleeps until then:
+    # a neutral agent waits for an interaction that excites it, an emotional
+    # one waits for its decay tick (where it may be excited again at once).
+    __slots__ = ('_p_human',)
+
+    def reschedule(self, now=False):
+        # now=True: the agent still gets this tick's step (wait 0 = later in
+        # the running tick)
+        if self.emotion_code == EMO_NEUTRAL:
+            wait = geometric(self.random, self.p_human * 0.6)
+        else:
+            wait = geometric(self.random, self.emotion_decay_rate)
+        if now and wait is not None:
+            wait -= 1
+        self.model.schedule.wake(self, wait)
+
+    def step(self):
+        if self.emotion_code == EMO_NEUTRAL:
+            self.emotion_code = self.random.choice((EMO_HAPPY, EMO_ANGRY))
+        else:
+            self.emotion_code = EMO_NEUTRAL
+            u = self.random.random()
+            if u < self.p_human * 0.3:
+                self.emotion_code = EMO_HAPPY
+            elif u < self.p_human * 0.6:
+                self.emotion_code = EMO_ANGRY
+        self.reschedule()
+
+    @property
+    def p_human(self):
+        # Probability that a uniformly chosen neighbour is a human
+        try:
+            return self._p_human
+        except AttributeError:
+            neighbors = self.model.grid.get_neighbors(self.pos, moore=True, include_center=False)
+            humans = sum(1 for n in neighbors if isinstance(n, HumanAgent))
+            p = humans / len(neighbors) if neighbors else 0.0
+            self._p_human = p
+        return p
+
+class MediaAgent(SlottedAgent):
+    __slots__ = ('cooldown_period', 'current_cooldown', 'neutral_fraction', 'extreme_fraction')
+    PHASES = {'broadcast': 'media broadcast'}
 
-class MediaAgent(Agent):
     def __init__(self, unique_id, model):
         super().__init__(unique_id, model)
         self.cooldown_period = 5
         self.current_cooldown = 0
+        # Share of the humans reached by a neutral / an extreme broadcast
+        self.neutral_fraction = 0.2
+        self.extreme_fraction = 0.1
 
     def step(self):
+        if self.model.sparse:
+            self.model.schedule.wake(self)
         if self.current_cooldown > 0:
             self.current_cooldown -= 1
             return
 
         # Broadcast an event, potentially neutral
-        if random.random() < 0.5:
+        if self.random.random() < 0.5:
             self.broadcast('neutral')
         else:
-            if random.random() < 0.5:
+            if self.random.random() < 0.5:
                 self.broadcast('extreme')
                 self.current_cooldown = self.cooldown_period
 
     def broadcast(self, event_type):
-        agents = self.model.schedule.agents
+        # Audiences are drawn from the humans only (see vectorized.broadcast
+        # for the batched version used by the array engine)
         if event_type == 'neutral':
-            chosen_agents = random.sample(list(agents), k=int(len(agents) * 0.2))
+            chosen_agents = self.audience(self.neutral_fraction)
             for agent in chosen_agents:
-                if isinstance(agent, HumanAgent):
-                    agent.emotion = 'neutral'
+                agent.emotion_code = EMO_NEUTRAL
         elif event_type == 'extreme':
-            chosen_agents = random.sample(list(agents), k=int(len(agents) * 0.1))
+            chosen_agents = self.audience(self.extreme_fraction)
             for agent in chosen_agents:
-                if isinstance(agent, HumanAgent):
-                    agent.emotion = random.choice(['angry', 'fearful'])
+                agent.emotion_code = self.random.choice((EMO_ANGRY, EMO_FEARFUL))
+        else:
+            return
+        if self.model.sparse:
+            # RandomActivation still steps a viewer whose turn comes after
+            # the broadcast. A viewer that was due this tick knows its turn;
+            # for the others it is after the media agent half of the time.
+            schedule = self.model.schedule
+            for agent in chosen_agents:
+                agent.reschedule(now=schedule.pending(agent) or (
+                    not schedule.stepped(agent) and self.random.random() < 0.5))
+
+    def audience(self, fraction):
+        humans = self.model.humans
+        k = int(len(humans) * fraction)
+        if self.model.network is not None:
+            # On a social network well-connected people are reached more
+            # often: the audience is drawn with probability ~ degree
+            return self.model.grid.sample_by_degree(k, self.model.rng)
+        return self.random.sample(humans, k=k)
 
 class EmotionalBalanceModel(Model):
-    def __init__(self, width, height, num_agents):
+    def __init__(self, width, height, num_agents, grid_class=MultiGrid, seed=None,
+                 sparse=False, profile=False, convergence=None, network=None,
+                 decay_rate=0.1, cooldown_period=5, neutral_fraction=0.2, extreme_fraction=0.1,
+                 verbose=False):
+        seed_model(self, seed)
         self.num_agents = num_agents
-        self.grid = MultiGrid(width, height, True)
-        self.schedule = RandomActivation(self)
+        # verbose=True prints the neutral/extreme shares every tick
+        self.verbose = verbose
+        # network=CSRGraph puts human i on node i instead of a grid cell
+        # (width and height are then unused; see network.py)
+        self.network = network
+        if network is not None:
+            self.grid = NetworkSpace(network)
+        else:
+            self.grid = grid_class(width, height, True)
+        # sparse=True only steps agents whose emotion is due to change
+        self.sparse = sparse
+        self.schedule = ActiveSetActivation(self) if sparse else RandomActivation(self)
+        human_class = SparseHumanAgent if sparse else HumanAgent
+        self.emotions = MoodTally()
+        self.running = True
+        self.convergence = convergence
+        self.humans = []
 
         # Create human agents
         for i in range(self.num_agents):
-            emotion = random.choice(['neutral', 'happy', 'angry', 'fearful'])
-            a = HumanAgent(i, self, emotion)
+            emotion = self.random.choice(['neutral', 'happy', 'angry', 'fearful'])
+            a = human_class(i, self, emotion)
+            a.emotion_decay_rate = decay_rate
             self.schedule.add(a)
-            self.grid.place_agent(a, (random.randrange(width), random.randrange(height)))
+            self.humans.append(a)
+            if network is not None:
+                self.grid.place_agent(a, i)
+            else:
+                self.grid.place_agent(a, (self.random.randrange(width), self.random.randrange(height)))
 
-        # Create a media agent
+        # Create a media agent (off the network: it reaches people by broadcast)
         media = MediaAgent(self.num_agents, self)
+        media.cooldown_period = cooldown_period
+        media.neutral_fraction = neutral_fraction
+        media.extreme_fraction = extreme_fraction
         self.schedule.add(media)
-        self.grid.place_agent(media, (width // 2, height // 2))
+        if network is None:
+            self.grid.place_agent(media, (width // 2, height // 2))
+
+        if sparse:
+            self.schedule.wake(media)
+            for a in self.humans:
+                a.reschedule()
+
+        self.datacollector = DataCollector(
+            model_reporters={
+                "Neutral": lambda m: m.emotions['neutral'],
+                "Happy": lambda m: m.emotions['happy'],
+                "Angry": lambda m: m.emotions['angry'],
+                "Fearful": lambda m: m.emotions['fearful']
+            }
+        )
+
+        if profile:
+            PhaseProfiler().attach(self)
 
     def step(self):
+        self.datacollector.collect(self)
         self.schedule.step()
         self.track_emotional_equilibrium()
 
     def track_emotional_equilibrium(self):
-        neutral_count = sum(1 for agent in self.schedule.agents if isinstance(agent, HumanAgent) and agent.emotion == 'neutral')
-        extreme_count = sum(1 for agent in self.schedule.agents if isinstance(agent, HumanAgent) and agent.emotion in ['angry', 'fearful'])
-        total_agents = len([agent for agent in self.schedule.agents if isinstance(agent, HumanAgent)])
-        
-        print(f"Neutral: {neutral_count / total_agents * 100:.2f}% | Extreme: {extreme_count / total_agents * 100:.2f}%")
-
-# Run the model
-model = EmotionalBalanceModel(10, 10, 50)
-for i in range(20):
-    print(f"Step {i + 1}")
-    model.step()
-
+        if self.verbose:
+            neutral_count = self.emotions['neutral']
+            extreme_count = self.emotions['angry'] + self.emotions['fearful']
+            total_agents = self.emotions.count
+
+            print(f"Neutral: {neutral_count / total_agents * 100:.2f}% | Extreme: {extreme_count / total_agents * 100:.2f}%")
+
+        if self.convergence is not None and self.running:
+            if self.convergence.update(self, self.emotions, ['neutral', 'happy', 'angry', 'fearful']):
+                if self.verbose:
+                    print(f"Equilibrium reached at step {self.convergence.converged_at}")
+
+def run_demo(steps=20):
+    model = EmotionalBalanceModel(10, 10, 50, verbose=True)
+    for i in range(steps):
+        print(f"Step {i + 1}")
+        model.step()
+    return model
+
+# Run the model (python -m New.main from the repository root)
+if __name__ == "__main__":
+    run_demo()
+
+# Continuous-emotion variant. vectorized.ContinuousMediaModel is a working
+# array engine for it; the original object version is kept below for reference.
 # import mesa
 # import random
 # import math
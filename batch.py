@@ -0,0 +1,130 @@
+# batch.py
+# Parallel parameter sweeps for MediaSimulation (or any model with a
+# DataCollector). Each (params, seed) job runs in its own process and writes
+# its model-level series to <out>/<run id>.csv as soon as it finishes. Re-running
+# the same sweep skips every run whose file already exists. With a
+# convergence rule, runs stop as soon as their moods settle instead of after
+# `steps` ticks, and the tick they stopped at is stored with the series.
+#
+#   python -m batch --N 100 500 1000 --conflict_probability 0.1 0.2 0.3 \
+#       --seeds 20 --steps 200 --out runs/
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from convergence import ConvergenceDetector
+from model import MediaSimulation
+
+
+def expand(grid):
+    # {'N': [10, 20], 'width': [20]} -> [{'N': 10, 'width': 20}, {'N': 20, 'width': 20}]
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def run_id(params, seed):
+    parts = [f"{name}={params[name]}" for name in sorted(params)]
+    parts.append(f"seed={seed}")
+    return "_".join(parts)
+
+
+def run_one(model_cls, params, seed, steps, out_dir, convergence=None):
+    # convergence: ConvergenceDetector keyword arguments, or None
+    detector = ConvergenceDetector(**convergence) if convergence else None
+    if detector is None:
+        model = model_cls(**params, seed=seed)
+    else:
+        model = model_cls(**params, seed=seed, convergence=detector)
+    for _ in range(steps):
+        if not model.running:
+            break
+        model.step()
+    model.datacollector.collect(model)
+
+    df = model.datacollector.get_model_vars_dataframe()
+    df.index.name = "step"
+    for name, value in params.items():
+        df[name] = value
+    df["seed"] = seed
+    if detector is not None:
+        df["converged_at"] = detector.converged_at
+
+    # Write to a temporary name first so a killed sweep never leaves a
+    # half-written file that would be mistaken for a finished run
+    path = os.path.join(out_dir, run_id(params, seed) + ".csv")
+    tmp = path + ".part"
+    df.to_csv(tmp)
+    os.replace(tmp, path)
+    return path
+
+
+def pending(jobs, out_dir):
+    done = set(os.listdir(out_dir))
+    return [(params, seed) for params, seed in jobs
+            if run_id(params, seed) + ".csv" not in done]
+
+
+def sweep(grid, seeds, steps, out_dir, model_cls=MediaSimulation, workers=None, progress=None,
+          convergence=None):
+    os.makedirs(out_dir, exist_ok=True)
+    if isinstance(seeds, int):
+        seeds = range(seeds)
+    jobs = [(params, seed) for params in expand(grid) for seed in seeds]
+    todo = pending(jobs, out_dir)
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [pool.submit(run_one, model_cls, params, seed, steps, out_dir, convergence)
+                   for params, seed in todo]
+        for i, future in enumerate(as_completed(futures), 1):
+            path = future.result()
+            if progress:
+                progress(i, len(todo), path)
+    return len(jobs) - len(todo), len(todo)
+
+
+def load(out_dir):
+    # All finished runs of a sweep as one long DataFrame
+    frames = [pd.read_csv(os.path.join(out_dir, name))
+              for name in sorted(os.listdir(out_dir)) if name.endswith(".csv")]
+    return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel MediaSimulation sweep")
+    parser.add_argument("--N", type=int, nargs="+", default=[100])
+    parser.add_argument("--width", type=int, nargs="+", default=[20])
+    parser.add_argument("--height", type=int, nargs="+", default=[20])
+    parser.add_argument("--conflict_probability", type=float, nargs="+", default=[0.3])
+    parser.add_argument("--seeds", type=int, default=10)
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="runs")
+    parser.add_argument("--converge-window", type=int, default=None,
+                        help="stop runs whose mood fractions settled over this many ticks")
+    parser.add_argument("--converge-tolerance", type=float, default=0.01)
+    args = parser.parse_args()
+
+    grid = {
+        "N": args.N,
+        "width": args.width,
+        "height": args.height,
+        "conflict_probability": args.conflict_probability,
+    }
+
+    def progress(i, total, path):
+        print(f"[{i}/{total}] {os.path.basename(path)}")
+
+    convergence = None
+    if args.converge_window:
+        convergence = {"window": args.converge_window, "tolerance": args.converge_tolerance}
+
+    skipped, ran = sweep(grid, args.seeds, args.steps, args.out,
+                         workers=args.workers, progress=progress, convergence=convergence)
+    print(f"{ran} runs finished, {skipped} already done")
+
+
+if __name__ == "__main__":
+    main()
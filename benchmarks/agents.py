@@ -0,0 +1,109 @@
+# benchmarks/agents.py
+# Memory and speed of model.PersonAgent (__slots__, integer mood and shape
+# codes) against the previous representation (mesa.Agent with string
+# attributes in a per-instance __dict__), at 1M agents by default.
+#
+#   python -m benchmarks.agents [--agents 1000000] [--density 0.25]
+import argparse
+import gc
+import math
+import random
+import time
+import tracemalloc
+
+from mesa import Agent
+
+from model import MediaSimulation, PersonAgent
+from spatial import IndexedMultiGrid
+from tally import Tallied
+
+
+class DictPersonAgent(Agent):
+    # model.PersonAgent as it was before the compact representation
+    mood = Tallied('moods')
+
+    def __init__(self, unique_id, model, shape):
+        super().__init__(unique_id, model)
+        self.shape = shape
+        self.mood = 'neutral'
+        self.news_influenced = False
+
+    def neighbors(self):
+        return self.model.grid.iter_neighbors(self.pos, moore=True, include_center=False)
+
+    def interact(self, neighbors):
+        for neighbor in neighbors:
+            if neighbor.shape != self.shape:
+                if self.random.random() < self.model.conflict_probability:
+                    self.mood = 'angry'
+                    neighbor.mood = 'scared'
+                    self.model.media_focus = (self.shape, neighbor.shape)
+                    return True
+        return False
+
+    def calm_down(self):
+        if self.mood != 'neutral' and self.random.random() < 0.1:
+            self.mood = 'neutral'
+
+
+def build(agent_class, n, side, seed):
+    # An empty MediaSimulation as the agents' model, then n agents. Returns
+    # the model, the agents and the bytes allocated for the agents alone.
+    model = MediaSimulation(0, side, side, grid_class=IndexedMultiGrid, seed=seed)
+    shapes = ['square', 'circle']
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    agents = [agent_class(i, model, model.random.choice(shapes)) for i in range(n)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    rng = random.Random(seed)
+    for agent in agents:
+        model.grid.place_agent(agent, (rng.randrange(side), rng.randrange(side)))
+    return model, agents, used
+
+
+def interaction_pass(agents):
+    # The interaction and calm-down half of PersonAgent.step, without moving
+    start = time.perf_counter()
+    for agent in agents:
+        if not agent.interact(agent.neighbors()):
+            agent.calm_down()
+    return time.perf_counter() - start
+
+
+def measure(agent_class, n, side, passes, seed):
+    model, agents, used = build(agent_class, n, side, seed)
+    interaction_pass(agents)  # warm up the neighbourhood caches
+    seconds = min(interaction_pass(agents) for _ in range(passes))
+    return used, seconds, dict(model.moods)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact vs dict-based agents")
+    parser.add_argument('--agents', type=int, default=1000000)
+    parser.add_argument('--density', type=float, default=0.25)
+    parser.add_argument('--passes', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    side = max(3, int(math.sqrt(args.agents / args.density)))
+    results = {}
+    for label, agent_class in (('dict + strings', DictPersonAgent),
+                               ('slots + codes', PersonAgent)):
+        results[label] = measure(agent_class, args.agents, side, args.passes, args.seed)
+        gc.collect()  # agents and model form cycles; free them before the next run
+    moods = [moods for _, _, moods in results.values()]
+    assert moods[0] == moods[1], "representations disagree on the outcome"
+
+    print(f"{args.agents:,} agents on a {side}x{side} torus")
+    print(f"{'representation':<16} {'bytes/agent':>12} {'agents MB':>10} {'pass s':>8}")
+    for label, (used, seconds, _) in results.items():
+        print(f"{label:<16} {used / args.agents:>12.1f} {used / 2**20:>10.1f} {seconds:>8.3f}")
+    (old_mem, old_s, _), (new_mem, new_s, _) = results.values()
+    print(f"memory {old_mem / new_mem:.2f}x smaller, interaction pass {old_s / new_s:.2f}x faster")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+# benchmarks/import_time.py
+# Cold import time of every simulation module, each measured in a fresh
+# interpreter. "mesa" is the floor: it is what any model module has to pay.
+#
+#   python -m benchmarks.import_time [--repeat 5] [--json out.json]
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+MODULES = [
+    "mesa",
+    "model",
+    "media",
+    "wbwwb",
+    "New.main",
+    "vectorized",
+    "headless",
+    "server",
+    "main",
+]
+
+SNIPPET = (
+    "import time; t = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - t)"
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module, repeat):
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", SNIPPET.format(module=module)],
+            cwd=ROOT, check=True, capture_output=True, text=True)
+        times.append(float(out.stdout.split()[-1]))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold import time per module")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--json", default=None, help="write results here")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'module':<12} {'median ms':>10} {'min ms':>8}")
+    for module in args.modules:
+        times = measure(module, args.repeat)
+        results[module] = {"median_s": statistics.median(times), "min_s": min(times)}
+        print(f"{module:<12} {statistics.median(times) * 1e3:>10.1f} {min(times) * 1e3:>8.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
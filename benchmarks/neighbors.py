@@ -0,0 +1,71 @@
+# benchmarks/neighbors.py
+# Micro-benchmark: Moore-neighbour scans on mesa's MultiGrid vs IndexedMultiGrid.
+#
+#   python -m benchmarks.neighbors [--sizes 1000 10000 100000] [--density 0.25]
+import argparse
+import math
+import random
+import time
+
+from mesa.space import MultiGrid
+
+from spatial import IndexedMultiGrid
+
+
+class Dot:
+    def __init__(self, shape):
+        self.pos = None
+        self.shape = shape
+
+
+def build(grid_class, n, density, seed):
+    rng = random.Random(seed)
+    side = max(3, int(math.sqrt(n / density)))
+    grid = grid_class(side, side, True)
+    agents = []
+    for _ in range(n):
+        agent = Dot(rng.choice(['square', 'circle']))
+        grid.place_agent(agent, (rng.randrange(side), rng.randrange(side)))
+        agents.append(agent)
+    return grid, agents, rng
+
+
+def tick(grid, agents, rng):
+    # One model.PersonAgent-style pass: move, then scan neighbours
+    hits = 0
+    for agent in agents:
+        steps = grid.get_neighborhood(agent.pos, moore=True, include_center=False)
+        grid.move_agent(agent, rng.choice(steps))
+        for neighbor in grid.iter_neighbors(agent.pos, moore=True, include_center=False):
+            if neighbor.shape != agent.shape:
+                hits += 1
+    return hits
+
+
+def measure(grid_class, n, density, ticks, seed):
+    grid, agents, rng = build(grid_class, n, density, seed)
+    tick(grid, agents, rng)  # warm up the neighbourhood caches
+    start = time.perf_counter()
+    for _ in range(ticks):
+        hits = tick(grid, agents, rng)
+    return (time.perf_counter() - start) / ticks, hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Moore-neighbour scans, MultiGrid vs IndexedMultiGrid")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--density', type=float, default=0.25)
+    parser.add_argument('--ticks', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'agents':>8} {'MultiGrid s/tick':>18} {'Indexed s/tick':>16} {'speedup':>8}")
+    for n in args.sizes:
+        base, base_hits = measure(MultiGrid, n, args.density, args.ticks, args.seed)
+        fast, fast_hits = measure(IndexedMultiGrid, n, args.density, args.ticks, args.seed)
+        assert base_hits == fast_hits, "grids disagree on neighbour sets"
+        print(f"{n:>8} {base:>18.4f} {fast:>16.4f} {base / fast:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+# benchmarks/suite.py
+# Throughput, per-tick latency and peak memory of every model across
+# population sizes and grid densities. Each case runs in a fresh process so
+# peak memory is not polluted by earlier cases.
+#
+#   python -m benchmarks.suite --out results.json
+#   python -m benchmarks.suite --compare baseline.json [--tolerance 0.15]
+import argparse
+import json
+import math
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def media_simulation(N, width, height, seed):
+    from model import MediaSimulation
+    return MediaSimulation(N, width, height, seed=seed)
+
+
+def wbwwb(N, width, height, seed):
+    from wbwwb import WBWWBModel
+    return WBWWBModel(N, width, height, seed=seed)
+
+
+def media_model(N, width, height, seed):
+    from media import MediaModel
+    return MediaModel(N, width, height, seed=seed)
+
+
+def emotional_balance(N, width, height, seed):
+    from New.main import EmotionalBalanceModel
+    return EmotionalBalanceModel(width, height, N, seed=seed)
+
+
+def vector_media_simulation(N, width, height, seed):
+    from vectorized import VectorMediaSimulation
+    return VectorMediaSimulation(N, width, height, seed=seed)
+
+
+def vector_emotional_balance(N, width, height, seed):
+    from vectorized import VectorEmotionalBalanceModel
+    return VectorEmotionalBalanceModel(width, height, N, seed=seed)
+
+
+MODELS = {
+    "MediaSimulation": media_simulation,
+    "WBWWBModel": wbwwb,
+    "MediaModel": media_model,
+    "EmotionalBalanceModel": emotional_balance,
+    "VectorMediaSimulation": vector_media_simulation,
+    "VectorEmotionalBalanceModel": vector_emotional_balance,
+}
+
+DEFAULT_MODELS = ["MediaSimulation", "WBWWBModel", "MediaModel", "EmotionalBalanceModel"]
+
+
+def _max_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_case(name, N, density, ticks, seed=0):
+    side = max(3, math.ceil(math.sqrt(N / density)))
+    factory = MODELS[name]
+    factory(1, 3, 3, seed)  # import everything before taking the baseline
+    baseline = _max_rss_mb()
+
+    model = factory(N, side, side, seed)
+    latencies = np.empty(ticks)
+    start = time.perf_counter()
+    for i in range(ticks):
+        t = time.perf_counter()
+        model.step()
+        latencies[i] = time.perf_counter() - t
+    elapsed = time.perf_counter() - start
+
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1e3
+    return {
+        "model": name,
+        "N": N,
+        "density": density,
+        "side": side,
+        "ticks": ticks,
+        "ticks_per_second": ticks / elapsed,
+        "p50_ms": p50,
+        "p90_ms": p90,
+        "p99_ms": p99,
+        "peak_mb": _max_rss_mb() - baseline,
+    }
+
+
+def run_suite(models, sizes, densities, ticks, seed=0):
+    cases = [(name, N, density, ticks, seed)
+             for name in models for N in sizes for density in densities]
+    for case in cases:
+        # One fresh process per case for an honest peak-memory figure
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            yield pool.submit(run_case, *case).result()
+
+
+def key(result):
+    return (result["model"], result["N"], result["density"])
+
+
+def compare(results, baseline, tolerance):
+    # Regressions: throughput down, or p99 latency / peak memory up, by more
+    # than `tolerance` (relative) against the matching baseline case
+    previous = {key(r): r for r in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+        checks = [
+            ("ticks_per_second", result["ticks_per_second"] < old["ticks_per_second"] * (1 - tolerance)),
+            ("p99_ms", result["p99_ms"] > old["p99_ms"] * (1 + tolerance)),
+            # Small allocations are noise; only flag memory growth above 1 MB
+            ("peak_mb", result["peak_mb"] > max(old["peak_mb"] * (1 + tolerance), old["peak_mb"] + 1)),
+        ]
+        for metric, regressed in checks:
+            if regressed:
+                regressions.append((key(result), metric, old[metric], result[metric]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model benchmark suite")
+    parser.add_argument("--models", nargs="+", default=DEFAULT_MODELS, choices=list(MODELS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.1, 0.5])
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    parser.add_argument("--compare", default=None, help="baseline results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    print(f"{'model':<28} {'N':>7} {'dens':>5} {'ticks/s':>10} "
+          f"{'p50 ms':>9} {'p99 ms':>9} {'peak MB':>8}")
+    results = []
+    for r in run_suite(args.models, args.sizes, args.densities, args.ticks, args.seed):
+        results.append(r)
+        print(f"{r['model']:<28} {r['N']:>7} {r['density']:>5} {r['ticks_per_second']:>10.1f} "
+              f"{r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['peak_mb']:>8.1f}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for (model, N, density), metric, old, new in regressions:
+            print(f"REGRESSION {model} N={N} density={density}: {metric} {old:.3f} -> {new:.3f}")
+        if regressions:
+            sys.exit(1)
+        print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# benchmarks/update_modes.py
+# MediaSimulation with sequential (RandomActivation, the default) against
+# synchronous double-buffered updates (synchronous=True): mean and spread of
+# the Angry and Scared fractions over many seeds, once the runs have settled.
+#
+#   python -m benchmarks.update_modes [--runs 30] [--steps 200] [--N 300]
+import argparse
+import math
+import time
+
+import numpy as np
+
+from model import MediaSimulation
+
+
+def run(seed, synchronous, args):
+    model = MediaSimulation(args.N, args.width, args.height, seed=seed,
+                            synchronous=synchronous)
+    for _ in range(args.steps):
+        model.step()
+    model.datacollector.collect(model)
+    df = model.datacollector.get_model_vars_dataframe()
+    # Average over the last `tail` ticks so one noisy tick does not decide
+    tail = df.iloc[-args.tail:]
+    return tail['Angry'].mean() / args.N, tail['Scared'].mean() / args.N
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential vs synchronous updates")
+    parser.add_argument('--runs', type=int, default=30)
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--tail', type=int, default=50)
+    parser.add_argument('--N', type=int, default=300)
+    parser.add_argument('--width', type=int, default=20)
+    parser.add_argument('--height', type=int, default=20)
+    args = parser.parse_args()
+
+    results = {}
+    for label, synchronous in (('sequential', False), ('synchronous', True)):
+        start = time.perf_counter()
+        results[label] = np.array([run(seed, synchronous, args) for seed in range(args.runs)])
+        print(f"{label}: {args.runs} runs in {time.perf_counter() - start:.1f}s")
+
+    print(f"{args.N} agents on {args.width}x{args.height}, ticks "
+          f"{args.steps - args.tail + 1}..{args.steps} of {args.runs} seeds")
+    print(f"{'mode':<12} {'angry':>16} {'scared':>16}")
+    for label, values in results.items():
+        mean, sd = values.mean(axis=0), values.std(axis=0, ddof=1)
+        print(f"{label:<12} {mean[0]:>8.3f} ± {sd[0]:.3f} {mean[1]:>8.3f} ± {sd[1]:.3f}")
+
+    # Difference of the means in standard errors (Welch)
+    seq, syn = results['sequential'], results['synchronous']
+    se = np.sqrt(seq.var(axis=0, ddof=1) / len(seq) + syn.var(axis=0, ddof=1) / len(syn))
+    z = (syn.mean(axis=0) - seq.mean(axis=0)) / np.where(se > 0, se, math.inf)
+    print(f"synchronous - sequential: angry {z[0]:+.1f} SE, scared {z[1]:+.1f} SE")
+
+
+if __name__ == '__main__':
+    main()
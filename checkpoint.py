@@ -0,0 +1,388 @@
+# checkpoint.py
+# Compact snapshots of a running simulation, fast restore and "what-if" forks.
+#
+# A checkpoint is a flat dict of numpy arrays: one row per agent (in schedule
+# order, plus each agent's slot inside its grid cell so neighbour iteration
+# order survives), both RNG states, the MediaAgent cooldown and the collected
+# series so far. It never references the live model, so any number of
+# branches can be restored from it; fork() hands it to each worker process
+# once and every branch only builds its own model.
+#
+#   ckpt = checkpoint.snapshot(model)              # at tick T
+#   checkpoint.save(ckpt, "t500.npz")
+#   branch = checkpoint.restore(ckpt, conflict_probability=0.5)
+#   results = checkpoint.fork(ckpt, [{"conflict_probability": p} for p in ps], steps=1000)
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from codes import EMOTIONS, MOODS, SHAPES
+from model import MediaSimulation, NetworkPersonAgent, PersonAgent
+from New.main import EmotionalBalanceModel, HumanAgent, MediaAgent
+from network import CSRGraph
+from rng import seed_model
+from vectorized import VectorMediaSimulation
+
+
+def _flatten(prefix, value, out):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _flatten(f"{prefix}/{key}", item, out)
+    else:
+        out[prefix] = np.asarray(value)
+
+
+def _unflatten(prefix, ckpt):
+    state = {}
+    for name, value in ckpt.items():
+        if not name.startswith(prefix + "/"):
+            continue
+        node = state
+        *path, leaf = name[len(prefix) + 1:].split("/")
+        for key in path:
+            node = node.setdefault(key, {})
+        node[leaf] = value.item() if value.ndim == 0 else value
+    return state
+
+
+def _save_rngs(model, ckpt):
+    version, internal, gauss = model.random.getstate()
+    ckpt["random/version"] = np.asarray(version)
+    ckpt["random/internal"] = np.asarray(internal, dtype=np.uint32)
+    ckpt["random/gauss"] = np.asarray(np.nan if gauss is None else gauss)
+    if hasattr(model, "rng"):
+        _flatten("rng", model.rng.bit_generator.state, ckpt)
+
+
+def _load_rngs(model, ckpt):
+    gauss = float(ckpt["random/gauss"])
+    model.random.setstate((int(ckpt["random/version"]),
+                           tuple(int(v) for v in ckpt["random/internal"]),
+                           None if np.isnan(gauss) else gauss))
+    state = _unflatten("rng", ckpt)
+    if state:
+        model.rng.bit_generator.state = state
+
+
+def _grid_slots(model):
+    # Position of every agent inside its cell's list
+    slots = {}
+    for agent in model.schedule.agents:
+        x, y = agent.pos
+        slots[agent.unique_id] = model.grid[x, y].index(agent)
+    return slots
+
+
+def _place_restored(model, agents, slots):
+    # place_agent only appends when agent.pos is None
+    positions = [agent.pos for agent in agents]
+    for agent in agents:
+        agent.pos = None
+    for i in np.lexsort((slots,)):
+        model.grid.place_agent(agents[i], positions[i])
+
+
+def _space_meta(model):
+    if model.network is not None:
+        return {"width": 0, "height": 0, "network": True}
+    return {"width": model.grid.width, "height": model.grid.height, "network": False}
+
+
+def _save_positions(model, agents, ckpt):
+    # Grid runs keep (x, y) and the slot inside the cell. Network runs keep
+    # the node (-1 for agents off the network, like the media agent) and the
+    # CSR arrays, so the checkpoint restores without the original graph.
+    if model.network is not None:
+        ckpt["agent/node"] = np.array([-1 if a.pos is None else a.pos for a in agents],
+                                      dtype=np.int64)
+        ckpt["network/indptr"] = np.array(model.network.indptr)
+        ckpt["network/indices"] = np.array(model.network.indices)
+        return
+    slots = _grid_slots(model)
+    ckpt["agent/x"] = np.array([a.pos[0] for a in agents], dtype=np.int32)
+    ckpt["agent/y"] = np.array([a.pos[1] for a in agents], dtype=np.int32)
+    ckpt["agent/slot"] = np.array([slots[a.unique_id] for a in agents], dtype=np.int32)
+
+
+def _saved_network(ckpt, meta, network):
+    # The graph for a restored run: the caller's (must be the same graph) or
+    # the one stored in the checkpoint
+    if not meta.get("network"):
+        if network is not None:
+            raise ValueError("checkpoint was taken on a grid, not a network")
+        return None
+    if network is None:
+        network = CSRGraph(ckpt["network/indptr"], ckpt["network/indices"])
+    return network
+
+
+def _place_saved(model, agents, ckpt):
+    if model.network is not None:
+        for agent, node in zip(agents, ckpt["agent/node"].tolist()):
+            if node >= 0:
+                model.grid.place_agent(agent, node)
+        return
+    for agent, x, y in zip(agents, ckpt["agent/x"].tolist(), ckpt["agent/y"].tolist()):
+        agent.pos = (x, y)
+    _place_restored(model, agents, ckpt["agent/slot"])
+
+
+def _save_series(model, ckpt):
+    for name, values in model.datacollector.model_vars.items():
+        ckpt[f"series/{name}"] = np.asarray(values)
+
+
+def _load_series(model, ckpt):
+    for name in model.datacollector.model_vars:
+        if f"series/{name}" in ckpt:
+            model.datacollector.model_vars[name] = ckpt[f"series/{name}"].tolist()
+
+
+# MediaSimulation
+
+def _snapshot_media_simulation(model):
+    agents = model.schedule.agents
+    ckpt = {
+        "meta": np.asarray(json.dumps({
+            "model": "MediaSimulation",
+            **_space_meta(model),
+            "conflict_probability": model.conflict_probability,
+            "calm_probability": model.calm_probability,
+            "synchronous": model.synchronous,
+            "media_focus": model.media_focus,
+            "steps": model.schedule.steps,
+        })),
+        "agent/id": np.array([a.unique_id for a in agents], dtype=np.int64),
+        "agent/shape": np.array([SHAPES.index(a.shape) for a in agents], dtype=np.int8),
+        "agent/mood": np.array([MOODS.index(a.mood) for a in agents], dtype=np.int8),
+        "agent/news_influenced": np.array([a.news_influenced for a in agents], dtype=bool),
+        # Synchronous mode's pending writes (empty between ticks)
+        "agent/next_mood": np.array([a.next_mood_code for a in agents], dtype=np.int8),
+        "agent/next_priority": np.array([a.next_priority for a in agents]),
+    }
+    _save_positions(model, agents, ckpt)
+    _save_rngs(model, ckpt)
+    _save_series(model, ckpt)
+    return ckpt
+
+
+def _restore_media_simulation(ckpt, meta, grid_class=None, network=None, **overrides):
+    kwargs = {} if grid_class is None else {"grid_class": grid_class}
+    kwargs["calm_probability"] = meta.get("calm_probability", 0.1)
+    kwargs["network"] = _saved_network(ckpt, meta, network)
+    kwargs["synchronous"] = meta.get("synchronous", False)
+    model = MediaSimulation(0, meta["width"], meta["height"], meta["conflict_probability"], **kwargs)
+    model.num_agents = len(ckpt["agent/id"])
+    model.media_focus = tuple(meta["media_focus"]) if meta["media_focus"] else None
+    model.schedule.steps = model.schedule.time = meta["steps"]
+
+    agent_class = PersonAgent if model.network is None else NetworkPersonAgent
+    agents = []
+    for uid, shape, mood, influenced in zip(
+            ckpt["agent/id"].tolist(), ckpt["agent/shape"].tolist(),
+            ckpt["agent/mood"].tolist(), ckpt["agent/news_influenced"].tolist()):
+        agent = agent_class(uid, model, SHAPES[shape])
+        agent.mood = MOODS[mood]
+        agent.news_influenced = influenced
+        agents.append(agent)
+        model.schedule.add(agent)
+    if "agent/next_mood" in ckpt:
+        for agent, mood, priority in zip(agents, ckpt["agent/next_mood"].tolist(),
+                                         ckpt["agent/next_priority"].tolist()):
+            agent.next_mood_code = mood
+            agent.next_priority = priority
+    _place_saved(model, agents, ckpt)
+    _load_rngs(model, ckpt)
+    _load_series(model, ckpt)
+    return model, overrides
+
+
+# EmotionalBalanceModel
+
+def _snapshot_emotional_balance(model):
+    if model.sparse:
+        raise ValueError("sparse EmotionalBalanceModel runs cannot be checkpointed")
+    agents = model.schedule.agents
+    media = [a for a in agents if isinstance(a, MediaAgent)]
+    ckpt = {
+        "meta": np.asarray(json.dumps({
+            "model": "EmotionalBalanceModel",
+            **_space_meta(model),
+            "steps": model.schedule.steps,
+        })),
+        "agent/id": np.array([a.unique_id for a in agents], dtype=np.int64),
+        "agent/media": np.array([isinstance(a, MediaAgent) for a in agents], dtype=bool),
+        "agent/emotion": np.array([EMOTIONS.index(a.emotion) if isinstance(a, HumanAgent) else -1
+                                   for a in agents], dtype=np.int8),
+        "agent/decay_rate": np.array([getattr(a, "emotion_decay_rate", np.nan) for a in agents]),
+        "media/cooldown_period": np.array([m.cooldown_period for m in media], dtype=np.int32),
+        "media/current_cooldown": np.array([m.current_cooldown for m in media], dtype=np.int32),
+        "media/neutral_fraction": np.array([m.neutral_fraction for m in media]),
+        "media/extreme_fraction": np.array([m.extreme_fraction for m in media]),
+    }
+    _save_positions(model, agents, ckpt)
+    _save_rngs(model, ckpt)
+    _save_series(model, ckpt)
+    return ckpt
+
+
+def _restore_emotional_balance(ckpt, meta, grid_class=None, cooldown_period=None,
+                               decay_rate=None, network=None, **overrides):
+    kwargs = {} if grid_class is None else {"grid_class": grid_class}
+    kwargs["network"] = _saved_network(ckpt, meta, network)
+    model = EmotionalBalanceModel(meta["width"], meta["height"], 0, **kwargs)
+    # Drop the media agent __init__ created; it is restored with the others
+    for agent in list(model.schedule.agents):
+        model.schedule.remove(agent)
+        if agent.pos is not None:
+            model.grid.remove_agent(agent)
+    model.num_agents = int(np.count_nonzero(~ckpt["agent/media"]))
+    model.schedule.steps = model.schedule.time = meta["steps"]
+
+    agents = []
+    media_index = 0
+    for uid, is_media, emotion, decay in zip(
+            ckpt["agent/id"].tolist(), ckpt["agent/media"].tolist(),
+            ckpt["agent/emotion"].tolist(), ckpt["agent/decay_rate"].tolist()):
+        if is_media:
+            agent = MediaAgent(uid, model)
+            agent.cooldown_period = int(ckpt["media/cooldown_period"][media_index])
+            agent.current_cooldown = int(ckpt["media/current_cooldown"][media_index])
+            if "media/neutral_fraction" in ckpt:
+                agent.neutral_fraction = float(ckpt["media/neutral_fraction"][media_index])
+                agent.extreme_fraction = float(ckpt["media/extreme_fraction"][media_index])
+            if cooldown_period is not None:
+                agent.cooldown_period = cooldown_period
+            media_index += 1
+        else:
+            agent = HumanAgent(uid, model, EMOTIONS[emotion])
+            agent.emotion_decay_rate = decay if decay_rate is None else decay_rate
+            model.humans.append(agent)
+        agents.append(agent)
+        model.schedule.add(agent)
+    _place_saved(model, agents, ckpt)
+    _load_rngs(model, ckpt)
+    _load_series(model, ckpt)
+    return model, overrides
+
+
+# VectorMediaSimulation
+
+def _snapshot_vector_media(model):
+    ckpt = {
+        "meta": np.asarray(json.dumps({
+            "model": "VectorMediaSimulation",
+            "width": model.width,
+            "height": model.height,
+            "conflict_probability": model.conflict_probability,
+            "calm_probability": model.calm_probability,
+            "media_focus": model.media_focus,
+            "steps": model.steps,
+        })),
+        # Copies: apply_writes() changes model.mood in place
+        "agent/x": model.x.copy(),
+        "agent/y": model.y.copy(),
+        "agent/shape": model.shape.copy(),
+        "agent/mood": model.mood.copy(),
+        "streams/key": model.streams.key.copy(),
+    }
+    _save_series(model, ckpt)
+    return ckpt
+
+
+def _restore_vector_media(ckpt, meta, **overrides):
+    model = VectorMediaSimulation(0, meta["width"], meta["height"], meta["conflict_probability"],
+                                  calm_probability=meta.get("calm_probability", 0.1))
+    model.num_agents = len(ckpt["agent/x"])
+    model.media_focus = tuple(meta["media_focus"]) if meta["media_focus"] else None
+    model.steps = meta["steps"]
+    # Branches own copies of the mutable state; the position arrays are
+    # replaced (not written into) every tick, so they can be shared
+    model.x = ckpt["agent/x"]
+    model.y = ckpt["agent/y"]
+    model.shape = ckpt["agent/shape"]
+    model.mood = ckpt["agent/mood"].copy()
+    model.streams.key = ckpt["streams/key"]
+    _load_series(model, ckpt)
+    return model, overrides
+
+
+SNAPSHOT = {
+    MediaSimulation: _snapshot_media_simulation,
+    EmotionalBalanceModel: _snapshot_emotional_balance,
+    VectorMediaSimulation: _snapshot_vector_media,
+}
+
+RESTORE = {
+    "MediaSimulation": _restore_media_simulation,
+    "EmotionalBalanceModel": _restore_emotional_balance,
+    "VectorMediaSimulation": _restore_vector_media,
+}
+
+
+def snapshot(model):
+    return SNAPSHOT[type(model)](model)
+
+
+def restore(ckpt, seed=None, **overrides):
+    # Rebuild a model from a checkpoint. Keyword overrides are set as model
+    # attributes (e.g. conflict_probability=0.5); EmotionalBalanceModel also
+    # takes cooldown_period= and decay_rate=. Network runs rebuild their graph
+    # from the checkpoint unless network= passes the same CSRGraph. With seed=
+    # the branch gets fresh random streams; without it it continues the
+    # checkpoint's streams.
+    meta = json.loads(str(ckpt["meta"]))
+    model, overrides = RESTORE[meta["model"]](ckpt, meta, **overrides)
+    for name, value in overrides.items():
+        if not hasattr(model, name):
+            raise AttributeError(f"{meta['model']} has no attribute {name!r}")
+        setattr(model, name, value)
+    if seed is not None:
+        seed_model(model, seed)
+    return model
+
+
+def save(ckpt, path):
+    # Uncompressed, so loading is a straight read
+    np.savez(path, **ckpt)
+
+
+def load(path):
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+_BASE = None
+
+
+def _set_base(ckpt):
+    global _BASE
+    _BASE = ckpt
+
+
+def _run_branch(job):
+    overrides, steps = job
+    model = restore(_BASE, **overrides)
+    for _ in range(steps):
+        model.step()
+    if hasattr(model, "datacollector"):
+        model.datacollector.collect(model)
+        return overrides, model.datacollector.get_model_vars_dataframe()
+    return overrides, model
+
+
+def fork(ckpt, variants, steps, workers=None):
+    # Run one branch per overrides dict in `variants`, `steps` ticks each, in
+    # parallel. With the fork start method the workers inherit the checkpoint
+    # copy-on-write; otherwise it is sent once per worker, not once per branch.
+    _set_base(ckpt)
+    if multiprocessing.get_start_method() == "fork":
+        pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                   initializer=_set_base, initargs=(ckpt,))
+    with pool:
+        return list(pool.map(_run_branch, [(dict(v), steps) for v in variants]))
@@ -0,0 +1,19 @@
+# codes.py
+# Integer codes shared by the object models, the array models and
+# checkpoints. An agent stores the index into one of these tuples; the tuple
+# maps it back to the name used by portrayal and reporting.
+
+# MediaSimulation and MediaModel
+SHAPES = ('square', 'circle')
+MOODS = ('neutral', 'angry', 'scared')
+NEUTRAL, ANGRY, SCARED = 0, 1, 2
+
+# EmotionalBalanceModel
+EMOTIONS = ('neutral', 'happy', 'angry', 'fearful')
+EMO_NEUTRAL, EMO_HAPPY, EMO_ANGRY, EMO_FEARFUL = 0, 1, 2, 3
+
+# WBWWBModel: a state also fixes the agent's shape and colour
+WBWWB_STATES = ('neutral', 'angry', 'happy')
+WBWWB_SHAPES = ('circle', 'triangle', 'square')
+WBWWB_COLORS = ('grey', 'red', 'green')
+HAPPY = 2
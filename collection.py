@@ -0,0 +1,95 @@
+# collection.py
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from mesa.datacollection import DataCollector
+
+META = "meta.json"
+
+
+class StreamingDataCollector(DataCollector):
+    # DataCollector that keeps at most chunk_size rows of the model-level
+    # series in memory. Every full chunk is appended to one raw binary file
+    # per column under `path`, and meta.json records the dtypes and how many
+    # rows are safely on disk. If the process dies, everything up to the last
+    # flushed chunk can still be read with read_columns(path), which memory
+    # maps the column files instead of loading them. A column file is
+    # (re)created on its column's first flush, so a reused path never mixes
+    # runs. Reporters added after collection started (PhaseProfiler's) read
+    # NaN for the ticks before they existed.
+    def __init__(self, path, model_reporters=None, chunk_size=10000):
+        super().__init__(model_reporters=model_reporters)
+        self.path = path
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self.dtypes = {}
+        os.makedirs(path, exist_ok=True)
+        self._write_meta()
+
+    def _column_path(self, name):
+        return os.path.join(self.path, name + ".bin")
+
+    def _write_meta(self):
+        tmp = os.path.join(self.path, META + ".part")
+        with open(tmp, "w") as f:
+            json.dump({"rows": self.rows, "columns": self.dtypes}, f)
+        os.replace(tmp, os.path.join(self.path, META))
+
+    def _pending(self):
+        # Rows collected since the last flush
+        return max((len(values) for values in self.model_vars.values()), default=0)
+
+    def collect(self, model):
+        super().collect(model)
+        if self._pending() >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        n = self._pending()
+        if not n:
+            return
+        for name, values in self.model_vars.items():
+            chunk = np.asarray(values)
+            first = name not in self.dtypes
+            # Rows from before the reporter was added, NaN on disk
+            missing = (self.rows if first else 0) + n - len(chunk)
+            mode = "ab"
+            if first:
+                if missing or chunk.dtype.kind == "f":
+                    self.dtypes[name] = "<f8"
+                elif chunk.dtype.kind in "biu":
+                    self.dtypes[name] = "<i8"
+                else:
+                    raise TypeError(f"Reporter {name!r} is not numeric ({chunk.dtype})")
+                mode = "wb"
+            elif missing:
+                raise ValueError(f"Reporter {name!r} missed {missing} of the last {n} rows")
+            with open(self._column_path(name), mode) as f:
+                if missing:
+                    f.write(np.full(missing, np.nan, dtype=self.dtypes[name]).tobytes())
+                f.write(chunk.astype(self.dtypes[name]).tobytes())
+            values.clear()
+        self.rows += n
+        self._write_meta()
+
+    def get_model_vars_dataframe(self):
+        self.flush()
+        return pd.DataFrame(read_columns(self.path))
+
+
+def read_columns(path):
+    # {column: read-only memmap} for everything a StreamingDataCollector
+    # has flushed to `path`
+    with open(os.path.join(path, META)) as f:
+        meta = json.load(f)
+    rows = meta["rows"]
+    columns = {}
+    for name, dtype in meta["columns"].items():
+        if rows:
+            columns[name] = np.memmap(os.path.join(path, name + ".bin"),
+                                      dtype=dtype, mode="r", shape=(rows,))
+        else:
+            columns[name] = np.empty(0, dtype=dtype)
+    return columns
@@ -0,0 +1,50 @@
+# compact.py
+# Building blocks for memory-light agents: a mesa.Agent stand-in with
+# __slots__, and string views over small integer codes.
+#
+#     class PersonAgent(SlottedAgent):
+#         __slots__ = ('shape_code', '_mood_code')
+#         mood_code = Tallied('moods', MOODS)
+#         mood = Coded('mood_code', MOODS)
+#
+# Hot loops compare the integer codes (agent.mood_code == ANGRY); portrayal,
+# reporting and checkpoints keep reading and writing the names
+# (agent.mood == 'angry').
+
+
+class SlottedAgent:
+    # Same interface as mesa.Agent, minus the per-instance __dict__. Mesa's
+    # schedulers and grids only need unique_id, pos and step(). Subclasses
+    # must declare __slots__ for every attribute they set.
+    __slots__ = ('unique_id', 'model', 'pos')
+
+    def __init__(self, unique_id, model):
+        self.unique_id = unique_id
+        self.model = model
+        self.pos = None
+
+    def step(self):
+        pass
+
+    def advance(self):
+        pass
+
+    @property
+    def random(self):
+        return self.model.random
+
+
+class Coded:
+    # Name view of an integer code attribute
+    def __init__(self, code_attr, names):
+        self.code_attr = code_attr
+        self.names = names
+        self.codes = {name: code for code, name in enumerate(names)}
+
+    def __get__(self, agent, owner=None):
+        if agent is None:
+            return self
+        return self.names[getattr(agent, self.code_attr)]
+
+    def __set__(self, agent, value):
+        setattr(agent, self.code_attr, self.codes[value])
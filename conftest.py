@@ -0,0 +1,2 @@
+# conftest.py
+# Lets pytest import the top-level modules when run from the repository root.
@@ -0,0 +1,45 @@
+# convergence.py
+import numpy as np
+
+
+class ConvergenceDetector:
+    # Stops a run once its mood fractions have settled.
+    #
+    # The model hands over its mood tally after every tick. The detector keeps
+    # the fractions of the last 2 * `window` ticks in a ring buffer and calls
+    # the run settled when, for every mood, the mean over the latest window
+    # differs from the mean over the window before it by at most `tolerance`
+    # (an absolute fraction, so 0.01 = one percentage point). It then records
+    # the tick in `converged_at` and sets model.running = False. Runs are
+    # never stopped before `min_ticks`. The agent models take one as
+    # `convergence=` and update it at the end of every tick.
+    def __init__(self, window=50, tolerance=0.01, min_ticks=0):
+        self.window = window
+        self.tolerance = tolerance
+        self.min_ticks = min_ticks
+        self.history = None
+        self.seen = 0
+        self.converged_at = None
+
+    def update(self, model, tally, keys):
+        total = tally.count or 1
+        fractions = np.array([tally[k] for k in keys], dtype=float) / total
+        size = 2 * self.window
+        if self.history is None:
+            self.history = np.empty((size, len(keys)))
+        self.history[self.seen % size] = fractions
+        self.seen += 1
+
+        if (self.converged_at is None and self.seen >= size
+                and model.schedule.steps >= self.min_ticks and self.drift() <= self.tolerance):
+            self.converged_at = model.schedule.steps
+            model.running = False
+        return self.converged_at is not None
+
+    def drift(self):
+        # Largest change of a mood's windowed mean between the two windows
+        size = 2 * self.window
+        order = (self.seen - 1 - np.arange(size)) % size
+        recent = self.history[order[:self.window]].mean(axis=0)
+        previous = self.history[order[self.window:]].mean(axis=0)
+        return float(np.abs(recent - previous).max())
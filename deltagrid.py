@@ -0,0 +1,108 @@
+# deltagrid.py
+import base64
+import json
+import os
+
+import numpy as np
+import tornado.escape
+from mesa.visualization.ModularVisualization import SocketHandler, VisualizationElement
+
+
+class DeltaCanvasGrid(VisualizationElement):
+    # Grid view that only sends the cells that changed since the last frame.
+    #
+    # Instead of a portrayal dict per agent, every agent maps to a style key
+    # through style_method(agent) (e.g. (shape, mood)); `palette` maps each key
+    # to a (shape, colour) pair and is shipped to the browser once. A frame is
+    # then two base64-encoded typed arrays: the flat indices (x * height + y) of
+    # the changed cells as uint32 and their new style codes as uint8 (0 means
+    # empty). render() returns the plain frame; DeltaSocketHandler keeps the
+    # last frame it sent on each connection and encodes the difference, so a
+    # browser's first frame (on connect or after its reset) is a full one.
+    # When several agents share a cell, the last one in schedule order is drawn.
+    package_includes = []
+    local_includes = ["DeltaCanvasModule.js"]
+    local_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+    def __init__(self, style_method, palette, grid_width, grid_height,
+                 canvas_width=500, canvas_height=500):
+        if len(palette) > 255:
+            raise ValueError("DeltaCanvasGrid supports at most 255 styles")
+        self.style_method = style_method
+        # Cached key -> code table, built once instead of per agent per tick
+        self.codes = {key: code for code, key in enumerate(palette, 1)}
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.canvas_width = canvas_width
+        self.canvas_height = canvas_height
+
+        styles = json.dumps([list(palette[key]) for key in palette])
+        new_element = "new DeltaCanvasModule({}, {}, {}, {}, {})".format(
+            canvas_width, canvas_height, grid_width, grid_height, styles)
+        self.js_code = "elements.push(" + new_element + ");"
+
+    def frame(self, model):
+        # Style code of every cell, flattened as x * height + y
+        cells = []
+        codes = []
+        height, style, table = self.grid_height, self.style_method, self.codes
+        for agent in model.schedule.agents:
+            if agent.pos is None:
+                continue
+            x, y = agent.pos
+            cells.append(x * height + y)
+            codes.append(table[style(agent)])
+        frame = np.zeros(self.grid_width * height, dtype=np.uint8)
+        frame[np.asarray(cells, dtype=np.int64)] = codes
+        return frame
+
+    def render(self, model):
+        return self.frame(model)
+
+
+def encode_delta(frame, last):
+    # Cells of `frame` that differ from `last`, the frame this browser holds
+    # (None: it holds nothing yet, send every occupied cell)
+    full = last is None
+    if full:
+        changed = np.flatnonzero(frame)
+    else:
+        changed = np.flatnonzero(frame != last)
+    return {
+        "full": full,
+        "cells": base64.b64encode(changed.astype("<u4").tobytes()).decode("ascii"),
+        "codes": base64.b64encode(frame[changed].tobytes()).decode("ascii"),
+    }
+
+
+class DeltaSocketHandler(SocketHandler):
+    # Websocket handler that turns the DeltaCanvasGrid frames of every
+    # viz_state into deltas against what this connection was sent last.
+    # Other elements pass through unchanged.
+    def open(self):
+        self.sent = {}  # element index -> last frame sent
+        super().open()
+
+    def encode(self, data):
+        data = list(data)
+        for i, item in enumerate(data):
+            if isinstance(item, np.ndarray):
+                data[i] = encode_delta(item, self.sent.get(i))
+                self.sent[i] = item
+        return data
+
+    def send_frame(self, data):
+        # data is a render_model() result, or None once the model has stopped
+        if data is None:
+            self.write_message({"type": "end"})
+        else:
+            self.write_message({"type": "viz_state", "data": self.encode(data)})
+
+    @property
+    def viz_state_message(self):
+        return {"type": "viz_state", "data": self.encode(self.application.render_model())}
+
+    def on_message(self, message):
+        if tornado.escape.json_decode(message)["type"] == "reset":
+            self.sent = {}  # the browser clears its canvas
+        super().on_message(message)
@@ -0,0 +1,222 @@
+# ensemble.py
+# Monte-Carlo ensembles of MediaModel. Every replicate runs in a worker
+# process and sends back its Angry/Scared/Neutral counts per tick; the parent
+# folds each one into streaming estimators (Welford mean/variance and P²
+# quantiles) and drops it, so memory is O(ticks) however many replicates run.
+#
+#   python -m ensemble --runs 500 --steps 200 --N 50 --out ensemble.csv
+import argparse
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from media import MediaModel
+
+SERIES = ("Angry", "Scared", "Neutral")
+STATES = ("angry", "scared", "neutral")
+
+
+class Welford:
+    # Running mean and variance of equally shaped arrays, element-wise
+    def __init__(self, shape):
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def merge(self, other):
+        # Chan et al. pairwise combination, for accumulators built separately
+        n = self.count + other.count
+        if n == 0:
+            return self
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.count / n
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / n
+        self.count = n
+        return self
+
+    @property
+    def variance(self):
+        # Sample variance (ddof=1)
+        if self.count < 2:
+            return np.full_like(self.mean, np.nan)
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+
+class P2Quantile:
+    # Jain & Chlamtac's P² estimate of the p-quantile, element-wise over
+    # equally shaped arrays: five markers per element, no samples kept.
+    def __init__(self, p, shape):
+        self.p = p
+        self.count = 0
+        self.q = np.zeros((5,) + tuple(shape))
+        column = (5,) + (1,) * len(shape)
+        self.rank = np.arange(5).reshape(column)
+        self.n = np.broadcast_to(self.rank.astype(float), self.q.shape).copy()
+        self.desired = np.array([0, 2 * p, 4 * p, 2 + 2 * p, 4]).reshape(column)
+        self.increment = np.array([0, p / 2, p, (1 + p) / 2, 1]).reshape(column)
+
+    def add(self, x):
+        x = np.asarray(x, dtype=float)
+        if self.count < 5:
+            self.q[self.count] = x
+            self.count += 1
+            if self.count == 5:
+                self.q.sort(axis=0)
+            return
+        self.count += 1
+        q, n = self.q, self.n
+
+        # Cell k holding x; the outer markers stretch to new extremes
+        np.minimum(q[0], x, out=q[0])
+        np.maximum(q[4], x, out=q[4])
+        k = (x >= q[1]).astype(int) + (x >= q[2]) + (x >= q[3])
+        n += self.rank > k
+        self.desired = self.desired + self.increment
+
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            move = ((d >= 1) & (n[i + 1] - n[i] > 1)) | ((d <= -1) & (n[i - 1] - n[i] < -1))
+            if not move.any():
+                continue
+            d = np.where(move, np.sign(d), 0.0)
+            left, right = n[i] - n[i - 1], n[i + 1] - n[i]
+            parabolic = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                (left + d) * (q[i + 1] - q[i]) / right
+                + (right - d) * (q[i] - q[i - 1]) / left)
+            # Fall back to linear interpolation when the parabola overshoots
+            neighbour = np.where(d > 0, q[i + 1], q[i - 1])
+            linear = q[i] + d * (neighbour - q[i]) / np.where(d > 0, right, -left)
+            ok = (q[i - 1] < parabolic) & (parabolic < q[i + 1])
+            q[i] = np.where(move, np.where(ok, parabolic, linear), q[i])
+            n[i] += d
+
+    @property
+    def value(self):
+        if self.count >= 5:
+            return self.q[2].copy()
+        if self.count == 0:
+            return np.full(self.q.shape[1:], np.nan)
+        # Too few samples for the markers: exact quantile of what we have
+        return np.quantile(self.q[:self.count], self.p, axis=0)
+
+
+class Ensemble:
+    # Per-tick statistics of the three mood series over many replicates
+    def __init__(self, steps, quantiles=(0.05, 0.5, 0.95)):
+        shape = (steps + 1, len(SERIES))
+        self.stats = Welford(shape)
+        self.quantiles = {p: P2Quantile(p, shape) for p in quantiles}
+
+    @property
+    def runs(self):
+        return self.stats.count
+
+    def add(self, counts):
+        self.stats.add(counts)
+        for estimator in self.quantiles.values():
+            estimator.add(counts)
+
+    def dataframe(self, z=1.96):
+        # One row per tick; "<series> mean/std/ci_low/ci_high/q<p>" columns.
+        # The ci columns are the normal band of the mean, the q columns the
+        # spread of single runs.
+        mean, std = self.stats.mean, self.stats.std
+        half = z * std / np.sqrt(max(self.runs, 1))
+        columns = {}
+        for j, name in enumerate(SERIES):
+            columns[f"{name} mean"] = mean[:, j]
+            columns[f"{name} std"] = std[:, j]
+            columns[f"{name} ci_low"] = mean[:, j] - half[:, j]
+            columns[f"{name} ci_high"] = mean[:, j] + half[:, j]
+            for p, estimator in self.quantiles.items():
+                columns[f"{name} q{p:g}"] = estimator.value[:, j]
+        df = pd.DataFrame(columns)
+        df.index.name = "tick"
+        return df
+
+
+def replicate(seed, steps, params):
+    # Mood counts of one run for ticks 0..steps, shape (steps + 1, 3)
+    model = MediaModel(**params, seed=seed)
+    counts = np.empty((steps + 1, len(STATES)))
+    counts[0] = [model.states[s] for s in STATES]
+    for t in range(1, steps + 1):
+        model.step()
+        counts[t] = [model.states[s] for s in STATES]
+    return counts
+
+
+def run_ensemble(runs, steps, params=None, quantiles=(0.05, 0.5, 0.95), workers=None,
+                 progress=None):
+    params = params or {}
+    seeds = range(runs) if isinstance(runs, int) else list(runs)
+    ensemble = Ensemble(steps, quantiles)
+    if workers == 1:
+        for i, seed in enumerate(seeds, 1):
+            ensemble.add(replicate(seed, steps, params))
+            if progress:
+                progress(i, len(seeds))
+        return ensemble
+
+    workers = workers or os.cpu_count()
+    total, seeds = len(seeds), iter(seeds)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Keep a bounded number of runs in flight so finished results never
+        # pile up in the parent
+        in_flight = set()
+        done_count = 0
+        while True:
+            for seed in seeds:
+                in_flight.add(pool.submit(replicate, seed, steps, params))
+                if len(in_flight) >= 2 * workers:
+                    break
+            if not in_flight:
+                break
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                ensemble.add(future.result())
+                done_count += 1
+                if progress:
+                    progress(done_count, total)
+    return ensemble
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte-Carlo ensemble of MediaModel runs")
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--N", type=int, default=50)
+    parser.add_argument("--width", type=int, default=20)
+    parser.add_argument("--height", type=int, default=20)
+    parser.add_argument("--quantiles", type=float, nargs="+", default=[0.05, 0.5, 0.95])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=None, help="write the per-tick statistics CSV here")
+    args = parser.parse_args()
+
+    params = {"N": args.N, "width": args.width, "height": args.height}
+    ensemble = run_ensemble(args.runs, args.steps, params, args.quantiles, args.workers)
+    df = ensemble.dataframe()
+    if args.out:
+        df.to_csv(args.out)
+
+    last = df.iloc[-1]
+    print(f"runs: {ensemble.runs}")
+    for name in SERIES:
+        print(f"final {name.lower()}: {last[f'{name} mean']:.2f} "
+              f"[{last[f'{name} ci_low']:.2f}, {last[f'{name} ci_high']:.2f}]")
+
+
+if __name__ == "__main__":
+    main()
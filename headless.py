@@ -0,0 +1,97 @@
+# headless.py
+# Browser-free runner for the "We Become What We Behold" model. Only the
+# model module is imported (no portrayal, CanvasGrid or ModularServer), so it
+# is cheap to import in CI and on compute nodes.
+#
+#   python -m headless --seeds 100 --steps 200 --N 100 --width 20 --height 20
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from wbwwb import WBWWBModel
+
+
+def run(seed, steps, N=100, width=20, height=20, saturation=1.0):
+    # Angry/happy fractions for ticks 0..steps and the first tick at which the
+    # angry fraction reached `saturation` (None if it never did)
+    model = WBWWBModel(N, width, height, seed=seed)
+    angry = np.empty(steps + 1)
+    happy = np.empty(steps + 1)
+    angry[0] = model.states["angry"] / N
+    happy[0] = model.states["happy"] / N
+    for t in range(1, steps + 1):
+        model.step()
+        angry[t] = model.states["angry"] / N
+        happy[t] = model.states["happy"] / N
+
+    saturated = np.flatnonzero(angry >= saturation)
+    saturation_tick = int(saturated[0]) if len(saturated) else None
+    return seed, angry, happy, saturation_tick
+
+
+def _run(job):
+    return run(*job)
+
+
+def run_many(seeds, steps, N=100, width=20, height=20, saturation=1.0, workers=None):
+    jobs = [(seed, steps, N, width, height, saturation) for seed in seeds]
+    if workers == 1:
+        return [_run(job) for job in jobs]
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Hand out seeds in chunks so short runs are not dominated by IPC
+        chunksize = max(1, len(jobs) // (4 * workers))
+        return list(pool.map(_run, jobs, chunksize=chunksize))
+
+
+def summarize(results):
+    angry = np.stack([r[1] for r in results])
+    happy = np.stack([r[2] for r in results])
+    ticks = [r[3] for r in results if r[3] is not None]
+    return {
+        "runs": len(results),
+        "angry_mean": angry.mean(axis=0).tolist(),
+        "angry_std": angry.std(axis=0).tolist(),
+        "happy_mean": happy.mean(axis=0).tolist(),
+        "happy_std": happy.std(axis=0).tolist(),
+        "saturated_fraction": len(ticks) / len(results),
+        "saturation_tick_mean": float(np.mean(ticks)) if ticks else None,
+        "saturation_tick_median": float(np.median(ticks)) if ticks else None,
+        "saturation_tick_max": max(ticks) if ticks else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless WBWWB model runs")
+    parser.add_argument("--seeds", type=int, default=100)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--N", type=int, default=100)
+    parser.add_argument("--width", type=int, default=20)
+    parser.add_argument("--height", type=int, default=20)
+    parser.add_argument("--saturation", type=float, default=1.0,
+                        help="angry fraction that counts as saturated")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=None, help="write the summary JSON here")
+    args = parser.parse_args()
+
+    results = run_many(range(args.seeds), args.steps, args.N, args.width, args.height,
+                       args.saturation, args.workers)
+    summary = summarize(results)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(summary, f)
+
+    print(f"runs: {summary['runs']}")
+    print(f"final angry fraction: {summary['angry_mean'][-1]:.3f} "
+          f"+/- {summary['angry_std'][-1]:.3f}")
+    print(f"final happy fraction: {summary['happy_mean'][-1]:.3f} "
+          f"+/- {summary['happy_std'][-1]:.3f}")
+    print(f"saturated runs: {summary['saturated_fraction']:.0%}, "
+          f"median time to saturation: {summary['saturation_tick_median']}")
+
+
+if __name__ == "__main__":
+    main()
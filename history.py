@@ -0,0 +1,66 @@
+# history.py
+import numpy as np
+
+
+class RingBuffer:
+    # Fixed-size history for a whole population: one row per agent, one
+    # column per remembered tick, preallocated once.
+    #
+    # append() writes a full column (one value per agent) over the oldest one,
+    # so remembering costs O(1) per agent and never shifts data the way
+    # list.pop(0) does. A running per-row sum makes mean() O(agents) no matter
+    # the capacity (it is recomputed on every wrap-around so rounding errors
+    # cannot pile up); the other statistics work on any trailing window.
+    def __init__(self, rows, capacity, dtype=float):
+        self.data = np.zeros((rows, capacity), dtype=dtype)
+        self.capacity = capacity
+        self.head = 0  # next column to write
+        self.filled = 0
+        self.total = np.zeros(rows)
+
+    def __len__(self):
+        return self.filled
+
+    def append(self, values):
+        column = self.data[:, self.head]
+        if self.filled == self.capacity:
+            self.total -= column
+        else:
+            self.filled += 1
+        column[:] = values
+        self.total += column
+        self.head = (self.head + 1) % self.capacity
+        if self.head == 0:
+            self.total = self.data.sum(axis=1)
+
+    def latest(self):
+        if not self.filled:
+            raise IndexError("empty RingBuffer")
+        return self.data[:, self.head - 1]
+
+    def columns(self, window=None):
+        # Column indices of the last `window` entries, oldest first
+        window = self.filled if window is None else min(window, self.filled)
+        return (self.head - window + np.arange(window)) % self.capacity
+
+    def window(self, window=None):
+        # (rows, window) copy of the last `window` entries, oldest first
+        return self.data[:, self.columns(window)]
+
+    def mean(self, window=None):
+        if window is None or window >= self.filled:
+            return self.total / max(self.filled, 1)
+        return self.window(window).mean(axis=1)
+
+    def std(self, window=None):
+        return self.window(window).std(axis=1)
+
+    def histogram(self, scale=10, low=-1.0, high=1.0):
+        # Counts and value sums of the latest column per level, where a value
+        # v falls on level round(v * scale); levels run from low to high
+        levels = np.round(self.latest() * scale).astype(np.int64)
+        first, size = int(round(low * scale)), int(round((high - low) * scale)) + 1
+        index = np.clip(levels - first, 0, size - 1)
+        counts = np.bincount(index, minlength=size)
+        sums = np.bincount(index, weights=self.latest(), minlength=size)
+        return counts, sums
@@ -0,0 +1,159 @@
+# liveserver.py
+import threading
+import time
+
+import tornado.escape
+import tornado.ioloop
+from mesa.visualization.ModularVisualization import ModularServer, TextElement
+
+from deltagrid import DeltaSocketHandler
+
+
+class TicksPerSecond(TextElement):
+    # Live simulation speed, as measured by the background worker
+    def render(self, model):
+        tps = getattr(model, "ticks_per_second", 0.0)
+        tick = model.schedule.steps if model.schedule is not None else 0
+        return f"Tick {tick:,} | {tps:,.0f} ticks/s"
+
+
+class SimulationWorker(threading.Thread):
+    # Steps the model as fast as it can. Between two ticks it checks whether
+    # any viewer is waiting for a frame and, if the sampling rules allow it,
+    # renders one snapshot and hands it to the IO loop. Viewers only ever
+    # wait for the worker, never the other way round. Once no frame has been
+    # asked for in `idle_timeout` seconds (the browser was paused) it sleeps
+    # on server.wanted until the next request; stop() ends it.
+    def __init__(self, server):
+        super().__init__(daemon=True)
+        self.server = server
+        self.stopped = threading.Event()
+
+    def run(self):
+        server = self.server
+        model = server.model
+        tick = 0
+        last_frame = 0.0
+        window_start, window_ticks = time.perf_counter(), 0
+        while not self.stopped.is_set() and model.running:
+            if (not server.wanted.is_set()
+                    and time.perf_counter() - last_frame >= server.idle_timeout):
+                server.wanted.wait()
+                window_start, window_ticks = time.perf_counter(), 0
+                continue
+            model.step()
+            tick += 1
+            window_ticks += 1
+
+            now = time.perf_counter()
+            if now - window_start >= 0.5:
+                model.ticks_per_second = window_ticks / (now - window_start)
+                window_start, window_ticks = now, 0
+
+            if (server.waiting and tick % server.sample_every == 0
+                    and now - last_frame >= server.min_frame_interval):
+                server.publish(server.render_model())
+                last_frame = now
+        if not model.running:
+            server.publish(None)
+
+    def stop(self):
+        self.stopped.set()
+        self.server.wanted.set()  # wake it if it is paused
+        self.join()
+
+
+class LiveSocketHandler(DeltaSocketHandler):
+    # get_step no longer advances the model; it asks for the next frame
+    def open(self):
+        super().open()
+        self.application.connect(self)
+
+    def on_close(self):
+        self.application.disconnect(self)
+
+    def on_message(self, message):
+        msg = tornado.escape.json_decode(message)
+        if msg["type"] == "get_step":
+            self.application.request_frame(self, tornado.ioloop.IOLoop.current())
+        elif msg["type"] == "reset":
+            self.application.stop_worker()
+            self.application.reset_model()
+            self.sent = {}
+            self.write_message(self.viz_state_message)
+        else:
+            super().on_message(message)
+
+
+class LiveModularServer(ModularServer):
+    # ModularServer whose model runs in a background thread at full speed.
+    #
+    # The browser's start/step buttons only start the worker and request
+    # frames; frames are sampled at most every `sample_every` ticks and at
+    # most `max_fps` times per second, and a ticks-per-second readout is
+    # added below the other elements. The worker only lives while a browser
+    # is connected: it is stopped and joined when the last one disconnects,
+    # on reset and when the server shuts down.
+    def __init__(self, model_cls, visualization_elements, name="Mesa Model",
+                 model_params=None, port=None, sample_every=1, max_fps=30,
+                 idle_timeout=1.0):
+        self.sample_every = max(1, sample_every)
+        self.min_frame_interval = 1.0 / max_fps if max_fps else 0.0
+        self.idle_timeout = idle_timeout
+        self.worker = None
+        self.clients = set()
+        # Set while a frame request is outstanding
+        self.wanted = threading.Event()
+        self._lock = threading.Lock()
+        self._waiting = []
+        super().__init__(model_cls, list(visualization_elements) + [TicksPerSecond()],
+                         name, model_params, port)
+        # Rules added later take precedence over the stock /ws handler
+        self.add_handlers(r".*", [(r"/ws", LiveSocketHandler)])
+
+    @property
+    def waiting(self):
+        return bool(self._waiting)
+
+    def launch(self, port=None, open_browser=True):
+        try:
+            super().launch(port, open_browser)
+        finally:
+            self.stop_worker()
+
+    def connect(self, handler):
+        self.clients.add(handler)
+
+    def disconnect(self, handler):
+        self.clients.discard(handler)
+        with self._lock:
+            self._waiting = [(h, loop) for h, loop in self._waiting if h is not handler]
+        if not self.clients:
+            self.stop_worker()
+
+    def request_frame(self, handler, loop):
+        if not self.model.running:
+            handler.write_message({"type": "end"})
+            return
+        with self._lock:
+            self._waiting.append((handler, loop))
+            self.wanted.set()
+        if self.worker is None or not self.worker.is_alive():
+            self.worker = SimulationWorker(self)
+            self.worker.start()
+
+    def publish(self, frame):
+        # Called from the worker thread; deliver on each viewer's IO loop
+        with self._lock:
+            waiting, self._waiting = self._waiting, []
+            self.wanted.clear()
+        for handler, loop in waiting:
+            loop.add_callback(handler.send_frame, frame)
+
+    def stop_worker(self):
+        if self.worker is not None:
+            self.worker.stop()
+            self.worker = None
+        with self._lock:
+            self._waiting = []
+            self.wanted.clear()
@@ -1,73 +1,6 @@
-from mesa import Agent, Model
-from mesa.time import RandomActivation
-from mesa.space import MultiGrid
-from mesa.visualization.modules import CanvasGrid
-from mesa.visualization.ModularVisualization import ModularServer
+import sys
 
-class PersonAgent(Agent):
-    def __init__(self, unique_id, model):
-        super().__init__(unique_id, model)
-        self.state = "neutral"
-        self.shape = "circle"
-        self.color = "grey"
-
-    def step(self):
-        self.move()
-        self.interact()
-
-    def move(self):
-        # Move to a random neighboring cell
-        possible_steps = self.model.grid.get_neighborhood(
-            self.pos,
-            moore=True,
-            include_center=False)
-        new_position = self.random.choice(possible_steps)
-        self.model.grid.move_agent(self, new_position)
-
-    def interact(self):
-        # Interact with neighbors
-        cellmates = self.model.grid.get_cell_list_contents([self.pos])
-        if len(cellmates) > 1:
-            for other in cellmates:
-                if other != self:
-                    if other.state == "angry" and self.state != "angry":
-                        self.state = "angry"
-                        self.shape = "triangle"
-                        self.color = "red"
-                    elif other.state == "happy" and self.state != "happy":
-                        self.state = "happy"
-                        self.shape = "square"
-                        self.color = "green"
-
-class WBWWBModel(Model):
-    def __init__(self, N, width, height):
-        self.num_agents = N
-        self.grid = MultiGrid(width, height, torus=True)
-        self.schedule = RandomActivation(self)
-        self.running = True
-
-        # Create agents
-        for i in range(self.num_agents):
-            a = PersonAgent(i, self)
-            self.schedule.add(a)
-            x = self.random.randrange(self.grid.width)
-            y = self.random.randrange(self.grid.height)
-            self.grid.place_agent(a, (x, y))
-
-        self.media_counter = 0
-
-    def step(self):
-        self.schedule.step()
-        self.media_influence()
-
-    def media_influence(self):
-        # Media highlights an angry interaction every 5 steps
-        if self.media_counter % 5 == 0:
-            agent = self.random.choice(self.schedule.agents)
-            agent.state = "angry"
-            agent.shape = "triangle"
-            agent.color = "red"
-        self.media_counter += 1
+from wbwwb import PersonAgent, WBWWBModel
 
 def agent_portrayal(agent):
     portrayal = {
@@ -79,12 +12,53 @@ def agent_portrayal(agent):
     }
     return portrayal
 
-grid = CanvasGrid(agent_portrayal, 20, 20, 500, 500)
+# (shape, color) -> (canvas shape, colour) for the delta grid
+PALETTE = {
+    ("circle", "grey"): ("circle", "grey"),
+    ("triangle", "red"): ("triangle", "red"),
+    ("square", "green"): ("rect", "green"),
+}
+
+def agent_style(agent):
+    return (agent.shape, agent.color)
+
+def make_server(delta=False, live=False, sample_every=1, max_fps=30):
+    from mesa.visualization.ModularVisualization import ModularServer
+
+    # delta=True streams only the cells that changed since the last frame
+    if delta:
+        from deltagrid import DeltaCanvasGrid
+        grid = DeltaCanvasGrid(agent_style, PALETTE, 20, 20, 500, 500)
+    else:
+        from mesa.visualization.modules import CanvasGrid
+        grid = CanvasGrid(agent_portrayal, 20, 20, 500, 500)
+
+    if live:
+        # Run the model in a background thread and sample frames from it
+        from liveserver import LiveModularServer
+        server = LiveModularServer(WBWWBModel,
+                                   [grid],
+                                   "We Become What We Behold Model",
+                                   {"N": 100, "width": 20, "height": 20},
+                                   sample_every=sample_every,
+                                   max_fps=max_fps)
+    else:
+        server = ModularServer(WBWWBModel,
+                               [grid],
+                               "We Become What We Behold Model",
+                               {"N": 100, "width": 20, "height": 20})
+        if delta:
+            # Deltas are kept per browser connection
+            from deltagrid import DeltaSocketHandler
+            server.add_handlers(r".*", [(r"/ws", DeltaSocketHandler)])
+    return server
 
-server = ModularServer(WBWWBModel,
-                       [grid],
-                       "We Become What We Behold Model",
-                       {"N": 100, "width": 20, "height": 20})
+def __getattr__(name):
+    # Build the ModularServer only when somebody asks for it
+    if name == "server":
+        globals()["server"] = make_server()
+        return globals()["server"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
-    server.launch()
+    make_server(delta="--delta" in sys.argv, live="--live" in sys.argv).launch()
@@ -0,0 +1,290 @@
+# meanfield.py
+# Mean-field screening of MediaSimulation and EmotionalBalanceModel. Instead
+# of simulating agents, the mood fractions are iterated as difference
+# equations, for thousands of parameter points at once (every argument may be
+# an array; they broadcast against each other). A sweep that takes hours of
+# agent runs takes well under a second here, so the cheap pass can map the
+# whole grid and full agent runs (batch.py) go to the interesting region only.
+# calibrate() measures how far the approximation is from the agent models.
+#
+#   python -m meanfield --model media --N 50 100 200 400 \
+#       --conflict_probability 0.05 0.1 0.2 0.3 --calm_probability 0.05 0.1 0.2 \
+#       --out screen.csv
+#   python -m meanfield --model balance --decay_rate 0.05 0.1 0.2 --calibrate --seeds 5
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from batch import expand
+from codes import EMOTIONS, MOODS
+from model import MediaSimulation
+from New.main import EmotionalBalanceModel
+
+
+def binomial_pmf(n, r, size):
+    # P(K = k) for K ~ Binomial(n, r), k = 0..size-1, one row per point.
+    # Built in log space so large n does not underflow (1 - r) ** n.
+    n, r = np.asarray(n, dtype=float)[:, None], np.asarray(r, dtype=float)[:, None]
+    k = np.arange(size - 1)
+    with np.errstate(divide="ignore"):
+        steps = np.log(np.maximum(n - k, 0)) - np.log(k + 1) + np.log(r) - np.log1p(-r)
+    log_pmf = np.concatenate([n * np.log1p(-r), steps], axis=1)
+    pmf = np.exp(np.cumsum(log_pmf, axis=1))
+    return pmf / pmf.sum(axis=1, keepdims=True)
+
+
+def _support(n, r):
+    # Enough terms for all points: the mean plus ten standard deviations
+    return int(np.max(n * r + 10 * np.sqrt(n * r * (1 - r)))) + 12
+
+
+def media_simulation(N, width, height, conflict_probability=0.3, calm_probability=0.1,
+                     steps=100):
+    # Neutral/angry/scared fractions of MediaSimulation for ticks 0..steps,
+    # shape (steps + 1, points, 3), everyone neutral at tick 0.
+    #
+    # Agents move every tick, so neighbourhoods are treated as redrawn each
+    # tick: another agent is a different-shape Moore neighbour with
+    # probability r = 8 / cells * 1/2, and an agent has m ~ Binomial(N - 1, r)
+    # of them. Given m it starts a conflict (-> angry) with probability
+    # c = 1 - (1 - p)^m. Pair term: each of those neighbours has 1 +
+    # Binomial(N - 2, r) different-shape neighbours itself, so it picks the
+    # agent as its target (-> scared) at rate m * E[c_j / m_j]. Within a tick
+    # the last write wins, with the agent's own step and the targeting events
+    # at uniform random times (RandomActivation). Calming down (probability
+    # calm_probability) only happens when the agent starts no conflict.
+    N, cells, p, d = np.broadcast_arrays(
+        np.atleast_1d(N).astype(float), np.atleast_1d(width * np.asarray(height)).astype(float),
+        np.atleast_1d(conflict_probability).astype(float),
+        np.atleast_1d(calm_probability).astype(float))
+    r = np.minimum(4 / cells, 1.0)
+    size = _support(N, r)
+    m = np.arange(size)
+    pm = binomial_pmf(N - 1, r, size)
+    pj = binomial_pmf(np.maximum(N - 2, 0), r, size)
+    p, d = p[:, None], d[:, None]
+
+    c = 1 - (1 - p) ** m
+    per_neighbour = np.sum(pj * (1 - (1 - p) ** (m + 1)) / (m + 1), axis=1, keepdims=True)
+    rate = m * per_neighbour
+    untouched = np.exp(-rate)  # not targeted at all this tick
+    # P(not targeted after the agent's own step) = (1 - e^-rate) / rate
+    not_after = np.where(rate > 0, -np.expm1(-rate) / np.where(rate > 0, rate, 1), 1.0)
+
+    # The map is linear: n' = n0 + keep * n, a' = a0 + keep * a, s = 1 - n - a,
+    # where keep is the chance that nothing at all happens to an upset agent
+    n0 = np.sum(pm * (1 - c) * not_after * d, axis=1)
+    a0 = np.sum(pm * c * not_after, axis=1)
+    keep = np.sum(pm * (1 - c) * untouched * (1 - d), axis=1)
+
+    out = np.empty((steps + 1, len(N), len(MOODS)))
+    neutral, angry = np.ones(len(N)), np.zeros(len(N))
+    for t in range(steps + 1):
+        out[t, :, 0] = neutral
+        out[t, :, 1] = angry
+        neutral, angry = n0 + keep * neutral, a0 + keep * angry
+    out[:, :, 2] = 1 - out[:, :, 0] - out[:, :, 1]
+    return out
+
+
+def emotional_balance(num_agents, width, height, decay_rate=0.1, cooldown_period=5,
+                      neutral_fraction=0.2, extreme_fraction=0.1, steps=100):
+    # Neutral/happy/angry/fearful fractions of EmotionalBalanceModel for ticks
+    # 0..steps, shape (steps + 1, points, 4), uniform emotions at tick 0.
+    #
+    # Humans never move, so every agent keeps its number of human neighbours
+    # k ~ Binomial(num_agents - 1, 8 / cells) and picks a human partner with
+    # a fixed probability h: 0 when isolated, 1 when connected, k / (k + 1)
+    # next to the media agent. That gives three classes; the few agents next
+    # to the media agent share the mean h of their class. The media agent's
+    # cooldown is a Markov chain (0.5 neutral broadcast, 0.25 extreme
+    # broadcast then `cooldown_period` silent ticks), tracked jointly with the
+    # emotions. Each human steps before or after the broadcast with
+    # probability 1/2.
+    (num_agents, cells, decay, cooldown, neutral_fraction,
+     extreme_fraction) = np.broadcast_arrays(
+        np.atleast_1d(num_agents).astype(float),
+        np.atleast_1d(width * np.asarray(height)).astype(float),
+        np.atleast_1d(decay_rate).astype(float), np.atleast_1d(cooldown_period).astype(int),
+        np.atleast_1d(neutral_fraction).astype(float), np.atleast_1d(extreme_fraction).astype(float))
+    points = len(num_agents)
+    r = np.minimum(8 / cells, 1.0)
+    n = num_agents - 1
+    isolated = (1 - r) ** n
+    # E[k / (k + 1)] = 1 - E[1 / (k + 1)], closed form for the binomial
+    near_media_h = 1 - (1 - (1 - r) ** (n + 1)) / ((n + 1) * r)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # A lone agent has no class but the isolated one; rounding would
+        # otherwise blow 0 / 0 up to a huge h
+        near_media_h = np.where(isolated < 1, near_media_h / (1 - isolated), 0.0)
+    weights = np.stack([isolated, (1 - isolated) * (1 - r), (1 - isolated) * r], axis=1)
+    h = np.stack([np.zeros(points), np.ones(points), near_media_h], axis=1)
+
+    # Human step, per class: decay towards neutral, then a neutral agent may
+    # be excited by its partner (0.3 happy, 0.3 angry)
+    neutral, happy, angry, fearful = range(len(EMOTIONS))
+    d = decay[:, None]
+    excite = np.zeros(h.shape + (4,))
+    excite[..., neutral] = 1 - 0.6 * h
+    excite[..., happy] = 0.3 * h
+    excite[..., angry] = 0.3 * h
+    human = np.zeros(h.shape + (4, 4))
+    human[..., neutral, :] = excite
+    for state in (happy, angry, fearful):
+        human[..., state, :] = d[..., None] * excite
+        human[..., state, state] += 1 - d
+
+    def broadcast_matrix(fraction, targets):
+        # Reached agents (share `fraction`) jump to `targets`, the rest stay
+        b = np.eye(4) * (1 - fraction)[:, None, None]
+        for state, share in targets.items():
+            b[:, :, state] += fraction[:, None] * share
+        return b[:, None]
+
+    def around(b):
+        return 0.5 * (human @ b + b @ human)
+
+    quiet = human
+    neutral_news = around(broadcast_matrix(neutral_fraction, {neutral: 1.0}))
+    extreme_news = around(broadcast_matrix(extreme_fraction, {angry: 0.5, fearful: 0.5}))
+
+    def apply(x, transition):
+        # Row vectors of emotion probabilities times their transition matrices
+        return (x[..., None, :] @ transition)[..., 0, :]
+
+    # x[point, cooldown, class, emotion]: probability mass, joint with the
+    # media agent's remaining cooldown
+    states = int(cooldown.max()) + 1
+    x = np.zeros((points, states, h.shape[1], 4))
+    x[:, 0] = 0.25
+    rows = np.arange(points)
+    out = np.empty((steps + 1, points, len(EMOTIONS)))
+    for t in range(steps + 1):
+        out[t] = (weights[:, :, None] * x.sum(axis=1)).sum(axis=1)
+        active = x[:, 0]
+        new = np.zeros_like(x)
+        new[:, :-1] = apply(x[:, 1:], quiet[:, None])
+        new[:, 0] += 0.5 * apply(active, neutral_news) + 0.25 * apply(active, quiet)
+        new[rows, cooldown] += 0.25 * apply(active, extreme_news)
+        x = new
+    return out
+
+
+# name: (agent model, mean-field solver, state names, default parameters)
+MODELS = {
+    "media": (MediaSimulation, media_simulation, MOODS, {
+        "N": [100], "width": [20], "height": [20],
+        "conflict_probability": [0.3], "calm_probability": [0.1]}),
+    "balance": (EmotionalBalanceModel, emotional_balance, EMOTIONS, {
+        "num_agents": [100], "width": [20], "height": [20], "decay_rate": [0.1],
+        "cooldown_period": [5], "neutral_fraction": [0.2], "extreme_fraction": [0.1]}),
+}
+
+
+def solve(model, points, steps):
+    # Mean-field trajectories for a list of parameter dicts,
+    # shape (steps + 1, len(points), states)
+    solver = MODELS[model][1]
+    names = list(points[0])
+    return solver(**{name: np.array([point[name] for point in points]) for name in names},
+                  steps=steps)
+
+
+def screen(model, grid, steps=100, tail=20):
+    # Every point of the parameter grid with its mean-field fractions
+    # averaged over the last `tail` ticks; one row per point
+    points = expand(grid)
+    fractions = solve(model, points, steps)[-tail:].mean(axis=0)
+    df = pd.DataFrame(points)
+    for j, state in enumerate(MODELS[model][2]):
+        df[state] = fractions[:, j]
+    return df
+
+
+def agent_run(model, params, seed, steps):
+    # State fractions of one agent-model run for ticks 0..steps
+    model_cls, _, states, _ = MODELS[model]
+    sim = model_cls(**params, seed=seed)
+    tally = sim.moods if model == "media" else sim.emotions
+    out = np.empty((steps + 1, len(states)))
+    for t in range(steps + 1):
+        if t:
+            sim.step()
+        out[t] = [tally[s] for s in states]
+    return out / max(tally.count, 1)
+
+
+def calibrate(model, grid, seeds=5, steps=100, tail=20, workers=None):
+    # Mean-field against agent runs for every point of `grid`. One row per
+    # point: the parameters, then per state the mean-field value, the agent
+    # mean and standard deviation over seeds (all averaged over the last
+    # `tail` ticks), their difference and the RMS difference of the whole
+    # mean trajectories.
+    states = MODELS[model][2]
+    points = expand(grid)
+    predicted = solve(model, points, steps)
+    jobs = [(model, params, seed, steps) for params in points for seed in range(seeds)]
+    if workers == 1:
+        runs = [agent_run(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            runs = list(pool.map(agent_run, *zip(*jobs)))
+    runs = np.array(runs).reshape(len(points), seeds, steps + 1, len(states))
+
+    df = pd.DataFrame(points)
+    final = runs[:, :, -tail:].mean(axis=2)  # (points, seeds, states)
+    for j, state in enumerate(states):
+        mf = predicted[-tail:, :, j].mean(axis=0)
+        df[f"{state} mf"] = mf
+        df[f"{state} agents"] = final[:, :, j].mean(axis=1)
+        df[f"{state} sd"] = final[:, :, j].std(axis=1, ddof=1) if seeds > 1 else np.nan
+        df[f"{state} error"] = mf - df[f"{state} agents"]
+        trajectory = runs[:, :, :, j].mean(axis=1) - predicted[:, :, j].T
+        df[f"{state} rmse"] = np.sqrt((trajectory ** 2).mean(axis=1))
+    return df
+
+
+def report(df, model):
+    lines = [f"{len(df)} parameter points"]
+    for state in MODELS[model][2]:
+        error = df[f"{state} error"].abs()
+        lines.append(f"{state:>8}: mean |error| {error.mean():.3f}, max {error.max():.3f}, "
+                     f"mean trajectory rmse {df[f'{state} rmse'].mean():.3f}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mean-field screening of the agent models")
+    parser.add_argument("--model", choices=sorted(MODELS), default="media")
+    names = {name for _, _, _, defaults in MODELS.values() for name in defaults}
+    for name in sorted(names):
+        kind = int if name in ("N", "num_agents", "width", "height", "cooldown_period") else float
+        parser.add_argument(f"--{name}", type=kind, nargs="+", default=None)
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--tail", type=int, default=20, help="average the last TAIL ticks")
+    parser.add_argument("--calibrate", action="store_true",
+                        help="also run the agent model at every point and compare")
+    parser.add_argument("--seeds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=None, help="write the table as CSV here")
+    args = parser.parse_args()
+
+    grid = {name: getattr(args, name) or values
+            for name, values in MODELS[args.model][3].items()}
+    if args.calibrate:
+        df = calibrate(args.model, grid, args.seeds, args.steps, args.tail, args.workers)
+    else:
+        df = screen(args.model, grid, args.steps, args.tail)
+    if args.out:
+        df.to_csv(args.out, index=False)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(df.round(3).to_string(index=False))
+    if args.calibrate:
+        print(report(df, args.model))
+
+
+if __name__ == "__main__":
+    main()
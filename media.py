@@ -0,0 +1,110 @@
+# media.py
+import mesa
+from rng import seed_model
+from tally import MoodTally, Tallied
+from collection import StreamingDataCollector
+from profiling import PhaseProfiler
+from compact import Coded, SlottedAgent
+from codes import SHAPES, MOODS, NEUTRAL, ANGRY, SCARED
+
+class PersonAgent(SlottedAgent):
+    # Type and state are stored as small integer codes (see codes.SHAPES
+    # and MOODS); .type and .state are the readable names
+    __slots__ = ('type_code', '_state_code')
+    state_code = Tallied('states', MOODS)
+    type = Coded('type_code', SHAPES)
+    state = Coded('state_code', MOODS)
+
+    def __init__(self, unique_id, model):
+        super().__init__(unique_id, model)
+        self.type = self.random.choice(['square', 'circle'])
+        self.state = 'neutral'
+
+    PHASES = {'move': 'move', 'neighbors': 'neighbor query',
+              'conflict': 'interaction', 'cool_down': 'decay'}
+        
+    def step(self):
+        # Ensure movement happens
+        self.move()
+        self.interact()
+        
+    def move(self):
+        possible_steps = self.model.grid.get_neighborhood(
+            self.pos, moore=True, include_center=False
+        )
+        if possible_steps:  # Make sure there are available steps
+            new_position = self.random.choice(possible_steps)
+            self.model.grid.move_agent(self, new_position)
+    
+    def neighbors(self):
+        # Get all neighbors in the current cell and adjacent cells
+        return self.model.grid.iter_neighbors(
+            self.pos, moore=True, include_center=False
+        )
+
+    def interact(self):
+        if self.conflict(self.neighbors()):
+            return
+        self.cool_down()
+
+    def conflict(self, neighbors):
+        # Interact with neighbors if there are any
+        kind = self.type_code
+        for neighbor in neighbors:
+            if neighbor.type_code != kind:  # Different types interact
+                # Increased probability of interaction
+                if self.random.random() < 0.5:  # 50% chance of interaction
+                    self.state_code = ANGRY
+                    neighbor.state_code = SCARED
+                    return True
+        return False
+
+    def cool_down(self):
+        # Cool down process - gradual return to neutral (reads the slot
+        # behind state_code directly)
+        if self._state_code != NEUTRAL:
+            if self.random.random() < 0.2:  # 20% chance to return to neutral
+                self.state_code = NEUTRAL
+
+class MediaModel(mesa.Model):
+    def __init__(self, N=50, width=20, height=20, grid_class=mesa.space.MultiGrid,
+                 collector_path=None, seed=None, profile=False,
+                 convergence=None):
+        seed_model(self, seed)
+        self.num_agents = N
+        self.grid = grid_class(width, height, True)
+        self.schedule = mesa.time.RandomActivation(self)
+        self.running = True  # Ensure the model keeps running
+        self.states = MoodTally()
+        self.convergence = convergence
+        
+        # Create and place agents
+        for i in range(self.num_agents):
+            agent = PersonAgent(i, self)
+            # Place agents randomly on the grid
+            x = self.random.randrange(self.grid.width)
+            y = self.random.randrange(self.grid.height)
+            self.grid.place_agent(agent, (x, y))
+            self.schedule.add(agent)
+        
+        # Data collector for the charts
+        model_reporters = {
+            "Angry": lambda m: m.states["angry"],
+            "Scared": lambda m: m.states["scared"],
+            "Neutral": lambda m: m.states["neutral"]
+        }
+        if collector_path is None:
+            self.datacollector = mesa.DataCollector(model_reporters=model_reporters)
+        else:
+            # Stream the series to disk in chunks for very long runs
+            self.datacollector = StreamingDataCollector(
+                collector_path, model_reporters=model_reporters)
+
+        if profile:
+            PhaseProfiler().attach(self)
+    
+    def step(self):
+        self.datacollector.collect(self)
+        self.schedule.step()
+        if self.convergence is not None:
+            self.convergence.update(self, self.states, ('neutral', 'angry', 'scared'))
@@ -1,67 +1,201 @@
 # model.py
-from mesa import Agent, Model
-from mesa.time import RandomActivation
+import math
+
+from mesa import Model
+from mesa.time import RandomActivation, StagedActivation
 from mesa.space import MultiGrid
 from mesa.datacollection import DataCollector
-import random
+from rng import seed_model
+from tally import MoodTally, Tallied
+from collection import StreamingDataCollector
+from profiling import PhaseProfiler
+from compact import Coded, SlottedAgent
+from codes import SHAPES, MOODS, NEUTRAL, ANGRY, SCARED
+from network import NetworkSpace
+
+class PersonAgent(SlottedAgent):
+    # Shape and mood are stored as small integer codes (see codes.SHAPES
+    # and MOODS); .shape and .mood are the readable names
+    __slots__ = ('shape_code', '_mood_code', 'news_influenced', 'next_mood_code',
+                 'next_priority')
+    mood_code = Tallied('moods', MOODS)
+    shape = Coded('shape_code', SHAPES)
+    mood = Coded('mood_code', MOODS)
 
-class PersonAgent(Agent):
     def __init__(self, unique_id, model, shape):
         super().__init__(unique_id, model)
         self.shape = shape  # 'square' or 'circle'
         self.mood = 'neutral'  # 'neutral', 'angry', 'scared'
         self.news_influenced = False
+        # Synchronous mode's second buffer: the mood for the next tick and
+        # the priority of the write that set it (-1 = no write yet)
+        self.next_mood_code = NEUTRAL
+        self.next_priority = -1.0
         
+    PHASES = {'move': 'move', 'neighbors': 'neighbor query',
+              'interact': 'interaction', 'calm_down': 'decay', 'relocate': 'move',
+              'plan': 'interaction'}
+
     def step(self):
+        self.move()
+        if self.interact(self.neighbors()):
+            return
+        self.calm_down()
+
+    def move(self):
         # Move randomly
         possible_steps = self.model.grid.get_neighborhood(
             self.pos, moore=True, include_center=False)
         new_position = self.random.choice(possible_steps)
         self.model.grid.move_agent(self, new_position)
-        
-        # Interact with neighbors
-        neighbors = self.model.grid.get_neighbors(
+
+    def neighbors(self):
+        return self.model.grid.iter_neighbors(
             self.pos, moore=True, include_center=False)
-        
-        if neighbors:
-            for neighbor in neighbors:
-                # Conflict probability increases if different shapes meet
-                if neighbor.shape != self.shape:
-                    if random.random() < self.model.conflict_probability:
-                        self.mood = 'angry'
-                        neighbor.mood = 'scared'
-                        self.model.media_focus = (self.shape, neighbor.shape)
-                        return
-                
-        # Reset mood gradually
-        if self.mood != 'neutral' and random.random() < 0.1:
-            self.mood = 'neutral'
+
+    def interact(self, neighbors):
+        # Interact with neighbors; True once a conflict broke out
+        shape = self.shape_code
+        for neighbor in neighbors:
+            # Conflict probability increases if different shapes meet
+            if neighbor.shape_code != shape:
+                if self.random.random() < self.model.conflict_probability:
+                    self.mood_code = ANGRY
+                    neighbor.mood_code = SCARED
+                    self.model.media_focus = (self.shape, neighbor.shape)
+                    return True
+        return False
+
+    def calm_down(self):
+        # Reset mood gradually (reads the slot behind mood_code directly)
+        if self._mood_code != NEUTRAL and self.random.random() < self.model.calm_probability:
+            self.mood_code = NEUTRAL
+
+    # Synchronous mode (MediaSimulation(synchronous=True)). Every agent moves
+    # first (relocate); then plan() decides the agent's writes from the moods
+    # of tick t, which nobody changes during the phase, and advance() makes
+    # tick t + 1 current. Conflict rule: each agent has a random priority per
+    # tick and its writes carry it; an agent that receives several writes (say
+    # angry from its own conflict and scared from a neighbour's) takes the one
+    # with the highest priority. That is what RandomActivation's "last
+    # activated writer wins" amounts to, but without depending on the
+    # activation order. For the same reason the random numbers are not drawn
+    # in activation order: model.draws holds this tick's (move, priority,
+    # conflict, calm) uniforms per unique_id, and rivals are taken in
+    # unique_id order rather than in cell order.
+    def relocate(self):
+        possible_steps = self.model.grid.get_neighborhood(
+            self.pos, moore=True, include_center=False)
+        choice = int(self.model.draws[self.unique_id][0] * len(possible_steps))
+        self.model.grid.move_agent(self, possible_steps[choice])
+
+    def plan(self):
+        _, priority, conflict, calm = self.model.draws[self.unique_id]
+        shape = self.shape_code
+        rivals = [neighbor for neighbor in self.neighbors() if neighbor.shape_code != shape]
+        p = self.model.conflict_probability
+        if rivals and p > 0:
+            # Checking the rivals one by one with probability p each, the
+            # first success is the g-th with P(g >= k) = (1 - p)^k
+            g = 0 if p >= 1 else int(math.log(1.0 - conflict) / math.log(1.0 - p))
+            if g < len(rivals):
+                rivals.sort(key=lambda agent: agent.unique_id)
+                neighbor = rivals[g]
+                self.write(priority, ANGRY)
+                neighbor.write(priority, SCARED)
+                self.model.report_conflict(priority, self.shape, neighbor.shape)
+                return
+        if self._mood_code != NEUTRAL and calm < self.model.calm_probability:
+            self.write(priority, NEUTRAL)
+
+    def write(self, priority, mood_code):
+        if priority > self.next_priority:
+            self.next_priority = priority
+            self.next_mood_code = mood_code
+
+    def advance(self):
+        if self.next_priority >= 0:
+            self.mood_code = self.next_mood_code
+            self.next_priority = -1.0
+
+class NetworkPersonAgent(PersonAgent):
+    # PersonAgent on a social network (MediaSimulation(network=...)): people
+    # keep their node and meet the people they are connected to
+    __slots__ = ()
+
+    def move(self):
+        pass
+
+    def relocate(self):
+        pass
 
 class MediaSimulation(Model):
-    def __init__(self, N, width, height, conflict_probability=0.3):
+    def __init__(self, N, width, height, conflict_probability=0.3, grid_class=MultiGrid,
+                 collector_path=None, seed=None, profile=False,
+                 convergence=None, synchronous=False, network=None, calm_probability=0.1):
+        seed_model(self, seed)
         self.num_agents = N
-        self.grid = MultiGrid(width, height, True)
-        self.schedule = RandomActivation(self)
+        # network=CSRGraph puts agent i on node i instead of a grid cell
+        # (width and height are then unused; see network.py)
+        self.network = network
+        if network is not None:
+            self.grid = NetworkSpace(network)
+        else:
+            self.grid = grid_class(width, height, True)
+        if synchronous:
+            # Double-buffered, order-independent updates (see PersonAgent.plan)
+            self.schedule = StagedActivation(self, ['relocate', 'plan', 'advance'])
+        else:
+            self.schedule = RandomActivation(self)
+        self.synchronous = synchronous
         self.conflict_probability = conflict_probability
+        # Chance per tick that an angry or scared agent calms down
+        self.calm_probability = calm_probability
         self.media_focus = None
+        self.focus_priority = -1.0
+        self.moods = MoodTally()
+        self.running = True
+        self.convergence = convergence
         
         # Create agents
         shapes = ['square', 'circle']
         for i in range(self.num_agents):
-            shape = random.choice(shapes)
-            agent = PersonAgent(i, self, shape)
-            x = self.random.randrange(self.grid.width)
-            y = self.random.randrange(self.grid.height)
-            self.grid.place_agent(agent, (x, y))
+            shape = self.random.choice(shapes)
+            if network is not None:
+                agent = NetworkPersonAgent(i, self, shape)
+                self.grid.place_agent(agent, i)
+            else:
+                agent = PersonAgent(i, self, shape)
+                x = self.random.randrange(self.grid.width)
+                y = self.random.randrange(self.grid.height)
+                self.grid.place_agent(agent, (x, y))
             self.schedule.add(agent)
             
-        self.datacollector = DataCollector(
-            model_reporters={
-                "Angry": lambda m: sum(1 for agent in m.schedule.agents if agent.mood == 'angry'),
-                "Scared": lambda m: sum(1 for agent in m.schedule.agents if agent.mood == 'scared')
-            }
-        )
+        model_reporters = {
+            "Angry": lambda m: m.moods['angry'],
+            "Scared": lambda m: m.moods['scared']
+        }
+        if collector_path is None:
+            self.datacollector = DataCollector(model_reporters=model_reporters)
+        else:
+            # Stream the series to disk in chunks for very long runs
+            self.datacollector = StreamingDataCollector(
+                collector_path, model_reporters=model_reporters)
+
+        if profile:
+            PhaseProfiler().attach(self)
         
     def step(self):
         self.datacollector.collect(self)
-        self.schedule.step()
\ No newline at end of file
+        self.focus_priority = -1.0
+        if self.synchronous:
+            self.draws = self.rng.random((self.num_agents, 4)).tolist()
+        self.schedule.step()
+        if self.convergence is not None:
+            self.convergence.update(self, self.moods, ('neutral', 'angry', 'scared'))
+
+    def report_conflict(self, priority, shape, other_shape):
+        # Synchronous mode: the media covers the highest priority conflict
+        if priority > self.focus_priority:
+            self.focus_priority = priority
+            self.media_focus = (shape, other_shape)
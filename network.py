@@ -0,0 +1,171 @@
+# network.py
+# Social-network topology for the object models. Instead of a grid, agents sit
+# on the nodes of a graph stored in CSR (compressed sparse row) arrays and
+# interact with the agents on adjacent nodes.
+#
+#   graph = CSRGraph.load_edge_list('edges.npy')   # memory-mapped, (E, 2) ints
+#   model = MediaSimulation(graph.num_nodes, 0, 0, network=graph)
+import numpy as np
+
+
+class CSRGraph:
+    # The neighbours of node i are indices[indptr[i]:indptr[i + 1]]. Two flat
+    # integer arrays hold the whole graph, so millions of edges cost 8 bytes
+    # each (4 with int32 indices), and indices may be a read-only memory map.
+    # Self-loops are dropped; repeated edges are kept, like several agents in
+    # one grid cell.
+    def __init__(self, indptr, indices):
+        self.indptr = np.asarray(indptr)
+        self.indices = indices
+        self.num_nodes = len(self.indptr) - 1
+        self.degree = np.diff(self.indptr)
+
+    @property
+    def num_edges(self):
+        # Adjacency entries; an undirected edge counts twice
+        return len(self.indices)
+
+    def neighbors(self, node):
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    @classmethod
+    def from_edges(cls, edges, num_nodes=None, directed=False, chunk=1 << 20):
+        # edges: (E, 2) array of node ids, e.g. a memory map. It is read in
+        # chunks of `chunk` rows, twice (count, then fill), so only the CSR
+        # arrays are ever held in memory. Undirected graphs store each edge in
+        # both directions. Neighbours keep the order of the edge list.
+        total = len(edges)
+        if num_nodes is None:
+            num_nodes = 0
+            for start in range(0, total, chunk):
+                block = np.asarray(edges[start:start + chunk])
+                if len(block):
+                    num_nodes = max(num_nodes, int(block.max()) + 1)
+
+        counts = np.zeros(num_nodes, dtype=np.int64)
+        for src, dst in _chunks(edges, chunk, directed):
+            counts += np.bincount(src, minlength=num_nodes)
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+
+        dtype = np.int32 if num_nodes < 2**31 else np.int64
+        indices = np.empty(indptr[-1], dtype=dtype)
+        cursor = indptr[:-1].copy()
+        for src, dst in _chunks(edges, chunk, directed):
+            order = np.argsort(src, kind='stable')
+            src, dst = src[order], dst[order]
+            # Position of every entry within its node's run of this chunk
+            rank = np.arange(len(src)) - np.searchsorted(src, src, side='left')
+            indices[cursor[src] + rank] = dst
+            cursor += np.bincount(src, minlength=num_nodes)
+        return cls(indptr, indices)
+
+    @classmethod
+    def load_edge_list(cls, path, num_nodes=None, directed=False, dtype=np.int64,
+                       chunk=1 << 20):
+        # A .npy file of shape (E, 2), or raw binary pairs of `dtype`, mapped
+        # rather than read so edge lists larger than memory stream through
+        # from_edges. (Convert text edge lists once with np.save.)
+        if str(path).endswith('.npy'):
+            edges = np.load(path, mmap_mode='r')
+        else:
+            edges = np.memmap(path, dtype=dtype, mode='r').reshape(-1, 2)
+        return cls.from_edges(edges, num_nodes, directed, chunk)
+
+    def save(self, prefix):
+        # prefix.indptr.npy and prefix.indices.npy; load() maps them back
+        np.save(f'{prefix}.indptr.npy', self.indptr)
+        np.save(f'{prefix}.indices.npy', self.indices)
+
+    @classmethod
+    def load(cls, prefix, mmap_mode='r'):
+        return cls(np.load(f'{prefix}.indptr.npy', mmap_mode=mmap_mode),
+                   np.load(f'{prefix}.indices.npy', mmap_mode=mmap_mode))
+
+    @classmethod
+    def random(cls, num_nodes, mean_degree, seed=None):
+        # Erdős–Rényi-style graph with num_nodes * mean_degree / 2 random
+        # edges, for demos and benchmarks
+        rng = np.random.default_rng(seed)
+        edges = rng.integers(0, num_nodes, (num_nodes * mean_degree // 2, 2))
+        return cls.from_edges(edges, num_nodes)
+
+
+def _chunks(edges, chunk, directed):
+    # (src, dst) blocks without self-loops, both directions when undirected
+    for start in range(0, len(edges), chunk):
+        block = np.asarray(edges[start:start + chunk], dtype=np.int64)
+        src, dst = block[:, 0], block[:, 1]
+        keep = src != dst
+        src, dst = src[keep], dst[keep]
+        if directed:
+            yield src, dst
+        else:
+            yield np.concatenate([src, dst]), np.concatenate([dst, src])
+
+
+class NetworkSpace:
+    # Takes the place of model.grid when agents live on a CSRGraph. An agent's
+    # pos is its node, and the grid queries the agents make (iter_neighbors,
+    # get_neighbors) return the agents on adjacent nodes, so agent code works
+    # unchanged; the moore/radius arguments are accepted and ignored. One
+    # agent per node; nodes without an agent are skipped.
+    def __init__(self, graph):
+        self.graph = graph
+        self.agents = np.full(graph.num_nodes, None, dtype=object)
+        # Plain-int row bounds: indexing a list is several times cheaper than
+        # pulling scalars out of a numpy array in the neighbour loop
+        self._indptr = graph.indptr.tolist()
+        self.occupied = 0
+        self._scale = None
+
+    def place_agent(self, agent, node):
+        if self.agents[node] is not None:
+            raise ValueError(f"node {node} already holds an agent")
+        self.agents[node] = agent
+        agent.pos = node
+        self.occupied += 1
+        self._scale = None
+
+    def remove_agent(self, agent):
+        self.agents[agent.pos] = None
+        agent.pos = None
+        self.occupied -= 1
+        self._scale = None
+
+    def is_cell_empty(self, node):
+        return self.agents[node] is None
+
+    def get_neighborhood(self, node, moore=True, include_center=False, radius=1):
+        neighborhood = self.graph.indices[self._indptr[node]:self._indptr[node + 1]].tolist()
+        if include_center:
+            neighborhood.append(node)
+        return neighborhood
+
+    def iter_neighbors(self, node, moore=True, include_center=False, radius=1):
+        neighbors = self.agents[self.graph.indices[self._indptr[node]:self._indptr[node + 1]]]
+        if self.occupied < len(self.agents):
+            return (agent for agent in neighbors if agent is not None)
+        return iter(neighbors)
+
+    def get_neighbors(self, node, moore=True, include_center=False, radius=1):
+        return list(self.iter_neighbors(node))
+
+    def sample_by_degree(self, k, rng):
+        # k distinct agents drawn without replacement with probability
+        # proportional to their node's degree (Efraimidis-Spirakis keys:
+        # the k smallest Exp(1) / degree), in O(nodes). Isolated nodes are
+        # only reached once every connected agent has been drawn.
+        if self._scale is None:
+            # 1 / degree per node: inf for isolated nodes (drawn last), nan
+            # for empty ones (sorted after everything, never drawn)
+            with np.errstate(divide='ignore'):
+                scale = 1.0 / self.graph.degree
+            scale[np.equal(self.agents, None)] = np.nan
+            self._scale = scale
+        k = min(k, self.occupied)
+        if k <= 0:
+            return []
+        keys = rng.exponential(size=len(self._scale)) * self._scale
+        nodes = np.argpartition(keys, k - 1)[:k] if k < len(keys) else np.arange(k)
+        return self.agents[nodes].tolist()
@@ -0,0 +1,353 @@
+# partitioned.py
+# Domain decomposition of VectorMediaSimulation across worker processes.
+#
+# The torus is cut into tx x ty tiles and every tile is owned by one worker.
+# All state lives in shared memory (agent arrays, per-cell shape counts and a
+# per-cell member index), so workers read each other's data in place and
+# nothing but a tick number and a few scalars is ever pickled. A tick runs in
+# phases separated by barriers:
+#
+#   draws    each worker fills its slice of the tick's CounterStream draws
+#   move     owners move their agents and record the tile they landed in
+#   handover a tile keeps the agents that stayed and picks up arrivals from
+#            its halo (the ring of cells around it, where every arrival was
+#            one move earlier)
+#   index    owners publish their cells' shape counts and member lists;
+#            neighbours read the halo part of them (halo exchange)
+#   conflict owners pick initiators and victims, victims may live in a
+#            neighbouring tile
+#   resolve  owners apply every write aimed at their agents, including the
+#            ones coming from initiators in the halo
+#
+# Draws are indexed by agent id, not by worker, so a run gives exactly the same
+# moods as VectorMediaSimulation with the same seed, for any tiling.
+#
+#   with PartitionedMediaSimulation(10**6, 2000, 2000, tiles=(4, 2), seed=1) as m:
+#       for _ in range(100):
+#           m.step()
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from codes import ANGRY, NEUTRAL, SCARED, SHAPES
+from vectorized import (
+    CALM, CONFLICT, MOORE_OFFSETS, MOVE, RANK, VICTIM, VectorMediaSimulation,
+)
+
+STREAMS = (RANK, MOVE, CONFLICT, VICTIM, CALM)
+
+
+def tile_bounds(i, tiles, size):
+    # Cells [lo, hi) of tile i along one axis; cell c belongs to c * tiles // size
+    return -(-i * size // tiles), -(-(i + 1) * size // tiles)
+
+
+class SharedArrays:
+    # Named numpy arrays in multiprocessing shared memory. The creating side
+    # owns (and unlinks) the segments; workers attach by name via spec().
+    def __init__(self, layout=None, spec=None):
+        self.segments = []
+        self.arrays = {}
+        if layout is not None:
+            for name, (shape, dtype) in layout.items():
+                nbytes = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+                segment = shared_memory.SharedMemory(create=True, size=nbytes)
+                self._add(name, segment, shape, dtype)
+            self.owner = True
+        else:
+            for name, (segment_name, shape, dtype) in spec.items():
+                # Workers share the creator's resource tracker, so attaching
+                # does not hand cleanup to them
+                segment = shared_memory.SharedMemory(name=segment_name)
+                self._add(name, segment, shape, dtype)
+            self.owner = False
+
+    def _add(self, name, segment, shape, dtype):
+        self.segments.append(segment)
+        self.arrays[name] = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+    def spec(self):
+        return {name: (segment.name, array.shape, array.dtype.str)
+                for segment, (name, array) in zip(self.segments, self.arrays.items())}
+
+    def close(self):
+        self.arrays.clear()
+        for segment in self.segments:
+            segment.close()
+            if self.owner:
+                segment.unlink()
+        self.segments = []
+
+
+class Tile:
+    # One worker's share of the torus
+    def __init__(self, index, tiles, width, height, N, conflict_probability, calm_probability,
+                 streams, shared, barrier):
+        self.index = index
+        self.count = tiles[0] * tiles[1]
+        self.tiles = tiles
+        self.width, self.height = width, height
+        self.N = N
+        self.conflict_probability = conflict_probability
+        self.calm_probability = calm_probability
+        self.streams = streams
+        self.s = shared
+        self.barrier = barrier
+
+        i, j = divmod(index, tiles[1])
+        self.x0, self.x1 = tile_bounds(i, tiles[0], width)
+        self.y0, self.y1 = tile_bounds(j, tiles[1], height)
+        self.tw, self.th = self.x1 - self.x0, self.y1 - self.y0
+        # Draws this worker generates, by agent id
+        self.lo, self.hi = index * N // self.count, (index + 1) * N // self.count
+
+        # Halo: the cells around the tile that belong to other tiles
+        px = np.arange(self.x0 - 1, self.x1 + 1) % width
+        py = np.arange(self.y0 - 1, self.y1 + 1) % height
+        hx, hy = np.meshgrid(px, py, indexing='ij')
+        cells = np.unique(hx.ravel() * height + hy.ravel())
+        hx, hy = np.divmod(cells, height)
+        outside = self.cell_tile(hx, hy) != index
+        self.halo_x, self.halo_y = hx[outside], hy[outside]
+        self.pad_x, self.pad_y = px, py
+
+        self.own = np.flatnonzero(self.s['tile_of'] == index)
+
+    def cell_tile(self, x, y):
+        return (x * self.tiles[0] // self.width) * self.tiles[1] + y * self.tiles[1] // self.height
+
+    def wait(self):
+        self.barrier.wait()
+
+    def halo_members(self):
+        # Agents listed in the halo cells of the published member index
+        counts, starts = self.s['counts'], self.s['cell_start']
+        lengths = counts[:, self.halo_x, self.halo_y].ravel().astype(np.int64)
+        first = starts[:, self.halo_x, self.halo_y].ravel()
+        total = int(lengths.sum())
+        if not total:
+            return np.empty(0, dtype=np.int64)
+        # Concatenate the ranges [first, first + length)
+        offsets = np.repeat(first - np.cumsum(lengths) + lengths, lengths)
+        return self.s['members'][offsets + np.arange(total)]
+
+    def setup(self):
+        self.publish()
+        return None
+
+    def step(self, tick):
+        s = self.s
+        draws = s['draws']
+        for row, stream in enumerate(STREAMS):
+            draws[row, self.lo:self.hi] = self.streams.uniform(tick, stream, self.lo, self.hi)
+        self.wait()
+
+        # Move
+        own = self.own
+        choice = (draws[1, own] * len(MOORE_OFFSETS)).astype(np.int64)
+        x = (s['x'][own] + MOORE_OFFSETS[choice, 0]) % self.width
+        y = (s['y'][own] + MOORE_OFFSETS[choice, 1]) % self.height
+        s['x'][own], s['y'][own] = x, y
+        s['tile_of'][own] = self.cell_tile(x, y)
+        self.wait()
+
+        # Handover: everyone who arrived was in our halo before the move
+        arrivals = self.halo_members()
+        arrivals = arrivals[s['tile_of'][arrivals] == self.index]
+        stayed = own[s['tile_of'][own] == self.index]
+        self.own = np.sort(np.concatenate([stayed, arrivals]))
+        self.wait()
+
+        self.publish()
+        return self.conflicts_and_writes()
+
+    def publish(self):
+        # Shape counts and members (grouped by shape, then cell, then id) of
+        # our cells, at our slot of the shared member array
+        s, own = self.s, self.own
+        key = (s['shape'][own].astype(np.int64) * (self.tw * self.th)
+               + (s['x'][own] - self.x0) * self.th + (s['y'][own] - self.y0))
+        counts = np.bincount(key, minlength=len(SHAPES) * self.tw * self.th)
+        s['counts'][:, self.x0:self.x1, self.y0:self.y1] = counts.reshape(len(SHAPES), self.tw, self.th)
+        s['population'][self.index] = len(own)
+        self.wait()
+
+        offset = int(s['population'][:self.index].sum())
+        s['members'][offset:offset + len(own)] = own[np.argsort(key, kind='stable')]
+        starts = offset + np.cumsum(counts) - counts
+        s['cell_start'][:, self.x0:self.x1, self.y0:self.y1] = starts.reshape(len(SHAPES), self.tw, self.th)
+        self.wait()
+
+    def conflicts_and_writes(self):
+        s, own = self.s, self.own
+        draws, rank = s['draws'], s['draws'][0]
+        width, height = self.width, self.height
+
+        # Tile counts with a one-cell halo read from the neighbours' blocks
+        padded = s['counts'][:, self.pad_x[:, None], self.pad_y[None, :]]
+        x, y = s['x'][own], s['y'][own]
+        lx, ly = x - self.x0 + 1, y - self.y0 + 1
+        other = 1 - s['shape'][own].astype(np.int64)
+        k = np.zeros(len(own), dtype=np.int64)
+        for dx, dy in MOORE_OFFSETS:
+            k += padded[other, lx + dx, ly + dy]
+
+        p_any = 1.0 - (1.0 - self.conflict_probability) ** k
+        hit = draws[2, own] < p_any
+        initiators = own[hit]
+
+        # Victim: neighbouring cell weighted by its count, then the r-th
+        # member of that cell with the other shape
+        ix, iy, ilx, ily, ishape = x[hit], y[hit], lx[hit], ly[hit], other[hit]
+        r = (draws[3, initiators] * k[hit]).astype(np.int64)
+        cx = np.empty_like(ix)
+        cy = np.empty_like(iy)
+        found = np.zeros(len(initiators), dtype=bool)
+        for dx, dy in MOORE_OFFSETS:
+            c = padded[ishape, ilx + dx, ily + dy]
+            take = ~found & (r < c)
+            cx[take], cy[take] = (ix[take] + dx) % width, (iy[take] + dy) % height
+            r = np.where(found | take, r, r - c)
+            found |= take
+        victims = s['members'][s['cell_start'][ishape, cx, cy] + r]
+        s['victim_of'][own] = -1
+        s['victim_of'][initiators] = victims
+        calmed = own[~hit & (draws[4, own] < self.calm_probability)]
+        self.wait()
+
+        # Writes aimed at our agents: our own initiators and calm-downs, and
+        # victims chosen by initiators here or in the halo
+        sources = np.concatenate([own, self.halo_members()])
+        aimed = s['victim_of'][sources]
+        incoming = sources[aimed >= 0]
+        incoming = incoming[s['tile_of'][s['victim_of'][incoming]] == self.index]
+        targets = np.concatenate([initiators, s['victim_of'][incoming], calmed])
+        ranks = np.concatenate([rank[initiators], rank[incoming], rank[calmed]])
+        values = np.concatenate([
+            np.full(len(initiators), ANGRY, dtype=np.int8),
+            np.full(len(incoming), SCARED, dtype=np.int8),
+            np.full(len(calmed), NEUTRAL, dtype=np.int8)])
+        if len(targets):
+            # The highest ranked write to each agent is the one that sticks
+            order = np.argsort(ranks, kind='stable')[::-1]
+            targets, values = targets[order], values[order]
+            _, first = np.unique(targets, return_index=True)
+            s['mood'][targets[first]] = values[first]
+
+        if not len(initiators):
+            return None
+        last = np.argmax(rank[initiators])
+        return (float(rank[initiators][last]), int(s['shape'][initiators[last]]),
+                int(s['shape'][victims[last]]))
+
+
+def _work(index, tiles, width, height, N, conflict_probability, calm_probability, streams, spec,
+          barrier, conn):
+    shared = SharedArrays(spec=spec)
+    try:
+        tile = Tile(index, tiles, width, height, N, conflict_probability, calm_probability,
+                    streams, shared, barrier)
+        conn.send(("ok", tile.setup()))
+        while True:
+            tick = conn.recv()
+            if tick is None:
+                break
+            conn.send(("ok", tile.step(tick)))
+    except Exception as exc:
+        # Release the other workers before reporting
+        barrier.abort()
+        conn.send(("error", repr(exc)))
+    finally:
+        shared.close()
+
+
+class PartitionedMediaSimulation(VectorMediaSimulation):
+    # VectorMediaSimulation stepped by one worker process per tile. The model
+    # arrays (x, y, shape, mood) are views of shared memory, so reporters,
+    # checkpoints and the DataCollector read them as usual. Call close() (or
+    # use the model as a context manager) to stop the workers.
+    def __init__(self, N, width, height, conflict_probability=0.3, seed=None, tiles=(2, 1),
+                 calm_probability=0.1):
+        if tiles[0] > width or tiles[1] > height:
+            raise ValueError("more tiles than grid cells along an axis")
+        super().__init__(N, width, height, conflict_probability, seed, calm_probability)
+        self.tiles = tuple(tiles)
+        count = tiles[0] * tiles[1]
+
+        self.shared = SharedArrays({
+            'x': ((N,), np.int64),
+            'y': ((N,), np.int64),
+            'shape': ((N,), np.int8),
+            'mood': ((N,), np.int8),
+            'tile_of': ((N,), np.int64),
+            'victim_of': ((N,), np.int64),
+            'members': ((N,), np.int64),
+            'draws': ((len(STREAMS), N), np.float64),
+            'counts': ((len(SHAPES), width, height), np.int64),
+            'cell_start': ((len(SHAPES), width, height), np.int64),
+            'population': ((count,), np.int64),
+        })
+        for name in ('x', 'y', 'shape', 'mood'):
+            self.shared[name][:] = getattr(self, name)
+            setattr(self, name, self.shared[name])
+        self.shared['tile_of'][:] = ((self.x * tiles[0] // width) * tiles[1]
+                                     + self.y * tiles[1] // height)
+
+        context = mp.get_context()
+        barrier = context.Barrier(count)
+        self.workers, self.conns = [], []
+        for index in range(count):
+            parent, child = context.Pipe()
+            worker = context.Process(
+                target=_work, daemon=True,
+                args=(index, self.tiles, width, height, N, conflict_probability,
+                      calm_probability, self.streams, self.shared.spec(), barrier, child))
+            worker.start()
+            self.workers.append(worker)
+            self.conns.append(parent)
+        self._gather()
+
+    def _gather(self):
+        replies = [conn.recv() for conn in self.conns]
+        errors = [reply for status, reply in replies if status == "error"]
+        if errors:
+            self.close()
+            raise RuntimeError(f"tile worker failed: {errors[0]}")
+        return [reply for _, reply in replies]
+
+    def step(self):
+        self.datacollector.collect(self)
+        for conn in self.conns:
+            conn.send(self.steps + 1)
+        focus = [f for f in self._gather() if f is not None]
+        if focus:
+            _, initiator, victim = max(focus)
+            self.media_focus = (SHAPES[initiator], SHAPES[victim])
+        self.steps += 1
+
+    def close(self):
+        if not self.workers:
+            return
+        for conn, worker in zip(self.conns, self.workers):
+            if worker.is_alive():
+                try:
+                    conn.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+        for worker in self.workers:
+            worker.join()
+        self.workers, self.conns = [], []
+        # Keep plain copies so the model stays readable after the workers stop
+        for name in ('x', 'y', 'shape', 'mood'):
+            setattr(self, name, np.array(getattr(self, name)))
+        self.shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,118 @@
+# profiling.py
+import time
+from collections import defaultdict
+
+import pandas as pd
+
+PHASES = ("move", "neighbor query", "interaction", "decay", "data collection", "media broadcast")
+
+
+class PhaseProfiler:
+    # Opt-in per-phase timing for the agent models.
+    #
+    # Agent and model classes list which of their methods belong to which
+    # phase in a PHASES class attribute, e.g. {"move": "move", "calm_down":
+    # "decay"}. attach() moves every agent onto a subclass whose PHASES
+    # methods are timed wrappers, so a model built without a profiler runs
+    # the plain methods and pays nothing. Every tick's time and call count
+    # per phase is kept, and one "<phase> s" column per phase is added to the
+    # model's DataCollector (row t holds the breakdown of the tick before it).
+    # The agent models attach one themselves when built with profile=True.
+    # A timed method that calls another one (synchronous plan() calls
+    # neighbors()) is only charged for its own time; the inner call's time
+    # goes to the inner phase.
+    def __init__(self):
+        self.time = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.ticks = []
+        self._classes = {}
+        # Time spent in timed calls nested inside each running timed call
+        self._nested = []
+
+    def wrap(self, phase, method, materialize=False):
+        clock = time.perf_counter
+        spent, calls, nested = self.time, self.calls, self._nested
+
+        def timed(*args, **kwargs):
+            nested.append(0.0)
+            start = clock()
+            try:
+                result = method(*args, **kwargs)
+                if materialize:
+                    # Lazy neighbour iterators do their work when consumed
+                    result = list(result)
+            finally:
+                elapsed = clock() - start
+                spent[phase] += elapsed - nested.pop()
+                calls[phase] += 1
+                if nested:
+                    nested[-1] += elapsed
+            return result
+        return timed
+
+    def profiled_class(self, cls):
+        # Empty __slots__ keeps the layout, so __class__ can be swapped
+        if cls not in self._classes:
+            methods = {name: self.wrap(phase, getattr(cls, name),
+                                       materialize=phase == "neighbor query")
+                       for name, phase in cls.PHASES.items()}
+            self._classes[cls] = type(cls.__name__, (cls,), dict(methods, __slots__=()))
+        return self._classes[cls]
+
+    def instrument(self, agent):
+        if hasattr(type(agent), "PHASES"):
+            agent.__class__ = self.profiled_class(type(agent))
+
+    def attach(self, model):
+        for agent in model.schedule.agents:
+            self.instrument(agent)
+        for name, phase in getattr(type(model), "PHASES", {}).items():
+            setattr(model, name, self.wrap(phase, getattr(model, name)))
+
+        datacollector = getattr(model, "datacollector", None)
+        if datacollector is not None:
+            datacollector.collect = self.wrap("data collection", datacollector.collect)
+            for phase in PHASES:
+                name = f"{phase} s"
+                datacollector.model_reporters[name] = lambda m, phase=phase: m.profiler.last(phase)
+                datacollector.model_vars.setdefault(name, [])
+
+        step = model.step
+
+        def profiled_step():
+            step()
+            self.end_tick()
+        model.step = profiled_step
+        model.profiler = self
+        return self
+
+    def end_tick(self):
+        self.ticks.append((dict(self.time), dict(self.calls)))
+        self.time.clear()
+        self.calls.clear()
+
+    def last(self, phase):
+        return self.ticks[-1][0].get(phase, 0.0) if self.ticks else 0.0
+
+    def report(self):
+        # One row per tick: "<phase> s" and "<phase> calls" columns
+        rows = []
+        for spent, calls in self.ticks:
+            row = {}
+            for phase in PHASES:
+                row[f"{phase} s"] = spent.get(phase, 0.0)
+                row[f"{phase} calls"] = calls.get(phase, 0)
+            rows.append(row)
+        df = pd.DataFrame(rows, columns=[f"{p} {k}" for p in PHASES for k in ("s", "calls")])
+        df.index.name = "tick"
+        return df
+
+    def summary(self):
+        # Totals over the whole run, largest phase first
+        df = self.report()
+        totals = pd.DataFrame({
+            "seconds": [df[f"{p} s"].sum() for p in PHASES],
+            "calls": [int(df[f"{p} calls"].sum()) for p in PHASES],
+        }, index=list(PHASES))
+        totals["share"] = totals["seconds"] / max(totals["seconds"].sum(), 1e-12)
+        return totals.sort_values("seconds", ascending=False)
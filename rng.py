@@ -0,0 +1,64 @@
+# rng.py
+# One place that turns a seed into every random stream a run needs.
+#
+# A seed (int, None or numpy SeedSequence) is expanded with SeedSequence, so
+# independent children can be spawned for agents, workers or replicates
+# without overlapping. Object models get a seeded random.Random as
+# model.random (what mesa agents use via self.random); array engines use
+# CounterStream, whose draws depend only on (seed, tick, stream, index) and not
+# on how many numbers were drawn before. The same seed therefore gives the
+# same numbers whether a tick is drawn in one batch or split across workers.
+import random
+
+import numpy as np
+
+
+def seed_sequence(seed=None):
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def spawn(seed, n):
+    # n independent child seeds, e.g. one per worker or per replicate
+    return seed_sequence(seed).spawn(n)
+
+
+def python_random(seed=None):
+    state = seed_sequence(seed).generate_state(4, np.uint32)
+    return random.Random(int.from_bytes(state.tobytes(), 'little'))
+
+
+def generator(seed=None):
+    return np.random.Generator(np.random.Philox(seed_sequence(seed)))
+
+
+def seed_model(model, seed=None):
+    # Replace the RNGs mesa's Model.__new__ set up with ones derived from the
+    # same SeedSequence: model.random for agent code, model.rng for batches
+    ss = seed_sequence(seed)
+    random_ss, numpy_ss = ss.spawn(2)
+    model._seed = seed
+    model.random = python_random(random_ss)
+    model.rng = generator(numpy_ss)
+
+
+class CounterStream:
+    # Counter-based uniforms on top of Philox. uniform(tick, stream, start, stop)
+    # returns positions [start, stop) of the conceptual per-(tick, stream)
+    # array, so a worker owning agents [start, stop) sees exactly the numbers a
+    # single process would have drawn for them.
+    def __init__(self, seed=None):
+        self.key = seed_sequence(seed).generate_state(2, np.uint64)
+
+    def uniform(self, tick, stream, start, stop):
+        counter = np.array([0, 0, stream, tick], dtype=np.uint64)
+        bit_generator = np.random.Philox(key=self.key, counter=counter)
+        # Philox yields four 64-bit words, i.e. four doubles, per counter step
+        bit_generator.advance(start // 4)
+        skip = start % 4
+        return np.random.Generator(bit_generator).random(stop - start + skip)[skip:]
+
+    def integers(self, tick, stream, start, stop, high):
+        # Uniform integers in [0, high), one double per draw
+        return (self.uniform(tick, stream, start, stop) * high).astype(np.int64)
@@ -0,0 +1,79 @@
+# scheduling.py
+import math
+from collections import defaultdict
+
+from mesa.time import BaseScheduler
+
+
+def geometric(rng, p):
+    # Ticks until the first success of a per-tick coin with probability p
+    # (1 = next tick). One draw replaces one coin flip per waiting tick.
+    if p >= 1:
+        return 1
+    if p <= 0:
+        return None
+    return 1 + int(math.log(1.0 - rng.random()) / math.log(1.0 - p))
+
+
+class ActiveSetActivation(BaseScheduler):
+    # Scheduler that only steps agents that asked to be woken up.
+    #
+    # Agents call wake(agent, delay) to be stepped in the `delay`-th upcoming
+    # step (1 = the next one, whether called from __init__ or a step); the
+    # calendar is a dict of tick -> agents, so a tick costs O(agents due),
+    # not O(population). Waking an agent again replaces its earlier entry
+    # (stale entries are skipped), and sleep(agent) cancels it. Agents due on
+    # the same tick are activated in random order, like RandomActivation.
+    # While a step runs, delay 0 queues the agent later in that same step;
+    # pending() and stepped() tell where an agent stands in it.
+    def __init__(self, model):
+        super().__init__(model)
+        self._calendar = defaultdict(list)
+        self._wake_at = {}
+        self._due = None
+        self._stepped = set()
+
+    def wake(self, agent, delay=1):
+        if delay is None:
+            self.sleep(agent)
+            return
+        if delay < 1 and self._due is not None:
+            self._wake_at[agent.unique_id] = self.steps
+            self._due.append(agent)
+            return
+        tick = self.steps + max(1, delay)
+        self._wake_at[agent.unique_id] = tick
+        self._calendar[tick].append(agent)
+
+    def sleep(self, agent):
+        self._wake_at.pop(agent.unique_id, None)
+
+    def remove(self, agent):
+        super().remove(agent)
+        self.sleep(agent)
+
+    def pending(self, agent):
+        # Due later in the step that is running now
+        return self._due is not None and self._wake_at.get(agent.unique_id) == self.steps
+
+    def stepped(self, agent):
+        # Already activated in the step that is running now
+        return self._due is not None and agent.unique_id in self._stepped
+
+    @property
+    def active_count(self):
+        return len(self._wake_at)
+
+    def step(self):
+        self.steps += 1
+        self.time += 1
+        tick = self.steps
+        due = self._calendar.pop(tick, [])
+        self.model.random.shuffle(due)
+        self._due, self._stepped = due, set()
+        for agent in due:  # wake(agent, 0) appends while this runs
+            if self._wake_at.get(agent.unique_id) == tick:
+                del self._wake_at[agent.unique_id]
+                self._stepped.add(agent.unique_id)
+                agent.step()
+        self._due = None
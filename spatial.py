@@ -0,0 +1,167 @@
+# spatial.py
+from mesa.space import MultiGrid, accept_tuple_argument
+
+
+class IndexedMultiGrid(MultiGrid):
+    # Drop-in MultiGrid with a cell index for Moore-neighbourhood queries.
+    #
+    # Cells are kept in a flat list indexed by x * height + y. The buckets are
+    # the very same lists MultiGrid stores agents in, so place/remove/move keep
+    # the index up to date without any extra work. For every cell we build
+    # (once, on first use) a tuple with references to its neighbouring
+    # buckets; a neighbour query then only walks those buckets and does not
+    # build coordinate tuples or filter empty cells on every call.
+    #
+    # Queries return agents in the same order as MultiGrid, so swapping the
+    # grid class does not change a seeded run.
+    def __init__(self, width, height, torus):
+        super().__init__(width, height, torus)
+        self._cells = [self._grid[x][y] for x in range(width) for y in range(height)]
+        self._moore = [None] * self.num_cells
+        self._moore_cells = [None] * self.num_cells
+
+    def get_neighborhood(self, pos, moore, include_center=False, radius=1):
+        if moore and not include_center and radius == 1:
+            x, y = pos
+            cid = x * self.height + y
+            neighborhood = self._moore_cells[cid]
+            if neighborhood is None:
+                neighborhood = self._build_moore(x, y)
+                self._moore_cells[cid] = neighborhood
+            return neighborhood
+        return super().get_neighborhood(pos, moore, include_center, radius)
+
+    def _build_moore(self, x, y):
+        width, height = self.width, self.height
+        if not self.torus or width < 3 or height < 3:
+            # Let mesa deal with clipping and de-duplication on tiny tori
+            return super().get_neighborhood((x, y), True, False, 1)
+        xs = ((x - 1) % width, x, (x + 1) % width)
+        ys = ((y - 1) % height, y, (y + 1) % height)
+        return [(nx, ny) for nx in xs for ny in ys if nx != x or ny != y]
+
+    def moore_buckets(self, pos):
+        # Tuple of the agent lists around pos (centre excluded). Iterating
+        # over it directly is the allocation-free way to scan neighbours.
+        x, y = pos
+        cid = x * self.height + y
+        buckets = self._moore[cid]
+        if buckets is None:
+            cells, height = self._cells, self.height
+            buckets = tuple(
+                cells[nx * height + ny]
+                for nx, ny in self.get_neighborhood(pos, True, False, 1))
+            self._moore[cid] = buckets
+        return buckets
+
+    def count_moore(self, pos):
+        return sum(len(bucket) for bucket in self.moore_buckets(pos))
+
+    def iter_neighbors(self, pos, moore, include_center=False, radius=1):
+        if moore and not include_center and radius == 1:
+            return (agent for bucket in self.moore_buckets(pos) for agent in bucket)
+        return super().iter_neighbors(pos, moore, include_center, radius)
+
+    def get_neighbors(self, pos, moore, include_center=False, radius=1):
+        if moore and not include_center and radius == 1:
+            neighbors = []
+            for bucket in self.moore_buckets(pos):
+                neighbors += bucket
+            return neighbors
+        return super().get_neighbors(pos, moore, include_center, radius)
+
+    @accept_tuple_argument
+    def iter_cell_list_contents(self, cell_list):
+        cells, height = self._cells, self.height
+        return (agent for x, y in cell_list for agent in cells[x * height + y])
+
+
+class SparseMultiGrid(MultiGrid):
+    # MultiGrid that only stores occupied cells.
+    #
+    # MultiGrid allocates a list for every cell up front, which is gigabytes
+    # for a 10,000 x 10,000 world before any agent moves. Here cells live in
+    # a dict keyed by position: a cell's list is created when the first
+    # agent arrives and dropped when the last one leaves, so memory follows
+    # the number of occupied cells, not the area. Moore neighbourhoods are
+    # computed arithmetically instead of being cached per position (the cache
+    # alone would grow with the area visited).
+    #
+    # Queries return agents in the same order as MultiGrid, so swapping the
+    # grid class does not change a seeded run.
+    def __init__(self, width, height, torus):
+        self.height = height
+        self.width = width
+        self.torus = torus
+        self.num_cells = height * width
+        self._cells = {}
+        self._empties_built = False
+        self._neighborhood_cache = {}
+
+    @property
+    def occupied(self):
+        # Number of cells holding at least one agent
+        return len(self._cells)
+
+    def __getitem__(self, pos):
+        return self._cells.get(self.torus_adj(pos), [])
+
+    def __iter__(self):
+        for _, x, y in self.coord_iter():
+            yield self._cells.get((x, y), [])
+
+    def coord_iter(self):
+        cells = self._cells
+        for x in range(self.width):
+            for y in range(self.height):
+                yield cells.get((x, y), []), x, y
+
+    def iter_occupied(self):
+        # (agents, x, y) for occupied cells only, in no particular order
+        for (x, y), agents in self._cells.items():
+            yield agents, x, y
+
+    def get_neighborhood(self, pos, moore, include_center=False, radius=1):
+        width, height = self.width, self.height
+        if moore and not include_center and radius == 1 and self.torus and width >= 3 and height >= 3:
+            x, y = pos
+            xs = ((x - 1) % width, x, (x + 1) % width)
+            ys = ((y - 1) % height, y, (y + 1) % height)
+            return [(nx, ny) for nx in xs for ny in ys if nx != x or ny != y]
+        neighborhood = super().get_neighborhood(pos, moore, include_center, radius)
+        self._neighborhood_cache.clear()
+        return neighborhood
+
+    def place_agent(self, agent, pos):
+        pos = tuple(pos)
+        cell = self._cells.get(pos)
+        if cell is None:
+            cell = self._cells[pos] = []
+        if agent.pos is None or agent not in cell:
+            cell.append(agent)
+            agent.pos = pos
+            if self._empties_built:
+                self._empties.discard(pos)
+
+    def remove_agent(self, agent):
+        pos = agent.pos
+        cell = self._cells[pos]
+        cell.remove(agent)
+        if not cell:
+            del self._cells[pos]
+            if self._empties_built:
+                self._empties.add(pos)
+        agent.pos = None
+
+    def is_cell_empty(self, pos):
+        return pos not in self._cells
+
+    def iter_neighbors(self, pos, moore, include_center=False, radius=1):
+        cells = self._cells
+        return (agent for cell in self.get_neighborhood(pos, moore, include_center, radius)
+                if cell in cells for agent in cells[cell])
+
+    @accept_tuple_argument
+    def iter_cell_list_contents(self, cell_list):
+        cells = self._cells
+        return (agent for pos in cell_list if pos in cells for agent in cells[pos])
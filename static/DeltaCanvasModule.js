@@ -0,0 +1,75 @@
+// Client side of deltagrid.DeltaCanvasGrid: keeps the last frame's style code
+// per cell and only repaints the cells listed in each delta.
+const DeltaCanvasModule = function (
+  canvas_width,
+  canvas_height,
+  grid_width,
+  grid_height,
+  palette
+) {
+  const canvas = document.createElement("canvas");
+  Object.assign(canvas, {
+    width: canvas_width,
+    height: canvas_height,
+    className: "world-grid",
+  });
+  const parent = document.createElement("div");
+  parent.style.height = `${canvas_height}px`;
+  parent.className = "world-grid-parent";
+  parent.appendChild(canvas);
+  document.getElementById("elements").appendChild(parent);
+
+  const context = canvas.getContext("2d");
+  const cellWidth = canvas_width / grid_width;
+  const cellHeight = canvas_height / grid_height;
+  const cells = new Uint8Array(grid_width * grid_height);
+
+  const decode = (b64, ArrayType) => {
+    const binary = atob(b64);
+    const bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+    return new ArrayType(bytes.buffer);
+  };
+
+  const drawCell = (index, code) => {
+    const x = Math.floor(index / grid_height);
+    const y = index % grid_height;
+    // Mesa's (0, 0) is the bottom-left cell
+    const px = x * cellWidth;
+    const py = (grid_height - y - 1) * cellHeight;
+    context.clearRect(px, py, cellWidth, cellHeight);
+    if (code === 0) return;
+
+    const [shape, color] = palette[code - 1];
+    context.fillStyle = color;
+    context.beginPath();
+    if (shape === "circle") {
+      const r = 0.4 * Math.min(cellWidth, cellHeight);
+      context.arc(px + cellWidth / 2, py + cellHeight / 2, r, 0, 2 * Math.PI);
+    } else if (shape === "triangle") {
+      context.moveTo(px + cellWidth / 2, py + 0.1 * cellHeight);
+      context.lineTo(px + 0.9 * cellWidth, py + 0.9 * cellHeight);
+      context.lineTo(px + 0.1 * cellWidth, py + 0.9 * cellHeight);
+      context.closePath();
+    } else {
+      context.rect(px + 0.1 * cellWidth, py + 0.1 * cellHeight,
+                   0.8 * cellWidth, 0.8 * cellHeight);
+    }
+    context.fill();
+  };
+
+  this.render = (data) => {
+    if (data.full) this.reset();
+    const index = decode(data.cells, Uint32Array);
+    const codes = decode(data.codes, Uint8Array);
+    for (let i = 0; i < index.length; i++) {
+      cells[index[i]] = codes[i];
+      drawCell(index[i], codes[i]);
+    }
+  };
+
+  this.reset = () => {
+    context.clearRect(0, 0, canvas_width, canvas_height);
+    cells.fill(0);
+  };
+};
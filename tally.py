@@ -0,0 +1,52 @@
+# tally.py
+from collections import Counter
+
+
+class MoodTally(Counter):
+    # Running count of agents per mood. Missing moods read as 0, so reporters
+    # can simply do m.moods['angry'] in O(1).
+    def move(self, old, new):
+        if old != new:
+            self[old] -= 1
+            self[new] += 1
+
+    @property
+    def count(self):
+        return sum(self.values())
+
+
+class Tallied:
+    # Agent attribute that keeps a MoodTally on the model in sync.
+    #
+    #     class PersonAgent(Agent):
+    #         mood = Tallied('moods')
+    #
+    # Every assignment to agent.mood moves the agent from its old bucket in
+    # agent.model.moods to the new one, so nothing has to rescan the schedule.
+    # For integer-coded attributes pass the names, e.g.
+    # Tallied('moods', MOODS), and the tally stays keyed by name.
+    def __init__(self, tally, names=None):
+        self.tally = tally
+        self.names = names
+
+    def __set_name__(self, owner, name):
+        self.slot = '_' + name
+
+    def __get__(self, agent, owner=None):
+        if agent is None:
+            return self
+        return getattr(agent, self.slot)
+
+    def __set__(self, agent, value):
+        tally = getattr(agent.model, self.tally)
+        names = self.names
+        try:
+            old = getattr(agent, self.slot)
+        except AttributeError:
+            tally[value if names is None else names[value]] += 1
+        else:
+            if names is None:
+                tally.move(old, value)
+            else:
+                tally.move(names[old], names[value])
+        setattr(agent, self.slot, value)
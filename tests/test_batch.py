@@ -0,0 +1,26 @@
+import batch
+from New.main import EmotionalBalanceModel
+
+
+def test_sweep_runs_emotional_balance(tmp_path):
+    grid = {"width": [10], "height": [10], "num_agents": [40, 80], "decay_rate": [0.1, 0.3]}
+    skipped, ran = batch.sweep(grid, 2, 15, tmp_path, model_cls=EmotionalBalanceModel, workers=1)
+    assert (skipped, ran) == (0, 8)
+
+    df = batch.load(tmp_path)
+    assert len(df) == 8 * 16
+    counts = df[["Neutral", "Happy", "Angry", "Fearful"]].sum(axis=1)
+    assert (counts == df["num_agents"]).all()
+
+    # A second pass finds every run on disk
+    assert batch.sweep(grid, 2, 15, tmp_path, model_cls=EmotionalBalanceModel,
+                       workers=1) == (8, 0)
+
+
+def test_emotional_balance_stops_with_convergence(tmp_path):
+    grid = {"width": [10], "height": [10], "num_agents": [60]}
+    batch.sweep(grid, 1, 400, tmp_path, model_cls=EmotionalBalanceModel, workers=1,
+                convergence={"window": 20, "tolerance": 0.05})
+    df = batch.load(tmp_path)
+    assert df["converged_at"].notna().all()
+    assert len(df) == df["converged_at"].iloc[0] + 1
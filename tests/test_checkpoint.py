@@ -0,0 +1,145 @@
+import numpy as np
+
+import checkpoint
+from model import MediaSimulation
+from network import CSRGraph
+from New.main import EmotionalBalanceModel
+from vectorized import VectorMediaSimulation
+
+
+def vector_state(model):
+    return model.x.copy(), model.y.copy(), model.shape.copy(), model.mood.copy()
+
+
+def agent_state(model):
+    return sorted((a.unique_id, a.pos, a.mood) for a in model.schedule.agents
+                  if hasattr(a, "mood"))
+
+
+def test_vector_snapshot_does_not_follow_the_live_run():
+    model = VectorMediaSimulation(300, 20, 20, seed=1)
+    for _ in range(5):
+        model.step()
+    at_snapshot = vector_state(model)
+    ckpt = checkpoint.snapshot(model)
+    assert ckpt["agent/mood"] is not model.mood
+
+    for _ in range(5):
+        model.step()
+    restored = checkpoint.restore(ckpt)
+    for before, after in zip(at_snapshot, vector_state(restored)):
+        np.testing.assert_array_equal(before, after)
+    assert restored.steps == 5
+
+
+def test_vector_restore_continues_the_run():
+    model = VectorMediaSimulation(300, 20, 20, seed=2)
+    for _ in range(5):
+        model.step()
+    ckpt = checkpoint.snapshot(model)
+    for _ in range(5):
+        model.step()
+    restored = checkpoint.restore(ckpt)
+    for _ in range(5):
+        restored.step()
+    for expected, got in zip(vector_state(model), vector_state(restored)):
+        np.testing.assert_array_equal(expected, got)
+
+
+def test_media_simulation_restore_matches_snapshot_tick():
+    model = MediaSimulation(200, 20, 20, seed=3)
+    for _ in range(5):
+        model.step()
+    at_snapshot = agent_state(model)
+    ckpt = checkpoint.snapshot(model)
+    for _ in range(5):
+        model.step()
+    restored = checkpoint.restore(ckpt)
+    assert agent_state(restored) == at_snapshot
+
+    for _ in range(5):
+        restored.step()
+    assert agent_state(restored) == agent_state(model)
+
+
+def test_emotional_balance_restore_matches_snapshot_tick():
+    model = EmotionalBalanceModel(20, 20, 200, seed=4)
+    for _ in range(5):
+        model.step()
+    at_snapshot = dict(model.emotions)
+    ckpt = checkpoint.snapshot(model)
+    for _ in range(5):
+        model.step()
+    restored = checkpoint.restore(ckpt)
+    assert dict(restored.emotions) == at_snapshot
+    series = restored.datacollector.model_vars["Neutral"]
+    assert series == model.datacollector.model_vars["Neutral"][:5]
+    for _ in range(5):
+        restored.step()
+    assert dict(restored.emotions) == dict(model.emotions)
+
+
+def test_network_media_simulation_round_trip():
+    graph = CSRGraph.random(500, 8, seed=1)
+    model = MediaSimulation(500, 0, 0, seed=3, network=graph)
+    for _ in range(3):
+        model.step()
+    ckpt = checkpoint.snapshot(model)
+    for branch in (checkpoint.restore(ckpt), checkpoint.restore(ckpt, network=graph)):
+        assert branch.network is not None
+        assert agent_state(branch) == agent_state(model)
+        for _ in range(3):
+            branch.step()
+    for _ in range(3):
+        model.step()
+    assert agent_state(branch) == agent_state(model)
+
+
+def test_network_emotional_balance_round_trip():
+    graph = CSRGraph.random(300, 6, seed=2)
+    model = EmotionalBalanceModel(0, 0, 300, seed=5, network=graph)
+    for _ in range(3):
+        model.step()
+    ckpt = checkpoint.snapshot(model)
+    restored = checkpoint.restore(ckpt)
+    for _ in range(5):
+        model.step()
+        restored.step()
+    assert dict(restored.emotions) == dict(model.emotions)
+    assert [a.pos for a in restored.humans] == [a.pos for a in model.humans]
+
+
+def test_synchronous_mode_survives_restore():
+    model = MediaSimulation(200, 20, 20, seed=6, synchronous=True)
+    for _ in range(3):
+        model.step()
+    ckpt = checkpoint.snapshot(model)
+    restored = checkpoint.restore(ckpt)
+    assert restored.synchronous
+    assert type(restored.schedule) is type(model.schedule)
+    for _ in range(4):
+        model.step()
+        restored.step()
+    assert agent_state(restored) == agent_state(model)
+
+
+def test_pending_synchronous_writes_are_kept():
+    model = MediaSimulation(50, 10, 10, seed=7, synchronous=True)
+    agent = model.schedule.agents[0]
+    agent.write(0.5, 1)
+    restored = checkpoint.restore(checkpoint.snapshot(model))
+    copy = next(a for a in restored.schedule.agents if a.unique_id == agent.unique_id)
+    assert (copy.next_mood_code, copy.next_priority) == (1, 0.5)
+
+
+def test_vector_calm_probability_survives_restore():
+    model = VectorMediaSimulation(300, 20, 20, seed=8, calm_probability=0.35)
+    for _ in range(3):
+        model.step()
+    restored = checkpoint.restore(checkpoint.snapshot(model))
+    assert restored.calm_probability == 0.35
+    for _ in range(5):
+        model.step()
+        restored.step()
+    for expected, got in zip(vector_state(model), vector_state(restored)):
+        np.testing.assert_array_equal(expected, got)
@@ -0,0 +1,13 @@
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize("module", ["model", "media", "New.main", "wbwwb", "meanfield"])
+def test_object_models_do_not_load_the_array_models(module):
+    # The code tables live in codes.py so these never pay for vectorized.py
+    snippet = f"import sys, {module}; print('vectorized' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", snippet], check=True,
+                         capture_output=True, text=True)
+    assert out.stdout.split()[-1] == "False"
@@ -0,0 +1,59 @@
+import numpy as np
+
+from collection import StreamingDataCollector, read_columns
+from model import MediaSimulation
+
+
+class Ticker:
+    def __init__(self):
+        self.tick = 0
+
+
+def collect(collector, model, ticks):
+    for _ in range(ticks):
+        model.tick += 1
+        collector.collect(model)
+
+
+def test_reused_path_starts_a_new_series(tmp_path):
+    first = StreamingDataCollector(tmp_path, {"Tick": lambda m: m.tick}, chunk_size=4)
+    collect(first, Ticker(), 10)
+    assert len(first.get_model_vars_dataframe()) == 10
+
+    second = StreamingDataCollector(tmp_path, {"Tick": lambda m: m.tick}, chunk_size=4)
+    collect(second, Ticker(), 6)
+    df = second.get_model_vars_dataframe()
+    assert df["Tick"].tolist() == [1, 2, 3, 4, 5, 6]
+    assert (tmp_path / "Tick.bin").stat().st_size == 6 * 8
+
+
+def test_late_reporter_gets_its_own_file(tmp_path):
+    (tmp_path / "Late.bin").write_bytes(b"stale data from an older run")
+    collector = StreamingDataCollector(tmp_path, {"Tick": lambda m: m.tick}, chunk_size=4)
+    model = Ticker()
+    collect(collector, model, 6)  # one chunk flushed, two rows pending
+    collector.model_reporters["Late"] = lambda m: m.tick * 10
+    collector.model_vars["Late"] = []
+    collect(collector, model, 5)
+
+    df = collector.get_model_vars_dataframe()
+    assert df["Tick"].tolist() == list(range(1, 12))
+    late = df["Late"].to_numpy()
+    assert np.isnan(late[:6]).all()
+    assert late[6:].tolist() == [70, 80, 90, 100, 110]
+    assert set(read_columns(tmp_path)) == {"Tick", "Late"}
+
+
+def test_profiled_run_streams_every_column(tmp_path):
+    for steps in (12, 7):  # the second run reuses the path
+        model = MediaSimulation(60, 10, 10, seed=1, collector_path=tmp_path, profile=True)
+        reference = MediaSimulation(60, 10, 10, seed=1)
+        for _ in range(steps):
+            model.step()
+            reference.step()
+        df = model.datacollector.get_model_vars_dataframe()
+        assert len(df) == steps
+        expected = reference.datacollector.get_model_vars_dataframe()
+        assert df["Angry"].tolist() == expected["Angry"].tolist()
+        assert "move s" in df.columns
+        assert len(np.fromfile(tmp_path / "move s.bin")) == steps
@@ -0,0 +1,88 @@
+import base64
+import json
+
+import numpy as np
+from mesa.visualization.ModularVisualization import ModularServer
+
+from deltagrid import DeltaCanvasGrid, DeltaSocketHandler
+from media import MediaModel
+from server import PALETTE, agent_style
+
+
+class Browser(DeltaSocketHandler):
+    # A connection without a socket: keeps the cell codes the browser-side
+    # DeltaCanvasModule would hold after every message
+    def __init__(self, application):
+        self.application = application
+        self.messages = []
+        self.canvas = None
+        self.open()
+
+    def write_message(self, message):
+        self.messages.append(message)
+        if message["type"] != "viz_state":
+            return
+        data = message["data"][0]
+        if data["full"]:
+            self.canvas = np.zeros(20 * 20, dtype=np.uint8)
+        cells = np.frombuffer(base64.b64decode(data["cells"]), dtype="<u4")
+        codes = np.frombuffer(base64.b64decode(data["codes"]), dtype=np.uint8)
+        self.canvas[cells] = codes
+
+
+def make_server():
+    grid = DeltaCanvasGrid(agent_style, PALETTE, 20, 20, 500, 500)
+    return ModularServer(MediaModel, [grid], "test",
+                         {"N": 60, "width": 20, "height": 20}), grid
+
+
+def shown(server, grid):
+    return grid.frame(server.model)
+
+
+def test_every_connection_gets_its_own_deltas():
+    server, grid = make_server()
+    first = Browser(server)
+    first.send_frame(server.render_model())
+    assert first.messages[-1]["data"][0]["full"]
+    for _ in range(3):
+        server.model.step()
+        first.send_frame(server.render_model())
+        assert not first.messages[-1]["data"][0]["full"]
+        np.testing.assert_array_equal(first.canvas, shown(server, grid))
+
+    # A browser that connects late starts from a full frame
+    second = Browser(server)
+    server.model.step()
+    frame = server.render_model()
+    second.send_frame(frame)
+    first.send_frame(frame)
+    assert second.messages[-1]["data"][0]["full"]
+    assert not first.messages[-1]["data"][0]["full"]
+    for browser in (first, second):
+        np.testing.assert_array_equal(browser.canvas, shown(server, grid))
+
+    # Deltas to one browser do not move the other one's baseline
+    for _ in range(3):
+        server.model.step()
+        second.send_frame(server.render_model())
+    first.send_frame(server.render_model())
+    for browser in (first, second):
+        np.testing.assert_array_equal(browser.canvas, shown(server, grid))
+
+
+def test_reset_sends_a_full_frame():
+    server, grid = make_server()
+    browser = Browser(server)
+    browser.send_frame(server.render_model())
+    server.model.step()
+    browser.on_message(json.dumps({"type": "reset"}))
+    assert browser.messages[-1]["data"][0]["full"]
+    np.testing.assert_array_equal(browser.canvas, shown(server, grid))
+
+
+def test_end_of_run():
+    server, _ = make_server()
+    browser = Browser(server)
+    browser.send_frame(None)
+    assert browser.messages[-1] == {"type": "end"}
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from ensemble import Ensemble, P2Quantile, Welford, run_ensemble
+
+# P² keeps five markers instead of the samples. On 5000 draws its estimate
+# lands within 0.01 in probability of the exact quantile, i.e. the share of
+# samples below it is p +- 0.01.
+RANK_TOLERANCE = 0.01
+
+
+def samples(seed, n=5000):
+    rng = np.random.default_rng(seed)
+    # One column per distribution: normal, exponential, uniform, lognormal
+    return np.stack([rng.normal(3, 2, n), rng.exponential(1.5, n),
+                     rng.uniform(-1, 1, n), rng.lognormal(0, 1, n)], axis=1)
+
+
+@pytest.mark.parametrize("p", [0.05, 0.25, 0.5, 0.9, 0.95])
+def test_p2_matches_numpy_quantile(p):
+    data = samples(1)
+    estimator = P2Quantile(p, data.shape[1:])
+    for row in data:
+        estimator.add(row)
+    rank = (data < estimator.value).mean(axis=0)
+    assert np.all(np.abs(rank - p) < RANK_TOLERANCE), rank
+    spread = np.quantile(data, 0.75, axis=0) - np.quantile(data, 0.25, axis=0)
+    assert np.all(np.abs(estimator.value - np.quantile(data, p, axis=0)) < 0.05 * spread)
+
+
+def test_p2_is_exact_before_five_samples():
+    estimator = P2Quantile(0.5, (2,))
+    assert np.isnan(estimator.value).all()
+    data = np.array([[1.0, 10.0], [4.0, 7.0], [2.0, 9.0]])
+    for row in data:
+        estimator.add(row)
+    np.testing.assert_allclose(estimator.value, np.quantile(data, 0.5, axis=0))
+
+
+def test_welford_matches_numpy():
+    data = samples(2, n=1000).reshape(1000, 2, 2)
+    stats = Welford((2, 2))
+    assert np.isnan(stats.variance).all()
+    for x in data:
+        stats.add(x)
+    assert stats.count == 1000
+    np.testing.assert_allclose(stats.mean, data.mean(axis=0))
+    np.testing.assert_allclose(stats.variance, data.var(axis=0, ddof=1))
+    np.testing.assert_allclose(stats.std, data.std(axis=0, ddof=1))
+
+
+def test_welford_merge_matches_one_pass():
+    data = samples(3, n=900)
+    parts = [Welford(data.shape[1:]) for _ in range(3)]
+    for i, x in enumerate(data[:700]):
+        parts[0 if i < 100 else 1].add(x)
+    for x in data[700:]:
+        parts[2].add(x)
+    merged = parts[0].merge(parts[1]).merge(parts[2]).merge(Welford(data.shape[1:]))
+    assert merged.count == 900
+    np.testing.assert_allclose(merged.mean, data.mean(axis=0))
+    np.testing.assert_allclose(merged.variance, data.var(axis=0, ddof=1))
+
+    empty = Welford(data.shape[1:]).merge(parts[2])
+    np.testing.assert_allclose(empty.mean, data[700:].mean(axis=0))
+
+
+def test_ensemble_counts_add_up():
+    ensemble = run_ensemble(6, 10, {"N": 30}, workers=1)
+    assert isinstance(ensemble, Ensemble) and ensemble.runs == 6
+    df = ensemble.dataframe()
+    assert len(df) == 11
+    total = df["Angry mean"] + df["Scared mean"] + df["Neutral mean"]
+    np.testing.assert_allclose(total, 30)
+    assert (df["Angry q0.05"] <= df["Angry q0.95"]).all()
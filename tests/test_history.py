@@ -0,0 +1,78 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+from history import RingBuffer
+
+
+def filled(capacity, ticks, rows=3):
+    buffer = RingBuffer(rows, capacity)
+    reference = deque(maxlen=capacity)
+    for tick in range(ticks):
+        values = np.arange(rows) * 100.0 + tick
+        buffer.append(values)
+        reference.append(values)
+    return buffer, np.array(reference).T.reshape(rows, -1)
+
+
+def test_empty_buffer():
+    buffer = RingBuffer(2, 4)
+    assert len(buffer) == 0
+    assert buffer.window().shape == (2, 0)
+    np.testing.assert_array_equal(buffer.mean(), [0, 0])
+    with pytest.raises(IndexError):
+        buffer.latest()
+
+
+@pytest.mark.parametrize("ticks", [1, 2, 3])
+def test_reads_before_the_buffer_fills(ticks):
+    buffer, expected = filled(4, ticks)
+    assert len(buffer) == ticks
+    np.testing.assert_array_equal(buffer.window(), expected)
+    np.testing.assert_array_equal(buffer.latest(), expected[:, -1])
+    # Unwritten columns do not count towards the statistics
+    np.testing.assert_allclose(buffer.mean(), expected.mean(axis=1))
+    np.testing.assert_allclose(buffer.std(), expected.std(axis=1))
+    np.testing.assert_array_equal(buffer.window(10), expected)
+
+
+@pytest.mark.parametrize("ticks", [4, 5, 7, 8, 13])
+def test_wrap_around_keeps_oldest_first_order(ticks):
+    buffer, expected = filled(4, ticks)
+    np.testing.assert_array_equal(buffer.window(), expected)
+    np.testing.assert_array_equal(buffer.latest(), expected[:, -1])
+    np.testing.assert_allclose(buffer.mean(), expected.mean(axis=1))
+    for window in range(1, 5):
+        np.testing.assert_array_equal(buffer.window(window), expected[:, -window:])
+        np.testing.assert_allclose(buffer.mean(window), expected[:, -window:].mean(axis=1))
+
+
+def test_capacity_is_never_exceeded():
+    buffer, _ = filled(5, 23)
+    assert buffer.capacity == 5
+    assert len(buffer) == 5
+    assert buffer.data.shape == (3, 5)
+    assert buffer.window().shape == (3, 5)
+    # Only the last 5 ticks remain
+    np.testing.assert_array_equal(buffer.window()[0], [18, 19, 20, 21, 22])
+
+
+def test_running_mean_survives_many_wraps():
+    rng = np.random.default_rng(0)
+    buffer = RingBuffer(50, 7)
+    for _ in range(1000):
+        buffer.append(rng.normal(size=50) * 1e6)
+    np.testing.assert_allclose(buffer.mean(), buffer.window().mean(axis=1))
+
+
+def test_histogram_counts_the_latest_column():
+    buffer = RingBuffer(6, 3)
+    buffer.append(np.full(6, 0.9))
+    buffer.append([-1.0, -0.04, 0.0, 0.04, 0.26, 1.0])
+    counts, sums = buffer.histogram(scale=10)
+    assert counts.sum() == 6
+    assert counts[0] == counts[13] == counts[20] == 1
+    assert counts[10] == 3
+    assert sums[10] == pytest.approx(0.0)
+    assert sums[20] == 1.0
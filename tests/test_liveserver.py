@@ -0,0 +1,80 @@
+import threading
+import time
+
+from liveserver import LiveModularServer
+from model import MediaSimulation
+
+
+class Viewer:
+    def __init__(self):
+        self.messages = []
+        self.received = threading.Event()
+
+    def write_message(self, message):
+        self.messages.append(message)
+        self.received.set()
+
+    def send_frame(self, data):
+        self.write_message({"type": "end"} if data is None else {"type": "viz_state"})
+
+
+class Loop:
+    # Stand-in for the viewer's IO loop: run callbacks straight away
+    def add_callback(self, callback, *args):
+        callback(*args)
+
+
+def make_server(**kwargs):
+    return LiveModularServer(MediaSimulation, [], "test",
+                             {"N": 50, "width": 10, "height": 10}, **kwargs)
+
+
+def ask(server, viewer):
+    viewer.received.clear()
+    server.request_frame(viewer, Loop())
+    assert viewer.received.wait(5)
+    return viewer.messages[-1]
+
+
+def test_worker_stops_with_the_last_client():
+    server = make_server()
+    first, second = Viewer(), Viewer()
+    server.connect(first)
+    server.connect(second)
+    assert ask(server, first)["type"] == "viz_state"
+    worker = server.worker
+    assert worker.is_alive()
+
+    server.disconnect(first)
+    assert worker.is_alive()
+    server.disconnect(second)
+    assert server.worker is None
+    assert not worker.is_alive()
+
+
+def test_worker_pauses_when_no_frame_is_asked_for():
+    server = make_server(idle_timeout=0.05)
+    viewer = Viewer()
+    server.connect(viewer)
+    ask(server, viewer)
+    time.sleep(0.2)
+    paused_at = server.model.schedule.steps
+    time.sleep(0.2)
+    assert server.model.schedule.steps == paused_at
+    assert server.worker.is_alive()
+
+    ask(server, viewer)
+    assert server.model.schedule.steps > paused_at
+    server.disconnect(viewer)
+    assert server.worker is None
+
+
+def test_stop_wakes_a_paused_worker():
+    server = make_server(idle_timeout=0.0)
+    viewer = Viewer()
+    server.connect(viewer)
+    ask(server, viewer)
+    worker = server.worker
+    server.stop_worker()
+    assert not worker.is_alive()
+    assert not server.wanted.is_set()
@@ -0,0 +1,78 @@
+import math
+
+import numpy as np
+import pytest
+
+import meanfield
+
+# Calibration against agent runs on a 20x20 grid, 3 seeds, 60 ticks, tail 20.
+# Dense worlds (N = 300) come out within 0.02 of the agent means. Sparse
+# worlds (N = 50) are worse: the mean-field treats neighbourhoods as redrawn
+# every tick, and at this density a neighbour is rare enough for that to
+# matter. Measured there: neutral -0.085, angry +0.064 for MediaSimulation,
+# at most 0.05 for EmotionalBalanceModel.
+DENSE_TOLERANCE = 0.03
+SPARSE_TOLERANCE = 0.1
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 5, 12])
+@pytest.mark.parametrize("r", [0.0, 0.05, 0.5, 0.9])
+def test_binomial_pmf_matches_math_comb(n, r):
+    pmf = meanfield.binomial_pmf([n], [r], n + 1)[0]
+    exact = [math.comb(n, k) * r ** k * (1 - r) ** (n - k) for k in range(n + 1)]
+    np.testing.assert_allclose(pmf, exact, atol=1e-12)
+
+
+def test_binomial_pmf_sums_to_one():
+    n = np.array([0, 1, 10, 300, 10 ** 6])
+    r = np.array([0.3, 0.5, 0.01, 0.02, 1e-5])
+    pmf = meanfield.binomial_pmf(n, r, meanfield._support(n, r))
+    np.testing.assert_allclose(pmf.sum(axis=1), 1)
+    assert np.all(pmf >= 0)
+
+
+def test_media_simulation_fractions_are_a_distribution():
+    out = meanfield.media_simulation(np.array([1, 50, 300, 2000]), 20, 20,
+                                     conflict_probability=[0.0, 0.3, 0.6, 1.0], steps=40)
+    assert out.shape == (41, 4, 3)
+    np.testing.assert_allclose(out.sum(axis=2), 1)
+    assert np.all(out >= -1e-12)
+
+
+@pytest.mark.parametrize("cooldown_period", [0, 1, 2, 5, 9])
+def test_emotional_balance_keeps_total_mass(cooldown_period):
+    out = meanfield.emotional_balance(np.array([1, 50, 300]), 20, 20,
+                                      cooldown_period=cooldown_period, steps=50)
+    assert out.shape == (51, 3, 4)
+    np.testing.assert_allclose(out.sum(axis=2), 1)
+    assert np.all(out >= -1e-12)
+
+
+def test_emotional_balance_mixed_cooldowns_match_single_runs():
+    mixed = meanfield.emotional_balance(100, 20, 20, cooldown_period=[0, 3, 7], steps=30)
+    for j, cooldown_period in enumerate([0, 3, 7]):
+        single = meanfield.emotional_balance(100, 20, 20, cooldown_period=cooldown_period,
+                                             steps=30)
+        np.testing.assert_allclose(mixed[:, j], single[:, 0])
+
+
+def calibration(model, grid, size):
+    df = meanfield.calibrate(model, grid, seeds=3, steps=60, tail=20, workers=1)
+    return df.set_index(size)[[f"{state} error" for state in meanfield.MODELS[model][2]]]
+
+
+def test_media_simulation_calibration():
+    errors = calibration("media", {
+        "N": [50, 300], "width": [20], "height": [20],
+        "conflict_probability": [0.3], "calm_probability": [0.1]}, "N").abs()
+    assert (errors.loc[300] < DENSE_TOLERANCE).all(), errors
+    assert (errors.loc[50] < SPARSE_TOLERANCE).all(), errors
+
+
+def test_emotional_balance_calibration():
+    errors = calibration("balance", {
+        "num_agents": [50, 300], "width": [20], "height": [20], "decay_rate": [0.1],
+        "cooldown_period": [0, 5], "neutral_fraction": [0.2], "extreme_fraction": [0.1]},
+        "num_agents").abs()
+    assert (errors.loc[300] < DENSE_TOLERANCE).all(axis=None), errors
+    assert (errors.loc[50] < SPARSE_TOLERANCE).all(axis=None), errors
@@ -0,0 +1,127 @@
+from collections import defaultdict
+
+import numpy as np
+import pytest
+
+from network import CSRGraph, NetworkSpace
+
+
+class Dot:
+    def __init__(self):
+        self.pos = None
+
+
+def naive(edges, directed=False):
+    adjacency = defaultdict(list)
+    for a, b in edges.tolist():
+        if a == b:
+            continue
+        adjacency[a].append(b)
+        if not directed:
+            adjacency[b].append(a)
+    return adjacency
+
+
+def assert_same_neighbours(graph, edges, directed=False):
+    adjacency = naive(edges, directed)
+    for node in range(graph.num_nodes):
+        assert sorted(graph.neighbors(node).tolist()) == sorted(adjacency[node])
+
+
+@pytest.fixture
+def edges():
+    return np.random.default_rng(0).integers(0, 60, (500, 2))
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 64, 1 << 20])
+def test_from_edges_matches_naive_adjacency(edges, chunk):
+    graph = CSRGraph.from_edges(edges, chunk=chunk)
+    assert graph.num_nodes == edges.max() + 1
+    assert_same_neighbours(graph, edges)
+
+
+def test_neighbours_keep_edge_list_order():
+    graph = CSRGraph.from_edges(np.array([[0, 3], [0, 1], [0, 2]]), chunk=1)
+    assert graph.neighbors(0).tolist() == [3, 1, 2]
+
+
+def test_self_loops_are_dropped():
+    graph = CSRGraph.from_edges(np.array([[0, 0], [1, 1], [0, 1]]))
+    assert graph.neighbors(0).tolist() == [1]
+    assert graph.neighbors(1).tolist() == [0]
+    assert graph.num_edges == 2
+
+
+@pytest.mark.parametrize("chunk", [3, 1 << 20])
+def test_directed(edges, chunk):
+    graph = CSRGraph.from_edges(edges, directed=True, chunk=chunk)
+    assert graph.num_edges == np.count_nonzero(edges[:, 0] != edges[:, 1])
+    assert_same_neighbours(graph, edges, directed=True)
+
+
+def test_save_load_round_trip(tmp_path, edges):
+    graph = CSRGraph.from_edges(edges)
+    graph.save(tmp_path / "g")
+    loaded = CSRGraph.load(tmp_path / "g")
+    np.testing.assert_array_equal(loaded.indptr, graph.indptr)
+    np.testing.assert_array_equal(loaded.indices, graph.indices)
+    np.testing.assert_array_equal(loaded.degree, graph.degree)
+
+
+@pytest.mark.parametrize("suffix", [".npy", ".bin"])
+def test_load_edge_list_from_a_memory_map(tmp_path, edges, suffix):
+    path = tmp_path / f"edges{suffix}"
+    if suffix == ".npy":
+        np.save(path, edges)
+    else:
+        edges.astype(np.int64).tofile(path)
+    graph = CSRGraph.load_edge_list(path, chunk=50)
+    assert_same_neighbours(graph, edges)
+
+
+def test_space_neighbours_skip_empty_nodes():
+    graph = CSRGraph.from_edges(np.array([[0, 1], [0, 2], [0, 3]]))
+    space = NetworkSpace(graph)
+    agents = {node: Dot() for node in (0, 1, 3)}
+    for node, agent in agents.items():
+        space.place_agent(agent, node)
+    assert space.get_neighbors(0) == [agents[1], agents[3]]
+    with pytest.raises(ValueError):
+        space.place_agent(Dot(), 1)
+
+
+def star_space():
+    # Hub 0 linked to 1..5; 6 and 7 isolated; 8 linked to the hub but empty
+    graph = CSRGraph.from_edges(np.array([[0, n] for n in (1, 2, 3, 4, 5, 8)]), num_nodes=10)
+    space = NetworkSpace(graph)
+    for node in range(8):
+        space.place_agent(Dot(), node)
+    return space
+
+
+def test_sample_by_degree_returns_distinct_placed_agents():
+    space = star_space()
+    rng = np.random.default_rng(1)
+    for k in range(0, 12):
+        sample = space.sample_by_degree(k, rng)
+        assert len(sample) == min(k, space.occupied)
+        assert len({id(a) for a in sample}) == len(sample)
+        assert all(a is not None for a in sample)
+
+
+def test_sample_by_degree_draws_isolated_nodes_last():
+    space = star_space()
+    rng = np.random.default_rng(2)
+    for _ in range(50):
+        assert {a.pos for a in space.sample_by_degree(6, rng)} == {0, 1, 2, 3, 4, 5}
+        assert len({a.pos for a in space.sample_by_degree(7, rng)} & {6, 7}) == 1
+
+
+def test_sample_by_degree_follows_degree():
+    space = star_space()
+    rng = np.random.default_rng(3)
+    hits = np.zeros(10)
+    for _ in range(4000):
+        hits[space.sample_by_degree(1, rng)[0].pos] += 1
+    # The hub has degree 6 against 1 for each leaf: 6/11 of single draws
+    assert abs(hits[0] / 4000 - 6 / 11) < 0.03
@@ -0,0 +1,82 @@
+import multiprocessing as mp
+import os
+
+import numpy as np
+import pytest
+
+import partitioned
+from partitioned import PartitionedMediaSimulation
+from vectorized import VectorMediaSimulation
+
+SHM = "/dev/shm"
+
+
+def segments():
+    return set(os.listdir(SHM)) if os.path.isdir(SHM) else set()
+
+
+def state(model):
+    return model.x, model.y, model.shape, model.mood
+
+
+@pytest.mark.parametrize("tiles", [(1, 1), (2, 1), (2, 2), (3, 2)])
+def test_partitioned_run_is_bit_identical_to_vector_run(tiles):
+    single = VectorMediaSimulation(600, 24, 18, seed=11, calm_probability=0.2)
+    with PartitionedMediaSimulation(600, 24, 18, seed=11, tiles=tiles,
+                                    calm_probability=0.2) as split:
+        for _ in range(15):
+            single.step()
+            split.step()
+            for expected, got in zip(state(single), state(split)):
+                np.testing.assert_array_equal(expected, got)
+            assert split.media_focus == single.media_focus
+        split.datacollector.collect(split)
+    single.datacollector.collect(single)
+    assert (split.datacollector.get_model_vars_dataframe()
+            .equals(single.datacollector.get_model_vars_dataframe()))
+
+
+@pytest.mark.skipif(not os.path.isdir(SHM), reason="no /dev/shm")
+def test_close_unlinks_shared_memory():
+    before = segments()
+    model = PartitionedMediaSimulation(300, 20, 20, seed=1, tiles=(2, 2))
+    assert segments() - before
+    model.step()
+    model.close()
+    assert segments() == before
+    # The model stays readable, and closing twice is harmless
+    assert len(model.mood) == 300
+    model.close()
+
+
+@pytest.mark.skipif(not os.path.isdir(SHM), reason="no /dev/shm")
+def test_exception_in_the_with_block_unlinks_shared_memory():
+    before = segments()
+    with pytest.raises(KeyError):
+        with PartitionedMediaSimulation(300, 20, 20, seed=2, tiles=(2, 1)) as model:
+            model.step()
+            raise KeyError("stop")
+    assert segments() == before
+
+
+@pytest.mark.skipif(not os.path.isdir(SHM) or mp.get_start_method() != "fork",
+                    reason="needs /dev/shm and forked workers")
+def test_worker_failure_unlinks_shared_memory(monkeypatch):
+    # Workers are forked, so they inherit the patched Tile.step
+    def fail(self, tick):
+        raise ValueError("tile failed")
+
+    monkeypatch.setattr(partitioned.Tile, "step", fail)
+    before = segments()
+    model = PartitionedMediaSimulation(300, 20, 20, seed=3, tiles=(2, 1))
+    with pytest.raises(RuntimeError, match="tile failed"):
+        model.step()
+    assert not model.workers
+    assert segments() == before
+
+
+def test_too_many_tiles_allocates_nothing():
+    before = segments()
+    with pytest.raises(ValueError):
+        PartitionedMediaSimulation(100, 4, 4, tiles=(5, 1))
+    assert segments() == before
@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+from model import MediaSimulation
+from profiling import PHASES, PhaseProfiler
+
+
+class Worker:
+    PHASES = {"outer": "interaction", "inner": "neighbor query"}
+
+    def outer(self):
+        time.sleep(0.01)
+        return self.inner()
+
+    def inner(self):
+        time.sleep(0.05)
+        return [1, 2]
+
+
+def test_nested_calls_are_charged_to_the_innermost_phase():
+    profiler = PhaseProfiler()
+    worker = Worker()
+    worker.__class__ = profiler.profiled_class(Worker)
+    assert worker.outer() == [1, 2]
+    assert profiler.time["neighbor query"] >= 0.05
+    assert profiler.time["interaction"] < 0.04
+    assert profiler.calls == {"interaction": 1, "neighbor query": 1}
+
+
+def test_exceptions_do_not_leak_nested_time():
+    profiler = PhaseProfiler()
+    failing = profiler.wrap("move", lambda: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        failing()
+    assert profiler.calls["move"] == 1
+
+    worker = Worker()
+    worker.__class__ = profiler.profiled_class(Worker)
+    worker.outer()
+    assert 0 < profiler.time["interaction"] < 0.04
+
+
+@pytest.mark.parametrize("synchronous", [False, True])
+def test_phase_times_fit_in_the_tick(synchronous):
+    model = MediaSimulation(300, 20, 20, seed=1, profile=True, synchronous=synchronous)
+    for _ in range(5):
+        start = time.perf_counter()
+        model.step()
+        wall = time.perf_counter() - start
+        spent, _ = model.profiler.ticks[-1]
+        assert sum(spent.values()) <= wall
+    df = model.datacollector.get_model_vars_dataframe()
+    assert all(f"{phase} s" in model.datacollector.model_reporters for phase in PHASES)
+    assert len(df) == 5 and (df["neighbor query s"].iloc[1:] > 0).all()
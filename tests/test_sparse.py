@@ -0,0 +1,70 @@
+import numpy as np
+
+from New.main import EmotionalBalanceModel
+from scheduling import ActiveSetActivation
+
+SEEDS = range(12)
+STEPS = 200
+TAIL = 150
+# Strong, frequent broadcasts make the sparse/dense difference visible: when
+# viewers lost the rest of their tick, sparse runs settled about 9 points
+# more neutral than dense ones. Now the two agree; seed-to-seed noise of
+# 12-seed means is up to about 2 points.
+BROADCASTS = {"neutral_fraction": 0.5, "extreme_fraction": 0.4, "cooldown_period": 0}
+TOLERANCE = 0.03
+
+
+def settled(sparse, seed, N=300):
+    rows = []
+    model = EmotionalBalanceModel(20, 20, N, seed=seed, sparse=sparse, **BROADCASTS)
+    for t in range(STEPS):
+        model.step()
+        if t >= STEPS - TAIL:
+            rows.append([model.emotions[e] for e in ("neutral", "happy", "angry", "fearful")])
+    return np.mean(rows, axis=0) / N
+
+
+def test_sparse_aggregates_match_dense():
+    dense = np.mean([settled(False, seed) for seed in SEEDS], axis=0)
+    sparse = np.mean([settled(True, seed) for seed in SEEDS], axis=0)
+    assert np.all(np.abs(sparse - dense) < TOLERANCE), (dense, sparse)
+
+
+class Probe:
+    def __init__(self, unique_id, log):
+        self.unique_id = unique_id
+        self.log = log
+
+    def step(self):
+        self.log.append(self.unique_id)
+
+
+class Waker(Probe):
+    def __init__(self, unique_id, log, schedule, target):
+        super().__init__(unique_id, log)
+        self.schedule = schedule
+        self.target = target
+
+    def step(self):
+        super().step()
+        self.seen = (self.schedule.pending(self.target), self.schedule.stepped(self.target))
+        self.schedule.wake(self.target, 0)
+
+
+def test_wake_with_no_delay_steps_later_in_the_same_tick():
+    model = EmotionalBalanceModel(5, 5, 0, seed=1)
+    schedule = ActiveSetActivation(model)
+    log = []
+    target = Probe(1, log)
+    waker = Waker(0, log, schedule, target)
+    schedule.wake(waker)
+    schedule.step()
+    assert log == [0, 1]
+    assert waker.seen == (False, False)
+    assert not schedule.pending(target) and not schedule.stepped(target)
+
+    # Outside a step, delay 0 means the next step
+    schedule.wake(target, 0)
+    schedule.step()
+    assert log == [0, 1, 1]
+    assert schedule.active_count == 0
@@ -0,0 +1,73 @@
+import pytest
+from mesa.space import MultiGrid
+
+from media import MediaModel
+from model import MediaSimulation
+from New.main import EmotionalBalanceModel
+from spatial import IndexedMultiGrid, SparseMultiGrid
+from wbwwb import WBWWBModel
+
+GRIDS = [IndexedMultiGrid, SparseMultiGrid]
+
+
+def media_simulation(grid_class):
+    return MediaSimulation(150, 12, 9, grid_class=grid_class, seed=7)
+
+
+def media_model(grid_class):
+    return MediaModel(150, 12, 9, grid_class=grid_class, seed=7)
+
+
+def wbwwb(grid_class):
+    return WBWWBModel(150, 12, 9, grid_class=grid_class, seed=7)
+
+
+def emotional_balance(grid_class):
+    return EmotionalBalanceModel(12, 9, 150, grid_class=grid_class, seed=7)
+
+
+def states(model):
+    # Every agent's position and every state slot it has
+    rows = []
+    for agent in model.schedule.agents:
+        values = [getattr(agent, name, None) for name in ("mood", "state", "emotion")]
+        rows.append((agent.unique_id, agent.pos, *values))
+    return sorted(rows, key=lambda row: row[0])
+
+
+@pytest.mark.parametrize("grid_class", GRIDS)
+@pytest.mark.parametrize("build", [media_simulation, media_model, wbwwb, emotional_balance])
+def test_seeded_runs_match_multigrid(build, grid_class):
+    reference, model = build(MultiGrid), build(grid_class)
+    assert isinstance(model.grid, grid_class)
+    for _ in range(25):
+        reference.step()
+        model.step()
+        assert states(model) == states(reference)
+
+
+class Dot:
+    def __init__(self, label):
+        self.label = label
+        self.pos = None
+
+
+def filled(grid_class):
+    # Up to two agents per cell, some cells empty
+    grid = grid_class(12, 9, True)
+    cells = [(x, y) for x in range(12) for y in range(9)] * 2
+    for label, cell in enumerate(cells):
+        if label % 3:
+            grid.place_agent(Dot(label), cell)
+    return grid
+
+
+@pytest.mark.parametrize("grid_class", GRIDS)
+@pytest.mark.parametrize("pos", [(0, 0), (11, 8), (5, 0), (3, 4)])
+def test_neighbour_order_matches_multigrid(grid_class, pos):
+    reference, grid = filled(MultiGrid), filled(grid_class)
+    expected = [a.label for a in reference.get_neighbors(pos, moore=True)]
+    assert [a.label for a in grid.get_neighbors(pos, moore=True)] == expected
+    assert [a.label for a in grid.iter_neighbors(pos, moore=True)] == expected
+    cells = list(reference.get_neighborhood(pos, moore=True))
+    assert list(grid.get_neighborhood(pos, moore=True)) == cells
@@ -0,0 +1,61 @@
+from collections import Counter
+
+import pytest
+
+from media import MediaModel
+from model import MediaSimulation
+from New.main import EmotionalBalanceModel, HumanAgent
+from tally import MoodTally
+
+
+def scan(agents, attribute):
+    return Counter(getattr(a, attribute) for a in agents)
+
+
+def assert_matches(tally, counts):
+    assert {k: v for k, v in tally.items() if v} == dict(counts)
+    assert tally.count == sum(counts.values())
+
+
+@pytest.mark.parametrize("synchronous", [False, True])
+def test_media_simulation_moods_match_a_full_scan(synchronous):
+    model = MediaSimulation(200, 15, 15, seed=1, synchronous=synchronous)
+    for _ in range(30):
+        assert_matches(model.moods, scan(model.schedule.agents, "mood"))
+        model.step()
+    assert_matches(model.moods, scan(model.schedule.agents, "mood"))
+
+
+def test_media_model_states_match_a_full_scan():
+    model = MediaModel(200, 15, 15, seed=2)
+    for _ in range(30):
+        assert_matches(model.states, scan(model.schedule.agents, "state"))
+        model.step()
+    assert_matches(model.states, scan(model.schedule.agents, "state"))
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_emotional_balance_emotions_match_a_full_scan(sparse):
+    model = EmotionalBalanceModel(15, 15, 200, seed=3, sparse=sparse)
+    for _ in range(30):
+        humans = [a for a in model.schedule.agents if isinstance(a, HumanAgent)]
+        assert_matches(model.emotions, scan(humans, "emotion"))
+        model.step()
+    assert_matches(model.emotions, scan(model.humans, "emotion"))
+
+
+def test_count_does_not_shadow_counter_total():
+    tally = MoodTally()
+    tally["angry"] += 2
+    tally.move("angry", "scared")
+    assert tally.count == 2
+    assert tally.total() == 2
+
+
+def test_emotional_balance_is_quiet_unless_verbose(capsys):
+    model = EmotionalBalanceModel(10, 10, 50, seed=4)
+    model.step()
+    assert capsys.readouterr().out == ""
+    model = EmotionalBalanceModel(10, 10, 50, seed=4, verbose=True)
+    model.step()
+    assert capsys.readouterr().out.startswith("Neutral: ")
@@ -0,0 +1,52 @@
+import numpy as np
+
+from model import MediaSimulation
+
+SEEDS = range(12)
+STEPS = 80
+TAIL = 40
+# Settled Angry/Scared fractions of the two modes agree to within one
+# percentage point. The synchronous mode runs slightly lower on scared
+# (about 0.3 points at this density, up to 1 point in sparse worlds: victims
+# are picked after everybody moved), which stays inside the tolerance.
+TOLERANCE = 0.01
+
+
+def settled(synchronous, seed, N=300):
+    model = MediaSimulation(N, 20, 20, seed=seed, synchronous=synchronous)
+    for _ in range(STEPS):
+        model.step()
+    df = model.datacollector.get_model_vars_dataframe().iloc[-TAIL:]
+    return df["Angry"].mean() / N, df["Scared"].mean() / N
+
+
+def moods(model):
+    return sorted((a.unique_id, a.pos, a.mood) for a in model.schedule.agents)
+
+
+def test_synchronous_aggregates_match_sequential():
+    sequential = np.mean([settled(False, seed) for seed in SEEDS], axis=0)
+    synchronous = np.mean([settled(True, seed) for seed in SEEDS], axis=0)
+    assert np.all(np.abs(synchronous - sequential) < TOLERANCE), (sequential, synchronous)
+
+
+def test_synchronous_result_does_not_depend_on_activation_order():
+    ordered = MediaSimulation(300, 20, 20, seed=5, synchronous=True)
+    shuffled = MediaSimulation(300, 20, 20, seed=5, synchronous=True)
+    shuffled.schedule.shuffle = True
+    shuffled.schedule.shuffle_between_stages = True
+    for _ in range(20):
+        ordered.step()
+        shuffled.step()
+        assert moods(ordered) == moods(shuffled)
+    assert ordered.media_focus == shuffled.media_focus
+
+
+def test_plan_reads_only_the_previous_tick():
+    model = MediaSimulation(300, 20, 20, seed=8, synchronous=True)
+    model.step()
+    before = {a.unique_id: a.mood for a in model.schedule.agents}
+    model.draws = model.rng.random((model.num_agents, 4)).tolist()
+    for agent in model.schedule.agents:
+        agent.plan()
+    assert {a.unique_id: a.mood for a in model.schedule.agents} == before
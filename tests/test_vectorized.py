@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from codes import NEUTRAL
+from model import MediaSimulation
+from vectorized import ContinuousMediaModel, VectorMediaSimulation, moore_sum
+
+SEEDS = range(12)
+STEPS = 80
+TAIL = 40
+# Settled Angry/Scared fractions agree with MediaSimulation to within two
+# percentage points. The engine moves everybody before the interactions, which
+# leaves it about 0.7 points less angry at this density.
+TOLERANCE = 0.02
+
+
+def state(model):
+    return model.x, model.y, model.shape, model.mood
+
+
+def run(seed, steps=20, **kwargs):
+    model = VectorMediaSimulation(300, 20, 20, seed=seed, **kwargs)
+    for _ in range(steps):
+        model.step()
+    return model
+
+
+def test_same_seed_gives_the_same_run():
+    first, second = run(4), run(4)
+    for a, b in zip(state(first), state(second)):
+        np.testing.assert_array_equal(a, b)
+    assert first.media_focus == second.media_focus
+    assert (first.datacollector.get_model_vars_dataframe()
+            .equals(second.datacollector.get_model_vars_dataframe()))
+
+    other = run(5)
+    assert not all(np.array_equal(a, b) for a, b in zip(state(first), state(other)))
+
+
+def settled(model_cls, seed, N=300):
+    model = model_cls(N, 20, 20, seed=seed)
+    for _ in range(STEPS):
+        model.step()
+    df = model.datacollector.get_model_vars_dataframe().iloc[-TAIL:]
+    return df["Angry"].mean() / N, df["Scared"].mean() / N
+
+
+def test_mood_fractions_match_media_simulation():
+    agents = np.mean([settled(MediaSimulation, seed) for seed in SEEDS], axis=0)
+    arrays = np.mean([settled(VectorMediaSimulation, seed) for seed in SEEDS], axis=0)
+    assert np.all(np.abs(arrays - agents) < TOLERANCE), (agents, arrays)
+
+
+def test_calm_probability_is_used():
+    # Nobody calms down: once upset, an agent never turns neutral again
+    model = VectorMediaSimulation(300, 20, 20, seed=1, calm_probability=0.0)
+    upset = np.zeros(300, dtype=bool)
+    for _ in range(20):
+        model.step()
+        assert not np.any(upset & (model.mood == NEUTRAL))
+        upset |= model.mood != NEUTRAL
+    assert upset.any()
+
+    always = run(1, calm_probability=1.0)
+    never = run(1, calm_probability=0.0)
+    assert always.count("neutral") > never.count("neutral")
+
+
+@pytest.mark.parametrize("shape", [(3, 3), (5, 8), (16, 4)])
+def test_moore_sum_matches_explicit_rolls(shape):
+    field = np.random.default_rng(0).random(shape)
+    expected = np.zeros(shape)
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            if (dx, dy) != (0, 0):
+                expected += np.roll(field, (dx, dy), axis=(0, 1))
+    np.testing.assert_allclose(moore_sum(field), expected)
+
+
+def test_continuous_neighbour_fields_match_a_scan():
+    model = ContinuousMediaModel(200, 7, 6, initial_spread=1.0, seed=2)
+    total, count = model.neighbour_fields()
+    for i in range(model.num_agents):
+        dx = (model.x - model.x[i] + 1) % model.width
+        dy = (model.y - model.y[i] + 1) % model.height
+        near = (dx <= 2) & (dy <= 2) & ~((dx == 1) & (dy == 1))
+        assert count[i] == np.count_nonzero(near)
+        assert total[i] == pytest.approx(model.emotion[near].sum())
+
+
+def test_continuous_step_keeps_mass_and_bounds():
+    model = ContinuousMediaModel(500, 12, 10, initial_spread=1.0,
+                                 media_amplification_factor=2.0, seed=3)
+    n = model.num_agents
+    model.step()
+    assert len(model.emotion) == len(model.x) == len(model.y) == n
+    assert np.all((0 <= model.x) & (model.x < 12) & (0 <= model.y) & (model.y < 10))
+    assert np.all(np.abs(model.emotion) <= 1)
+    assert np.all((0.1 <= model.reactivity) & (model.reactivity <= 1))
+    # The stencil moves mass, it does not create it: every agent is seen
+    # from each of the 8 cells around it
+    occupancy = np.zeros((12, 10))
+    np.add.at(occupancy, (model.x, model.y), 1)
+    assert moore_sum(occupancy).sum() == 8 * n
+    model.datacollector.collect(model)
+    row = model.datacollector.get_model_vars_dataframe().iloc[-1]
+    assert row["Positive Emotion"] + row["Negative Emotion"] + row["Neutral Emotion"] == n
@@ -0,0 +1,444 @@
+# vectorized.py
+from mesa import Model
+from mesa.datacollection import DataCollector
+import numpy as np
+
+from codes import (
+    ANGRY, EMO_ANGRY, EMO_FEARFUL, EMO_HAPPY, EMO_NEUTRAL, EMOTIONS, MOODS, NEUTRAL,
+    SCARED, SHAPES,
+)
+from history import RingBuffer
+from rng import CounterStream, seed_model
+
+# Moore neighbourhood offsets, centre excluded
+MOORE_OFFSETS = np.array(
+    [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0)],
+    dtype=np.int64)
+
+# CounterStream stream ids; creation draws use tick 0, step t uses tick t + 1
+INIT_SHAPE, INIT_X, INIT_Y, RANK, MOVE, CONFLICT, VICTIM, CALM = range(8)
+
+
+class VectorMediaSimulation(Model):
+    # Struct-of-arrays version of model.MediaSimulation. Every person is a row
+    # in the x/y/shape/mood arrays and a tick is a handful of batched numpy
+    # operations instead of one Python call per agent.
+    #
+    # Semantics follow model.PersonAgent.step: move to a random Moore neighbour,
+    # then for every neighbour of the other shape start a conflict with
+    # probability conflict_probability (the first success makes the agent
+    # angry and the neighbour scared and ends the turn), otherwise calm down
+    # with probability calm_probability. Agents are still activated in a random order each
+    # tick: every agent draws a rank and when several writes hit the same agent
+    # the one with the highest rank wins, exactly as the later activation
+    # would overwrite the earlier one under RandomActivation. The only
+    # difference is that all moves happen before the interactions.
+    def __init__(self, N, width, height, conflict_probability=0.3, seed=None,
+                 calm_probability=0.1):
+        self.num_agents = N
+        self.width = width
+        self.height = height
+        self.conflict_probability = conflict_probability
+        self.calm_probability = calm_probability
+        self.media_focus = None
+        self.running = True
+        self.steps = 0
+        self.streams = CounterStream(seed)
+
+        # Create agents
+        self.shape = self.streams.integers(0, INIT_SHAPE, 0, N, len(SHAPES)).astype(np.int8)
+        self.mood = np.full(N, NEUTRAL, dtype=np.int8)
+        self.x = self.streams.integers(0, INIT_X, 0, N, width)
+        self.y = self.streams.integers(0, INIT_Y, 0, N, height)
+
+        self.datacollector = DataCollector(
+            model_reporters={
+                "Angry": lambda m: int(np.count_nonzero(m.mood == ANGRY)),
+                "Scared": lambda m: int(np.count_nonzero(m.mood == SCARED))
+            }
+        )
+
+    def step(self):
+        self.datacollector.collect(self)
+        n = self.num_agents
+        # Uniform keys give the same ordering as a random permutation
+        rank = self.draw(RANK)
+
+        self.move()
+        initiators, victims = self.conflicts()
+
+        # Agents that did not start a conflict may calm down at their own rank
+        calm = np.ones(n, dtype=bool)
+        calm[initiators] = False
+        calm &= self.draw(CALM) < self.calm_probability
+        calmed = np.flatnonzero(calm)
+
+        targets = np.concatenate([initiators, victims, calmed])
+        ranks = np.concatenate([rank[initiators], rank[initiators], rank[calmed]])
+        values = np.concatenate([
+            np.full(len(initiators), ANGRY, dtype=np.int8),
+            np.full(len(victims), SCARED, dtype=np.int8),
+            np.full(len(calmed), NEUTRAL, dtype=np.int8)])
+        self.apply_writes(targets, ranks, values)
+
+        if len(initiators):
+            last = np.argmax(rank[initiators])
+            self.media_focus = (SHAPES[self.shape[initiators[last]]],
+                                SHAPES[self.shape[victims[last]]])
+        self.steps += 1
+
+    def draw(self, stream):
+        # One uniform per agent for this tick
+        return self.streams.uniform(self.steps + 1, stream, 0, self.num_agents)
+
+    def move(self):
+        choice = (self.draw(MOVE) * len(MOORE_OFFSETS)).astype(np.int64)
+        self.x = (self.x + MOORE_OFFSETS[choice, 0]) % self.width
+        self.y = (self.y + MOORE_OFFSETS[choice, 1]) % self.height
+
+    def cells(self):
+        return self.x * self.height + self.y
+
+    def shape_counts(self):
+        # counts[s, x, y] = number of agents of shape s in cell (x, y)
+        key = self.shape.astype(np.int64) * (self.width * self.height) + self.cells()
+        counts = np.bincount(key, minlength=len(SHAPES) * self.width * self.height)
+        return counts.reshape(len(SHAPES), self.width, self.height)
+
+    def conflicts(self):
+        # Returns (initiators, victims) index arrays for this tick
+        counts = self.shape_counts()
+        other = 1 - self.shape
+        neighbours = np.zeros_like(counts)
+        for dx, dy in MOORE_OFFSETS:
+            neighbours += np.roll(counts, (-dx, -dy), axis=(1, 2))
+        k = neighbours[other, self.x, self.y]
+
+        # P(at least one of k independent checks succeeds)
+        p_any = 1.0 - (1.0 - self.conflict_probability) ** k
+        initiators = np.flatnonzero(self.draw(CONFLICT) < p_any)
+        if not len(initiators):
+            return initiators, initiators
+
+        # Pick the victim uniformly among the initiator's opposite neighbours:
+        # first the neighbouring cell (weighted by its count), then the member
+        ix, iy, ishape = self.x[initiators], self.y[initiators], other[initiators]
+        r = (self.draw(VICTIM)[initiators] * k[initiators]).astype(np.int64)
+        cx = np.empty_like(ix)
+        cy = np.empty_like(iy)
+        found = np.zeros(len(initiators), dtype=bool)
+        for dx, dy in MOORE_OFFSETS:
+            nx, ny = (ix + dx) % self.width, (iy + dy) % self.height
+            c = counts[ishape, nx, ny]
+            hit = ~found & (r < c)
+            cx[hit], cy[hit] = nx[hit], ny[hit]
+            r = np.where(found | hit, r, r - c)
+            found |= hit
+
+        key = self.shape.astype(np.int64) * (self.width * self.height) + self.cells()
+        order = np.argsort(key, kind='stable')
+        starts = np.searchsorted(key[order], np.arange(counts.size))
+        victim_key = ishape.astype(np.int64) * (self.width * self.height) + cx * self.height + cy
+        victims = order[starts[victim_key] + r]
+        return initiators, victims
+
+    def apply_writes(self, targets, ranks, values):
+        # The highest ranked write to each agent is the one that sticks
+        if not len(targets):
+            return
+        order = np.argsort(ranks, kind='stable')[::-1]
+        targets, values = targets[order], values[order]
+        _, first = np.unique(targets, return_index=True)
+        self.mood[targets[first]] = values[first]
+
+    def count(self, mood):
+        return int(np.count_nonzero(self.mood == MOODS.index(mood)))
+
+
+# EmotionalBalanceModel (New/main.py) in arrays
+
+
+class Channel:
+    # One media broadcast: reach `fraction` of the population and give every
+    # viewer one of `emotions` (uniformly). MediaAgent's two broadcasts are
+    # Channel(0.2, [EMO_NEUTRAL]) and Channel(0.1, [EMO_ANGRY, EMO_FEARFUL]).
+    def __init__(self, fraction, emotions):
+        self.fraction = fraction
+        self.emotions = np.asarray(emotions, dtype=np.int8)
+
+
+NEUTRAL_NEWS = Channel(0.2, [EMO_NEUTRAL])
+EXTREME_NEWS = Channel(0.1, [EMO_ANGRY, EMO_FEARFUL])
+
+
+def broadcast(codes, channels, rng):
+    # Apply several broadcasts to an array of emotion codes in one go.
+    #
+    # All audiences come from a single draw without replacement, split into
+    # consecutive slices, so each viewer watches at most one channel per tick
+    # and the cost is O(total audience) rather than one pass per channel.
+    # Returns the indices that were reached.
+    n = len(codes)
+    sizes = [int(n * channel.fraction) for channel in channels]
+    total = sum(sizes)
+    if not total:
+        return np.empty(0, dtype=np.int64)
+    if total > n:
+        raise ValueError("channels reach more viewers than there are agents")
+    audience = rng.choice(n, total, replace=False)
+    values = np.concatenate([
+        channel.emotions[rng.integers(0, len(channel.emotions), size)]
+        for channel, size in zip(channels, sizes)])
+    codes[audience] = values
+    return audience
+
+
+class MediaOutlet:
+    # Array-engine counterpart of New/main.py's MediaAgent
+    def __init__(self, cooldown_period=5):
+        self.cooldown_period = cooldown_period
+        self.current_cooldown = 0
+
+    def schedule(self, rng):
+        # The Channel to air this tick, or None
+        if self.current_cooldown > 0:
+            self.current_cooldown -= 1
+            return None
+        if rng.random() < 0.5:
+            return NEUTRAL_NEWS
+        if rng.random() < 0.5:
+            self.current_cooldown = self.cooldown_period
+            return EXTREME_NEWS
+        return None
+
+
+class VectorEmotionalBalanceModel(Model):
+    # Struct-of-arrays version of New/main.py's EmotionalBalanceModel.
+    #
+    # Humans never move there, so each agent's chance of picking a human (not
+    # the media agent) as partner is fixed and computed once. On every tick
+    # the media outlets act at one random point of the activation order:
+    # humans ranked before it step first, then every outlet airs at once via
+    # broadcast(), then the remaining humans step.
+    def __init__(self, width, height, num_agents, media=1, decay_rate=0.1, seed=None):
+        seed_model(self, seed)
+        self.width = width
+        self.height = height
+        self.num_agents = num_agents
+        self.decay_rate = decay_rate
+        self.running = True
+        self.steps = 0
+
+        # Create human agents
+        self.emotion = self.rng.integers(0, len(EMOTIONS), num_agents).astype(np.int8)
+        self.x = self.rng.integers(0, width, num_agents)
+        self.y = self.rng.integers(0, height, num_agents)
+
+        # Create media agents; they sit in the centre cell like MediaAgent
+        self.media = [MediaOutlet() for _ in range(media)]
+        occupancy = np.bincount(self.x * height + self.y, minlength=width * height)
+        humans = occupancy.reshape(width, height)
+        everyone = humans.copy()
+        everyone[width // 2, height // 2] += media
+        near_humans = np.zeros_like(humans)
+        near_everyone = np.zeros_like(everyone)
+        for dx, dy in MOORE_OFFSETS:
+            near_humans += np.roll(humans, (-dx, -dy), axis=(0, 1))
+            near_everyone += np.roll(everyone, (-dx, -dy), axis=(0, 1))
+        h = near_humans[self.x, self.y]
+        total = near_everyone[self.x, self.y]
+        self.p_human = np.divide(h, total, out=np.zeros(num_agents), where=total > 0)
+
+        self.datacollector = DataCollector(
+            model_reporters={
+                "Neutral": lambda m: m.counts()[EMO_NEUTRAL],
+                "Extreme": lambda m: m.counts()[EMO_ANGRY] + m.counts()[EMO_FEARFUL],
+            }
+        )
+
+    def counts(self):
+        return np.bincount(self.emotion, minlength=len(EMOTIONS))
+
+    def step(self):
+        self.datacollector.collect(self)
+        rank = self.rng.random(self.num_agents)
+        media_rank = self.rng.random()
+        before = rank < media_rank
+        self.human_step(before)
+        channels = [c for c in (outlet.schedule(self.rng) for outlet in self.media) if c]
+        if channels:
+            broadcast(self.emotion, channels, self.rng)
+        self.human_step(~before)
+        self.steps += 1
+
+    def human_step(self, mask):
+        n = int(np.count_nonzero(mask))
+        if not n:
+            return
+        idx = np.flatnonzero(mask)
+        emotion = self.emotion[idx]
+        # Decay emotions towards neutrality
+        decay = (emotion != EMO_NEUTRAL) & (self.rng.random(n) < self.decay_rate)
+        emotion[decay] = EMO_NEUTRAL
+        # Interact with a random neighbour; only human partners count
+        interacts = self.rng.random(n) < self.p_human[idx]
+        outcome = self.rng.random(n)
+        neutral = interacts & (emotion == EMO_NEUTRAL)
+        emotion[neutral & (outcome < 0.3)] = EMO_HAPPY
+        emotion[neutral & (outcome >= 0.7)] = EMO_ANGRY
+        self.emotion[idx] = emotion
+
+    def equilibrium(self):
+        # (neutral %, extreme %), as EmotionalBalanceModel(verbose=True) prints them
+        counts = self.counts()
+        return (counts[EMO_NEUTRAL] / self.num_agents * 100,
+                (counts[EMO_ANGRY] + counts[EMO_FEARFUL]) / self.num_agents * 100)
+
+
+# Continuous-emotion MediaModel (the commented-out variant at the end of
+# New/main.py) in arrays
+AGENT_TYPES = ('PersonAgent', 'PassiveObserver', 'Influencer', 'Resistor')
+PERSON, PASSIVE_OBSERVER, INFLUENCER, RESISTOR = range(4)
+TYPE_WEIGHTS = np.array([0.5, 0.3, 0.1, 0.1])
+# Per-type parameters, indexed by type code
+INFLUENCE_FACTOR = np.array([1.0, 0.5, 1.5, 1.0])
+RESISTANCE_LEVEL = np.array([0.0, 0.0, 0.0, 0.7])
+MEDIA_SUSCEPTIBILITY = np.array([1.0, 0.5, 1.5, 0.5])
+
+
+def moore_sum(field):
+    # Sum over the 8 surrounding cells of every cell of a torus field: a 3x3
+    # box filter (separable, four rolls) minus the centre
+    rows = field + np.roll(field, 1, axis=0) + np.roll(field, -1, axis=0)
+    box = rows + np.roll(rows, 1, axis=1) + np.roll(rows, -1, axis=1)
+    return box - field
+
+
+class ContinuousMediaModel(Model):
+    # Struct-of-arrays version of the continuous-emotion MediaModel sketched
+    # in New/main.py: emotions in [-1, 1], four agent types with their own
+    # influence_factor / resistance_level / media_susceptibility, fatigue
+    # that lowers reactivity, and a media agent that captures and amplifies
+    # extreme emotions and broadcasts the latest one to everybody.
+    #
+    # Each agent's neighbour average comes from two per-cell fields (emotion
+    # sum and head count) passed once through moore_sum, so a tick costs a
+    # few array passes whatever the population. Like VectorMediaSimulation,
+    # all agents move first and then update from the same snapshot, and the
+    # media agent acts after them. The sketch starts everyone at emotion 0,
+    # where nothing ever changes; initial_spread draws starting emotions
+    # uniformly from [-initial_spread, initial_spread] instead.
+    #
+    # Agent and media memories are RingBuffers. Agents remember their emotion
+    # at the end of every tick (and at creation), so the newest column is the
+    # current state and the diversity / average reporters are read off its
+    # histogram.
+    def __init__(self, N=50, width=20, height=20, density=0.8, media_amplification_factor=1.0,
+                 fatigue_rate=0.99, initial_spread=0.0, memory_capacity=5, seed=None):
+        seed_model(self, seed)
+        self.num_agents = n = int(N * density)
+        self.width = width
+        self.height = height
+        self.media_amplification_factor = media_amplification_factor
+        self.fatigue_rate = fatigue_rate
+        self.running = True
+        self.steps = 0
+
+        # Create agents
+        self.agent_type = self.rng.choice(len(AGENT_TYPES), n, p=TYPE_WEIGHTS).astype(np.int8)
+        self.influence_factor = INFLUENCE_FACTOR[self.agent_type]
+        self.resistance_level = RESISTANCE_LEVEL[self.agent_type]
+        self.media_susceptibility = MEDIA_SUSCEPTIBILITY[self.agent_type]
+        self.emotion = self.rng.uniform(-initial_spread, initial_spread, n)
+        self.tolerance_threshold = self.rng.random(n)
+        self.reactivity = np.ones(n)
+        self.x = self.rng.integers(0, width, n)
+        self.y = self.rng.integers(0, height, n)
+
+        # Past emotions per agent, and the media agent's captured (amplified)
+        # emotions
+        self.memory = RingBuffer(n, memory_capacity)
+        self.memory.append(self.emotion)
+        self.media_memory = RingBuffer(1, 5)
+
+        self.datacollector = DataCollector(
+            model_reporters={
+                "Emotion Diversity": lambda m: m.emotion_diversity(),
+                "Average Emotion": lambda m: m.average_emotion(),
+                "Influencer Impact": lambda m: m.influencer_impact(),
+                "Positive Emotion": lambda m: int(np.count_nonzero(m.emotion > 0)),
+                "Negative Emotion": lambda m: int(np.count_nonzero(m.emotion < 0)),
+                "Neutral Emotion": lambda m: int(np.count_nonzero(m.emotion == 0)),
+            }
+        )
+
+    def step(self):
+        self.datacollector.collect(self)
+        self.move()
+        self.interact()
+        self.cool_down()
+        self.media_step()
+        self.memory.append(self.emotion)
+        self.steps += 1
+
+    def move(self):
+        choice = self.rng.integers(0, len(MOORE_OFFSETS), self.num_agents)
+        self.x = (self.x + MOORE_OFFSETS[choice, 0]) % self.width
+        self.y = (self.y + MOORE_OFFSETS[choice, 1]) % self.height
+
+    def neighbour_fields(self):
+        # (sum of neighbour emotions, number of neighbours) for every agent;
+        # agents in the same cell are not neighbours, as in get_neighbors
+        cells = self.x * self.height + self.y
+        size = self.width * self.height
+        emotion_sum = np.bincount(cells, weights=self.emotion, minlength=size)
+        count = np.bincount(cells, minlength=size).astype(float)
+        shape = (self.width, self.height)
+        return (moore_sum(emotion_sum.reshape(shape))[self.x, self.y],
+                moore_sum(count.reshape(shape))[self.x, self.y])
+
+    def interact(self):
+        total, count = self.neighbour_fields()
+        average = np.divide(total, count, out=np.zeros_like(total), where=count > 0)
+        difference = average - self.emotion
+        reacts = (count > 0) & (np.abs(difference) > self.tolerance_threshold)
+        emotion = self.emotion + np.where(
+            reacts, difference * self.influence_factor * self.reactivity, 0.0)
+        # Apply resistance level
+        emotion -= np.where(reacts, emotion * self.resistance_level, 0.0)
+        self.emotion = np.clip(emotion, -1, 1)
+
+    def cool_down(self):
+        # Fatigue reduces reactivity over time, down to 0.1
+        self.reactivity = np.maximum(self.reactivity * self.fatigue_rate, 0.1)
+
+    def media_step(self):
+        # Capture one high-impact (|emotion| > 0.8) agent, amplified, then
+        # broadcast the latest capture to everyone
+        high = np.flatnonzero(np.abs(self.emotion) > 0.8)
+        if len(high):
+            chosen = high[self.rng.integers(len(high))]
+            self.media_memory.append(self.emotion[chosen] * self.media_amplification_factor)
+        if len(self.media_memory):
+            self.emotion = np.clip(
+                self.emotion + self.media_memory.latest()[0] * self.media_susceptibility, -1, 1)
+
+    def emotion_diversity(self):
+        # Distinct emotions at one decimal, out of 20 levels
+        counts, _ = self.memory.histogram(scale=10)
+        return np.count_nonzero(counts) / 20
+
+    def average_emotion(self):
+        counts, sums = self.memory.histogram(scale=10)
+        total = counts.sum()
+        return float(sums.sum() / total) if total else 0
+
+    def rolling_emotion(self, window=None):
+        # Each agent's mean emotion over its last `window` remembered ticks
+        return self.memory.mean(window)
+
+    def influencer_impact(self):
+        influencers = self.agent_type == INFLUENCER
+        if not influencers.any():
+            return 0
+        return float(self.emotion[influencers].mean())
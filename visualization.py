@@ -1,20 +1,29 @@
-from mesa.visualization.modules import CanvasGrid, ChartModule
-from mesa.visualization.ModularVisualization import ModularServer
+COLORS = {
+    'neutral': "grey",
+    'angry': "red",
+    'scared': "blue",
+}
 
-def agent_portrayal(agent):
-    portrayal = {
-        "Shape": "circle" if agent.shape == "circle" else "rect",
+# (shape, mood) -> portrayal, built once instead of on every call
+PORTRAYALS = {
+    (shape, mood): {
+        "Shape": "circle" if shape == "circle" else "rect",
         "w": 0.8,
         "h": 0.8,
         "Filled": "true",
-        "Layer": 0
+        "Layer": 0,
+        "Color": color
     }
-    
-    if agent.mood == 'neutral':
-        portrayal["Color"] = "grey"
-    elif agent.mood == 'angry':
-        portrayal["Color"] = "red"
-    else:  # scared
-        portrayal["Color"] = "blue"
-        
-    return portrayal
\ No newline at end of file
+    for shape in ('square', 'circle')
+    for mood, color in COLORS.items()
+}
+
+# (shape, mood) -> (canvas shape, colour) for deltagrid.DeltaCanvasGrid
+PALETTE = {key: (p["Shape"], p["Color"]) for key, p in PORTRAYALS.items()}
+
+def agent_portrayal(agent):
+    # CanvasGrid writes x/y into the dict, so hand out a copy
+    return dict(PORTRAYALS[(agent.shape, agent.mood)])
+
+def agent_style(agent):
+    return (agent.shape, agent.mood)
@@ -0,0 +1,94 @@
+# wbwwb.py
+from mesa import Model
+from mesa.time import RandomActivation
+from mesa.space import MultiGrid
+from rng import seed_model
+from tally import MoodTally, Tallied
+from profiling import PhaseProfiler
+from compact import Coded, SlottedAgent
+from codes import NEUTRAL, ANGRY, HAPPY
+from codes import WBWWB_STATES as STATES, WBWWB_SHAPES as SHAPES, WBWWB_COLORS as COLORS
+
+class PersonAgent(SlottedAgent):
+    # Only the state code is stored; shape and colour follow from it
+    __slots__ = ("_state_code",)
+    state_code = Tallied("states", STATES)
+    state = Coded("state_code", STATES)
+
+    def __init__(self, unique_id, model):
+        super().__init__(unique_id, model)
+        self.state_code = NEUTRAL
+
+    @property
+    def shape(self):
+        return SHAPES[self.state_code]
+
+    @property
+    def color(self):
+        return COLORS[self.state_code]
+
+    PHASES = {"move": "move", "cellmates": "neighbor query", "interact": "interaction"}
+
+    def step(self):
+        self.move()
+        self.interact(self.cellmates())
+
+    def move(self):
+        # Move to a random neighboring cell
+        possible_steps = self.model.grid.get_neighborhood(
+            self.pos,
+            moore=True,
+            include_center=False)
+        new_position = self.random.choice(possible_steps)
+        self.model.grid.move_agent(self, new_position)
+
+    def cellmates(self):
+        return self.model.grid.iter_cell_list_contents([self.pos])
+
+    def interact(self, cellmates):
+        # Interact with neighbors
+        for other in cellmates:
+            if other != self:
+                if other.state_code == ANGRY and self.state_code != ANGRY:
+                    self.state_code = ANGRY
+                elif other.state_code == HAPPY and self.state_code != HAPPY:
+                    self.state_code = HAPPY
+
+class WBWWBModel(Model):
+    PHASES = {"media_influence": "media broadcast"}
+
+    def __init__(self, N, width, height, grid_class=MultiGrid, seed=None, profile=False,
+                 convergence=None):
+        seed_model(self, seed)
+        self.num_agents = N
+        self.grid = grid_class(width, height, torus=True)
+        self.states = MoodTally()
+        self.convergence = convergence
+        self.schedule = RandomActivation(self)
+        self.running = True
+
+        # Create agents
+        for i in range(self.num_agents):
+            a = PersonAgent(i, self)
+            self.schedule.add(a)
+            x = self.random.randrange(self.grid.width)
+            y = self.random.randrange(self.grid.height)
+            self.grid.place_agent(a, (x, y))
+
+        self.media_counter = 0
+
+        if profile:
+            PhaseProfiler().attach(self)
+
+    def step(self):
+        self.schedule.step()
+        self.media_influence()
+        if self.convergence is not None:
+            self.convergence.update(self, self.states, ("neutral", "angry", "happy"))
+
+    def media_influence(self):
+        # Media highlights an angry interaction every 5 steps
+        if self.media_counter % 5 == 0:
+            agent = self.random.choice(self.schedule.agents)
+            agent.state_code = ANGRY
+        self.media_counter += 1